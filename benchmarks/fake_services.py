@@ -0,0 +1,332 @@
+# benchmarks/fake_services.py - Local stand-ins for AssemblyAI, Gemini, Murf, Tavily and OpenWeather
+
+"""
+Speaks just enough of each upstream protocol for main.py to run a full turn:
+
+- AssemblyAI v3 streaming STT (WebSocket over TLS, since the SDK only dials wss://):
+  detects speech by frame energy and emits partial and final Turn events.
+- Gemini REST streamGenerateContent: streams scripted text with configurable
+  first-token and per-token latency, and answers weather/search questions
+  with a function call first.
+- Murf stream-input WebSocket: paces base64 WAV chunks per context_id, then "final".
+- Tavily /search and OpenWeather /data/2.5/weather with configurable latency.
+
+Run standalone with `python -m benchmarks.fake_services`, or let
+benchmarks/load.py start it. Point the app at it with the environment
+printed by app_environment().
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import struct
+import subprocess
+import time
+import uuid
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+STT_SAMPLE_RATE = 16000
+# Mean absolute sample value above which an STT frame counts as speech
+SPEECH_ENERGY_THRESHOLD = 500
+
+# What the fake users "say", in order; transcripts are matched to these by turn
+UTTERANCES = (
+    "What is the weather like in London today",
+    "Tell me a short fact about octopuses",
+    "Search the news about electric cars",
+    "How far away is the moon",
+    "Give me a quick tip for better sleep",
+)
+
+REPLY_TEXT = (
+    "Certainly, Sir. Here is what I found. The short answer is that it depends on a few things, "
+    "but in most cases you can expect a pleasant outcome. Let me know if you would like more detail."
+)
+
+
+def default_settings() -> dict:
+    return {
+        "gemini_first_token": float(os.getenv("FAKE_GEMINI_FIRST_TOKEN_SECONDS", "0.35")),
+        "gemini_token_interval": float(os.getenv("FAKE_GEMINI_TOKEN_INTERVAL_SECONDS", "0.03")),
+        "gemini_words_per_chunk": int(os.getenv("FAKE_GEMINI_WORDS_PER_CHUNK", "4")),
+        "tool_calls": os.getenv("FAKE_GEMINI_TOOL_CALLS", "true").strip().lower() == "true",
+        "tool_latency": float(os.getenv("FAKE_TOOL_LATENCY_SECONDS", "0.25")),
+        "murf_first_audio": float(os.getenv("FAKE_MURF_FIRST_AUDIO_SECONDS", "0.15")),
+        # How much faster than real time Murf streams audio back
+        "murf_speed": float(os.getenv("FAKE_MURF_SPEED", "4")),
+        "murf_chars_per_second": float(os.getenv("FAKE_MURF_CHARS_PER_SECOND", "15")),
+        "stt_partial_interval": float(os.getenv("FAKE_STT_PARTIAL_INTERVAL_SECONDS", "0.5")),
+    }
+
+
+def wav_header(sample_rate: int, data_size: int = 0xFFFFFFFF) -> bytes:
+    """16-bit mono WAV header; Murf streams with an unknown data size."""
+    riff_size = 0xFFFFFFFF if data_size == 0xFFFFFFFF else 36 + data_size
+    return (b"RIFF" + struct.pack("<I", riff_size) + b"WAVEfmt "
+            + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+            + b"data" + struct.pack("<I", data_size))
+
+
+def _gemini_chunk(part: dict, finished: bool = False) -> str:
+    candidate = {"content": {"role": "model", "parts": [part]}, "index": 0}
+    if finished:
+        candidate["finishReason"] = 1  # STOP, as the int enum the REST transport asks for
+    return json.dumps({"candidates": [candidate]})
+
+
+def _tool_call_for(user_text: str):
+    text = user_text.lower()
+    if "weather" in text:
+        words = text.replace("?", "").split()
+        location = words[words.index("in") + 1].title() if "in" in words[:-1] else "London"
+        return {"name": "get_current_weather", "args": {"location": location}}
+    if "search" in text or "news" in text:
+        return {"name": "web_search", "args": {"query": user_text}}
+    return None
+
+
+def create_app(settings: dict) -> FastAPI:
+    """The plain-HTTP stand-ins: Gemini, Murf, Tavily and OpenWeather on one port."""
+    app = FastAPI()
+
+    @app.post("/v1beta/models/{model_action:path}")
+    async def gemini_generate(model_action: str, request: Request):
+        body = await request.json()
+        last_parts = body.get("contents", [{}])[-1].get("parts", [])
+        user_text = " ".join(part.get("text", "") for part in last_parts)
+        answered_tool = any("functionResponse" in part for part in last_parts)
+        tool_call = None if answered_tool or not settings["tool_calls"] else _tool_call_for(user_text)
+
+        async def stream():
+            await asyncio.sleep(settings["gemini_first_token"])
+            if tool_call:
+                yield "[" + _gemini_chunk({"functionCall": tool_call}, finished=True) + "]"
+                return
+            words = REPLY_TEXT.split(" ")
+            step = settings["gemini_words_per_chunk"]
+            for index in range(0, len(words), step):
+                text = " ".join(words[index:index + step]) + " "
+                last = index + step >= len(words)
+                yield ("[" if index == 0 else ",\r\n") + _gemini_chunk({"text": text}, finished=last)
+                if not last:
+                    await asyncio.sleep(settings["gemini_token_interval"])
+            yield "]"
+
+        if not model_action.endswith(":streamGenerateContent"):
+            return json.loads(_gemini_chunk({"text": REPLY_TEXT}, finished=True))
+        return StreamingResponse(stream(), media_type="application/json")
+
+    @app.post("/search")
+    async def tavily_search(request: Request):
+        body = await request.json()
+        await asyncio.sleep(settings["tool_latency"])
+        return {
+            "query": body.get("query"),
+            "answer": "Electric car sales keep growing as prices fall.",
+            "results": [{"title": f"Result {i}", "url": f"https://example.com/{i}",
+                         "content": "Benchmark search result content. " * 10} for i in range(1, 4)],
+        }
+
+    @app.get("/data/2.5/weather")
+    async def openweather(q: str = "London"):
+        await asyncio.sleep(settings["tool_latency"])
+        return {"cod": 200, "name": q, "sys": {"country": "GB"},
+                "weather": [{"description": "light rain"}],
+                "main": {"temp": 14.2, "feels_like": 13.1, "humidity": 81}, "wind": {"speed": 4.6}}
+
+    @app.get("/v1/speech/voices")
+    async def murf_voices():
+        return [{"voiceId": "en-US-terrell", "name": "Terrell", "gender": "Male"}]
+
+    @app.websocket("/v1/speech/stream-input")
+    async def murf_stream_input(websocket: WebSocket):
+        await websocket.accept()
+        sample_rate = int(websocket.query_params.get("sample_rate", "44100"))
+        bytes_per_second = sample_rate * 2
+        chunk_bytes = bytes_per_second // 10  # 100 ms of audio per message
+        requests = asyncio.Queue()
+        cleared = set()
+
+        async def synthesize():
+            started_contexts = set()
+            while True:
+                context_id, text, end = await requests.get()
+                if context_id in cleared:
+                    continue
+                if text:
+                    await asyncio.sleep(settings["murf_first_audio"] if context_id not in started_contexts else 0)
+                    pcm_size = int(len(text) / settings["murf_chars_per_second"] * bytes_per_second) & ~1
+                    for offset in range(0, pcm_size, chunk_bytes):
+                        if context_id in cleared:
+                            break
+                        audio = bytes(min(chunk_bytes, pcm_size - offset))
+                        if context_id not in started_contexts:
+                            started_contexts.add(context_id)
+                            audio = wav_header(sample_rate) + audio
+                        await websocket.send_text(json.dumps({
+                            "audio": base64.b64encode(audio).decode("ascii"), "context_id": context_id
+                        }))
+                        await asyncio.sleep(len(audio) / bytes_per_second / settings["murf_speed"])
+                if end and context_id not in cleared:
+                    await websocket.send_text(json.dumps({"final": True, "context_id": context_id}))
+
+        synthesizer = asyncio.create_task(synthesize())
+        try:
+            while True:
+                message = json.loads(await websocket.receive_text())
+                if "voice_config" in message:
+                    continue
+                context_id = message.get("context_id")
+                if message.get("clear"):
+                    cleared.add(context_id)
+                    continue
+                requests.put_nowait((context_id, message.get("text", ""), bool(message.get("end"))))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            synthesizer.cancel()
+
+    return app
+
+
+def create_stt_app(settings: dict) -> FastAPI:
+    """AssemblyAI v3 streaming stand-in, served over TLS."""
+    app = FastAPI()
+
+    @app.websocket("/v3/ws")
+    async def streaming_stt(websocket: WebSocket):
+        await websocket.accept()
+        silence_ms = int(websocket.query_params.get("min_end_of_turn_silence_when_confident", "800"))
+        frame_bytes = STT_SAMPLE_RATE * 2 // 50  # 20 ms frames
+        await websocket.send_text(json.dumps({
+            "type": "Begin", "id": str(uuid.uuid4()), "expires_at": int(time.time()) + 3600
+        }))
+
+        turn_order = 0
+        buffer = b""
+        speech_ms = 0
+        trailing_silence_ms = 0
+        last_partial_ms = 0
+        audio_ms = 0
+
+        def turn_event(end_of_turn: bool) -> str:
+            words = UTTERANCES[turn_order % len(UTTERANCES)].split()
+            if not end_of_turn:
+                # Partials reveal the utterance as it is "heard"
+                words = words[:max(1, len(words) * speech_ms // max(1, speech_ms + 600))]
+            transcript = " ".join(words) + ("?" if end_of_turn and words[0] in ("What", "How") else
+                                            "." if end_of_turn else "")
+            return json.dumps({
+                "type": "Turn", "turn_order": turn_order, "turn_is_formatted": end_of_turn,
+                "end_of_turn": end_of_turn, "transcript": transcript,
+                "end_of_turn_confidence": 0.9 if end_of_turn else 0.3, "words": [],
+            })
+
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("text"):
+                    if json.loads(message["text"]).get("type") == "Terminate":
+                        await websocket.send_text(json.dumps({
+                            "type": "Termination", "audio_duration_seconds": audio_ms // 1000,
+                            "session_duration_seconds": audio_ms // 1000,
+                        }))
+                        break
+                    continue
+
+                buffer += message.get("bytes") or b""
+                while len(buffer) >= frame_bytes:
+                    frame = np.frombuffer(buffer[:frame_bytes], dtype=np.int16)
+                    buffer = buffer[frame_bytes:]
+                    audio_ms += 20
+                    if np.abs(frame.astype(np.int32)).mean() > SPEECH_ENERGY_THRESHOLD:
+                        speech_ms += 20
+                        trailing_silence_ms = 0
+                        if speech_ms - last_partial_ms >= settings["stt_partial_interval"] * 1000:
+                            last_partial_ms = speech_ms
+                            await websocket.send_text(turn_event(end_of_turn=False))
+                    elif speech_ms:
+                        trailing_silence_ms += 20
+                        if trailing_silence_ms >= silence_ms:
+                            await websocket.send_text(turn_event(end_of_turn=True))
+                            turn_order += 1
+                            speech_ms = trailing_silence_ms = last_partial_ms = 0
+        except WebSocketDisconnect:
+            pass
+
+    return app
+
+
+def ensure_certificate(directory: str):
+    """Self-signed certificate for localhost, made with the openssl CLI. Returns (cert, key)."""
+    cert_path = os.path.join(directory, "fake_stt_cert.pem")
+    key_path = os.path.join(directory, "fake_stt_key.pem")
+    if not (os.path.exists(cert_path) and os.path.exists(key_path)):
+        os.makedirs(directory, exist_ok=True)
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "30",
+             "-keyout", key_path, "-out", cert_path, "-subj", "/CN=localhost",
+             "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"],
+            check=True, capture_output=True,
+        )
+    return cert_path, key_path
+
+
+def app_environment(http_port: int, stt_port: int, cert_path: str) -> dict:
+    """Environment that points main.py at these stand-ins."""
+    base_url = f"http://127.0.0.1:{http_port}"
+    return {
+        "MURF_WS_URL": f"ws://127.0.0.1:{http_port}/v1/speech/stream-input",
+        "MURF_API_URL": base_url,
+        "GEMINI_API_ENDPOINT": base_url,
+        "GEMINI_TRANSPORT": "rest",
+        "TAVILY_API_URL": base_url,
+        "OPENWEATHER_API_URL": f"{base_url}/data/2.5/weather",
+        "ASSEMBLYAI_STREAMING_HOST": f"localhost:{stt_port}",
+        # The AssemblyAI SDK verifies TLS with the default context, which reads this
+        "SSL_CERT_FILE": cert_path,
+    }
+
+
+async def serve(http_port: int, stt_port: int, cert_dir: str, settings: dict):
+    cert_path, key_path = ensure_certificate(cert_dir)
+    servers = [
+        uvicorn.Server(uvicorn.Config(create_app(settings), host="127.0.0.1", port=http_port,
+                                      log_level="warning", ws_max_size=16 * 1024 * 1024)),
+        uvicorn.Server(uvicorn.Config(create_stt_app(settings), host="127.0.0.1", port=stt_port,
+                                      log_level="warning", ssl_certfile=cert_path, ssl_keyfile=key_path)),
+    ]
+    logger.info(f"🧪 Fake services on :{http_port} (HTTP/WS) and :{stt_port} (STT, TLS)")
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--http-port", type=int, default=8790)
+    parser.add_argument("--stt-port", type=int, default=8791)
+    parser.add_argument("--cert-dir", default=os.path.join(".cache", "benchmarks"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    cert_path, _ = ensure_certificate(args.cert_dir)
+    for name, value in app_environment(args.http_port, args.stt_port, os.path.abspath(cert_path)).items():
+        print(f"export {name}={value}")
+    try:
+        asyncio.run(serve(args.http_port, args.stt_port, args.cert_dir, default_settings()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
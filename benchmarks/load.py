@@ -0,0 +1,331 @@
+# benchmarks/load.py - Drives N concurrent /ws sessions against local fake upstreams
+
+"""
+Starts benchmarks/fake_services.py and the app (uvicorn main:app) as subprocesses,
+then for each session count runs that many concurrent /ws sessions. Every session
+streams recorded 16 kHz mono PCM at real-time pace, keeps sending silence while the
+agent answers (as a live microphone would), and records per turn:
+
+- time to first audio, from the end of the user's speech and from the server's
+  end-of-turn event (the server's own breakdown is in llm_streaming_complete);
+- turn completion time and audio bytes received.
+
+The app's CPU and peak RSS are sampled from /proc (Linux) while each step runs.
+
+    python -m benchmarks.load --sessions 1,5,10,25 --turns 3
+    python -m benchmarks.load --pcm utterance.raw --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import numpy as np
+import websockets
+
+from benchmarks.fake_services import app_environment, ensure_certificate
+from services.audio_frames import unpack_audio_frame
+
+SAMPLE_RATE = 16000
+FRAME_MS = 50
+FRAME_BYTES = SAMPLE_RATE * 2 * FRAME_MS // 1000
+# Mean absolute sample value above which a frame counts as speech (matches the fake STT)
+SPEECH_ENERGY_THRESHOLD = 500
+
+# App settings for benchmarking: no caches hiding upstream work, limits out of the way
+BENCHMARK_APP_ENV = {
+    "TTS_CACHE_ENABLED": "false",
+    "TOOL_CACHE_SEARCH_TTL_SECONDS": "0",
+    "TOOL_CACHE_WEATHER_TTL_SECONDS": "0",
+    "RATE_LIMIT_SESSION_BURST": "1000",
+    "RATE_LIMIT_SESSION_PER_MINUTE": "6000",
+    "RATE_LIMIT_KEY_MAX_REQUESTS": "1000000",
+    "SESSION_STORE": "memory",
+    "LOG_FILE": "",
+    "LOG_LEVEL": "WARNING",
+}
+
+
+def synthetic_utterance(seconds: float = 1.6) -> bytes:
+    """A stand-in for recorded speech: a warbling tone loud enough for the fake STT."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    tone = np.sin(2 * np.pi * (180 + 40 * np.sin(2 * np.pi * 3 * t)) * t)
+    return (tone * 6000).astype(np.int16).tobytes()
+
+
+def load_pcm(path: str) -> bytes:
+    """Raw 16 kHz mono s16le PCM; a WAV file's header is skipped."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] == b"RIFF":
+        data = data[44:]
+    return data[:len(data) - len(data) % 2]
+
+
+def speech_end_offset(pcm: bytes) -> int:
+    """Byte offset just after the last voiced frame, so trailing silence in a recording is not counted."""
+    samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % FRAME_BYTES], dtype=np.int16).reshape(-1, FRAME_BYTES // 2)
+    voiced = np.nonzero(np.abs(samples.astype(np.int32)).mean(axis=1) > SPEECH_ENERGY_THRESHOLD)[0]
+    return (int(voiced[-1]) + 1) * FRAME_BYTES if len(voiced) else len(pcm)
+
+
+def percentile(values: list, q: float):
+    return float(np.percentile(values, q)) if values else None
+
+
+class ProcessSampler:
+    """Samples a process's CPU time and RSS from /proc while a step runs."""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self._task = None
+
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def _rss_bytes(self) -> int:
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    async def _run(self):
+        while True:
+            self.peak_rss = max(self.peak_rss, self._rss_bytes())
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self.started_wall = time.monotonic()
+        self.started_cpu = self._cpu_seconds()
+        self.rss_before = self._rss_bytes()
+        self.peak_rss = self.rss_before
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> dict:
+        self._task.cancel()
+        wall = time.monotonic() - self.started_wall
+        return {
+            "cpu_percent": 100 * (self._cpu_seconds() - self.started_cpu) / wall if wall else 0.0,
+            "rss_before_mb": self.rss_before / 2 ** 20,
+            "rss_peak_mb": self.peak_rss / 2 ** 20,
+        }
+
+
+async def run_session(url: str, index: int, pcm: bytes, turns: int, results: list, setups: list, timeout: float):
+    """One simulated user: speaks, waits for the spoken answer, repeats."""
+    speech_end = speech_end_offset(pcm)
+    silence = bytes(FRAME_BYTES)
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.send(json.dumps({
+            "type": "configure_api_keys",
+            "keys": {"assemblyai": "bench", "gemini": "bench", "murf": "bench",
+                     "tavily": "bench", "openweather": "bench"},
+            "capabilities": {"binary_audio": True},
+        }))
+
+        turn = {}
+        turn_done = asyncio.Event()
+        ready = asyncio.Event()
+
+        async def receive():
+            async for message in ws:
+                now = time.monotonic()
+                if isinstance(message, bytes):
+                    turn_number, _, _, payload = unpack_audio_frame(message)
+                    turn.setdefault("first_audio", now)
+                    turn["audio_bytes"] = turn.get("audio_bytes", 0) + len(payload)
+                    continue
+                data = json.loads(message)
+                kind = data.get("type")
+                if kind == "connection_established":
+                    if "setup_ms" in data:
+                        setups.append(data["setup_ms"] / 1000)
+                    ready.set()
+                elif kind == "turn_completed":
+                    turn.setdefault("end_of_turn", now)
+                elif kind == "audio_chunk":
+                    turn.setdefault("first_audio", now)
+                elif kind == "llm_streaming_complete":
+                    turn["server_timings"] = data.get("timings", {}).get("stages_ms", {})
+                elif kind == "audio_streaming_complete":
+                    turn["audio_complete"] = now
+                elif kind in ("llm_error", "error"):
+                    turn["error"] = data.get("error") or data.get("message")
+                if ("audio_complete" in turn and "server_timings" in turn) or "error" in turn:
+                    turn_done.set()
+
+        receiver = asyncio.create_task(receive())
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+            next_frame = time.monotonic()
+
+            async def send_frame(frame: bytes):
+                nonlocal next_frame
+                await ws.send(frame)
+                next_frame += FRAME_MS / 1000
+                await asyncio.sleep(max(0.0, next_frame - time.monotonic()))
+
+            for _ in range(turns):
+                turn.clear()
+                turn_done.clear()
+                for offset in range(0, len(pcm), FRAME_BYTES):
+                    await send_frame(pcm[offset:offset + FRAME_BYTES].ljust(FRAME_BYTES, b"\0"))
+                    if offset + FRAME_BYTES >= speech_end and "speech_end" not in turn:
+                        turn["speech_end"] = time.monotonic()
+                # Keep the microphone open with silence until the answer has been played
+                deadline = time.monotonic() + timeout
+                while not turn_done.is_set() and time.monotonic() < deadline:
+                    await send_frame(silence)
+
+                record = {"session": index, "audio_bytes": turn.get("audio_bytes", 0)}
+                for key in ("server_timings", "error"):
+                    if key in turn:
+                        record[key] = turn[key]
+                if not turn_done.is_set():
+                    record["error"] = "timeout"
+                if "first_audio" in turn:
+                    record["ttfa_from_speech_end"] = turn["first_audio"] - turn["speech_end"]
+                    if "end_of_turn" in turn:
+                        record["ttfa_from_end_of_turn"] = turn["first_audio"] - turn["end_of_turn"]
+                if "audio_complete" in turn:
+                    record["turn_seconds"] = turn["audio_complete"] - turn["speech_end"]
+                results.append(record)
+        finally:
+            receiver.cancel()
+
+
+async def run_step(url: str, sessions: int, pcm: bytes, turns: int, app_pid: int, timeout: float) -> dict:
+    results = []
+    setups = []
+    sampler = ProcessSampler(app_pid)
+    sampler.start()
+    started = time.monotonic()
+    outcomes = await asyncio.gather(
+        *(run_session(url, index, pcm, turns, results, setups, timeout) for index in range(sessions)),
+        return_exceptions=True,
+    )
+    elapsed = time.monotonic() - started
+    usage = sampler.stop()
+
+    ok = [r for r in results if "error" not in r]
+    ttfa = [r["ttfa_from_speech_end"] for r in ok if "ttfa_from_speech_end" in r]
+    ttfa_eot = [r["ttfa_from_end_of_turn"] for r in ok if "ttfa_from_end_of_turn" in r]
+    server_ttfa = [r["server_timings"]["first_audio_sent"] / 1000 for r in ok
+                   if "first_audio_sent" in r.get("server_timings", {})]
+    return {
+        "sessions": sessions,
+        "turns_ok": len(ok),
+        "turns_failed": len(results) - len(ok) + sum(isinstance(o, Exception) for o in outcomes),
+        "errors": sorted({str(r.get("error")) for r in results if "error" in r}
+                         | {repr(o) for o in outcomes if isinstance(o, Exception)}),
+        "ttfa_p50": percentile(ttfa, 50), "ttfa_p95": percentile(ttfa, 95),
+        "ttfa_from_eot_p50": percentile(ttfa_eot, 50), "ttfa_from_eot_p95": percentile(ttfa_eot, 95),
+        "server_first_audio_p50": percentile(server_ttfa, 50),
+        "server_first_audio_p95": percentile(server_ttfa, 95),
+        "setup_p50": percentile(setups, 50), "setup_p95": percentile(setups, 95),
+        "turns_per_second": len(ok) / elapsed,
+        "audio_mb_per_second": sum(r["audio_bytes"] for r in results) / elapsed / 2 ** 20,
+        **usage,
+        "rss_per_session_mb": (usage["rss_peak_mb"] - usage["rss_before_mb"]) / sessions,
+    }
+
+
+def print_report(rows: list):
+    columns = [("sessions", "{:>8}"), ("turns_ok", "{:>8}"), ("turns_failed", "{:>6}"),
+               ("ttfa_p50", "{:>8.3f}"), ("ttfa_p95", "{:>8.3f}"), ("ttfa_from_eot_p50", "{:>8.3f}"),
+               ("server_first_audio_p95", "{:>8.3f}"), ("setup_p95", "{:>8.3f}"), ("turns_per_second", "{:>7.2f}"),
+               ("cpu_percent", "{:>6.1f}"), ("rss_peak_mb", "{:>8.1f}"), ("rss_per_session_mb", "{:>7.2f}")]
+    headers = ["sessions", "ok", "failed", "ttfa50", "ttfa95", "eot→a50", "srv95", "setup95", "turns/s",
+               "cpu%", "rss MB", "MB/sess"]
+    print("  ".join(f"{h:>8}" for h in headers))
+    for row in rows:
+        print("  ".join(fmt.format(row[key]) if row[key] is not None else f"{'-':>8}" for key, fmt in columns))
+        for error in row["errors"]:
+            print(f"    ⚠️ {error}")
+
+
+async def wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Nothing listening on port {port} after {timeout}s")
+            await asyncio.sleep(0.2)
+
+
+async def main_async(args):
+    pcm = load_pcm(args.pcm) if args.pcm else synthetic_utterance() + bytes(FRAME_BYTES * 4)
+    args.cert_dir = os.path.abspath(args.cert_dir)
+    cert_path, _ = ensure_certificate(args.cert_dir)
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    fakes = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_services", "--http-port", str(args.fake_port),
+         "--stt-port", str(args.stt_port), "--cert-dir", args.cert_dir],
+        cwd=repo_root, stdout=subprocess.DEVNULL,
+    )
+    app_env = {**os.environ, **BENCHMARK_APP_ENV}
+    app_env.update({k: v for k, v in os.environ.items() if k in BENCHMARK_APP_ENV})  # Caller overrides win
+    app_env.update(app_environment(args.fake_port, args.stt_port, cert_path))
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.app_port),
+         "--log-level", "warning"],
+        cwd=repo_root, env=app_env,
+    )
+    try:
+        await wait_for_port(args.fake_port)
+        await wait_for_port(args.stt_port)
+        await wait_for_port(args.app_port)
+        url = f"ws://127.0.0.1:{args.app_port}/ws"
+
+        rows = []
+        for sessions in args.sessions:
+            print(f"▶️ {sessions} concurrent session(s), {args.turns} turn(s) each...", flush=True)
+            rows.append(await run_step(url, sessions, pcm, args.turns, app.pid, args.turn_timeout))
+        print()
+        print_report(rows)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(rows, f, indent=2)
+    finally:
+        # The app first, so its upstream connections close cleanly while the fakes still answer
+        for process in (app, fakes):
+            process.send_signal(signal.SIGINT)
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the voice agent against local fake upstreams.")
+    parser.add_argument("--sessions", default="1,5,10",
+                        type=lambda value: [int(n) for n in value.split(",")],
+                        help="comma-separated concurrent session counts, one step each")
+    parser.add_argument("--turns", type=int, default=3, help="turns per session")
+    parser.add_argument("--pcm", help="recorded utterance: raw 16 kHz mono s16le PCM or WAV (default: synthetic)")
+    parser.add_argument("--app-port", type=int, default=8800)
+    parser.add_argument("--fake-port", type=int, default=8790)
+    parser.add_argument("--stt-port", type=int, default=8791)
+    parser.add_argument("--cert-dir", default=os.path.join(".cache", "benchmarks"))
+    parser.add_argument("--turn-timeout", type=float, default=60.0, help="seconds to wait for each answer")
+    parser.add_argument("--json", help="also write the results here")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,28 +10,37 @@ import time
 import re
 from datetime import datetime
 from fastapi import FastAPI, File, UploadFile, Query, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 
+# Load environment variables (before the services read their settings at import)
+load_dotenv()
+
+# Logging goes through a queue so the event loop never waits on console or file I/O
+from services.logging_setup import configure_logging, PARTIAL_TRANSCRIPT_LOG, RESPONSE_BODY_LOG, TTS_TEXT_LOG
+configure_logging()
+
 # Schemas/services
 from schemas import AgentChatResponse, ErrorResponse
-from services import stt, llm, tts
+from services import stt, llm, tts, http_client
 
-# Murf WebSocket stream-input client
-from services.murf_ws import MurfStreamInputWS
+# Murf WebSocket stream-input client, pooled per session
+from services.murf_pool import murf_pool
+from services.murf_ws import send_complete_wav
+from services.tts_cache import TTS_CACHE_LOOKUP_WAIT, tts_cache, tts_cache_key
+from services.tool_cache import tool_cache
+from services.session_store import SESSION_LEASE_SECONDS, WORKER_ID, session_store
+from services.rate_limit import TurnRateLimiter
+from services.metrics import TurnTimings, turn_metrics
+from services.audio_ingest import AudioIngest, ingest_totals
+from services.vad import VAD_ENABLED, VoiceActivityGate, vad_totals
+from services.audio_reframer import AUDIO_FRAME_MS, AudioReframer
 
-# Load environment variables
-load_dotenv()
-
-# Enhanced logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('day23_complete_agent.log')
-    ]
+# Bounded executor and turn capacity for the async turn pipeline
+from services.executors import (
+    MAX_CONCURRENT_TURNS, TURN_QUEUE_TIMEOUT, iterate_in_executor, run_blocking, run_setup, setup_executor,
+    turn_slots,
 )
 
 logger = logging.getLogger(__name__)
@@ -42,26 +51,78 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # ⭐ NEW: Global dictionary to hold API keys per session
 session_api_keys = {}
 
-# --- Rate Limiter for API Calls ---
-class RateLimiter:
-    def __init__(self, max_requests=40, time_window=86400):  # 40 requests per day (buffer)
-        self.max_requests = max_requests
-        self.time_window = time_window
-        self.requests = []
-    
-    def can_make_request(self):
-        now = datetime.now()
-        # Remove old requests outside time window
-        self.requests = [req_time for req_time in self.requests 
-                        if (now - req_time).total_seconds() < self.time_window]
-        
-        return len(self.requests) < self.max_requests
-    
-    def add_request(self):
-        self.requests.append(datetime.now())
+# Sessions whose client negotiated binary audio frames instead of base64-in-JSON
+binary_audio_sessions = set()
+
+# The turn task that currently owns each session's LLM + TTS pipeline
+active_turns = {}
+# Serializes handing a session's ownership to a new turn, which awaits the old turn's cancellation
+turn_start_locks = {}
+
+# AssemblyAI streaming host; override to use a local stand-in (see benchmarks/)
+ASSEMBLYAI_STREAMING_HOST = os.getenv("ASSEMBLYAI_STREAMING_HOST", "streaming.assemblyai.com")
+
+# Speculative LLM start on stable partial transcripts (optional)
+SPECULATIVE_LLM = os.getenv("SPECULATIVE_LLM", "false").strip().lower() == "true"
+SPECULATION_MIN_CONFIDENCE = float(os.getenv("SPECULATION_MIN_CONFIDENCE", "0.5"))
+SPECULATION_MIN_WORDS = int(os.getenv("SPECULATION_MIN_WORDS", "3"))
+
+# Speculative LLM work per session, waiting for the final transcript
+speculations = {}
+speculation_locks = {}  # Serializes replacing a session's speculation
 
-# Global rate limiter
-rate_limiter = RateLimiter()
+# Relay Murf audio to the browser chunk by chunk instead of one blob per turn
+PROGRESSIVE_AUDIO = os.getenv("MURF_PROGRESSIVE_AUDIO", "true").strip().lower() == "true"
+
+# Enhanced Murf configuration for better audio quality (shared by pre-warm and turns)
+MURF_VOICE_SETTINGS = {
+    "voice_id": os.getenv("MURF_DEFAULT_VOICE_ID", "en-US-terrell").strip(),
+    "sample_rate": 44100,  # Standard sample rate
+    "channel_type": "MONO",
+    "audio_format": "WAV",  # Ensure WAV format
+    "style": "Conversational",
+    "rate": 0,
+    "pitch": 0,
+    "variation": 1,
+}
+# Voice settings alone key the TTS cache; the stream config adds how audio reaches the client
+MURF_STREAM_CONFIG = {**MURF_VOICE_SETTINGS, "progressive": PROGRESSIVE_AUDIO}
+
+# --- Rate limits for LLM turns: per session and per Gemini API key ---
+rate_limiter = TurnRateLimiter(session_store)
+
+# Gauges and counters exposed on /metrics next to the turn latency histograms;
+# point-in-time values are gauges, values that only ever increase are *_total counters
+turn_metrics.register_gauge("vocalix_tts_cache", "TTS cache entries and bytes held in memory.",
+                            lambda: {kind: tts_cache.stats()[kind] for kind in ("memory_entries", "memory_bytes")})
+turn_metrics.register_counter("vocalix_tts_cache_lookups_total", "TTS cache lookups: memory hits, disk hits, misses.",
+                              lambda: {kind: tts_cache.stats()[kind] for kind in ("memory_hits", "disk_hits", "misses")})
+turn_metrics.register_gauge("vocalix_tool_cache_entries", "Tool results cached.", lambda: tool_cache.stats()["entries"])
+turn_metrics.register_counter("vocalix_tool_cache_calls_total", "Cacheable tool calls: hits, misses, coalesced.",
+                              lambda: {kind: tool_cache.stats()[kind] for kind in ("hits", "misses", "coalesced")})
+turn_metrics.register_gauge("vocalix_murf_pool", "Murf connections idle and warming.",
+                            lambda: {kind: murf_pool.stats()[kind] for kind in ("idle", "warming")})
+turn_metrics.register_counter("vocalix_murf_connections_opened_total", "Murf connections opened.",
+                              lambda: murf_pool.connections_opened)
+turn_metrics.register_counter("vocalix_murf_connections_reused_total", "Murf turns served by an already-open connection.",
+                              lambda: murf_pool.connections_reused)
+turn_metrics.register_gauge("vocalix_chat_history", "Chat histories held in memory and their size.",
+                            llm.chat_histories.stats)
+turn_metrics.register_gauge("vocalix_active_turns", "Turns currently in flight.", lambda: len(active_turns))
+turn_metrics.register_gauge("vocalix_audio_ingest_sessions", "Sessions with a mic audio queue to STT.",
+                            lambda: ingest_totals.stats()["active_sessions"])
+for stat, help_text in (("frames_in", "Mic audio frames queued for STT."),
+                        ("frames_sent", "Mic audio frames handed to STT."),
+                        ("frames_dropped", "Mic audio frames dropped because the STT queue was full."),
+                        ("bytes_dropped", "Mic audio bytes dropped because the STT queue was full."),
+                        ("send_errors", "Mic audio frames STT failed to accept.")):
+    turn_metrics.register_counter(f"vocalix_audio_ingest_{stat}_total", help_text,
+                                  lambda stat=stat: ingest_totals.stats()[stat])
+for stat, name, help_text in (("seconds_in", "input_seconds", "Mic audio seconds seen by the VAD."),
+                              ("seconds_forwarded", "forwarded_seconds", "Mic audio seconds forwarded to STT."),
+                              ("seconds_suppressed", "suppressed_seconds", "Mic audio seconds suppressed as silence."),
+                              ("keepalives", "keepalives", "Silent keepalives sent while suppressing.")):
+    turn_metrics.register_counter(f"vocalix_vad_{name}_total", help_text, lambda stat=stat: vad_totals.stats()[stat])
 
 # --- Configure AssemblyAI (turn detection) ---
 try:
@@ -112,9 +173,9 @@ def read_root():
             return f.read()
 
 @app.get("/voices")
-def get_voices_endpoint():
+async def get_voices_endpoint():
     try:
-        murf_voices = tts.get_voices()
+        murf_voices = await tts.get_voices_async()
         formatted_voices = []
         for voice in murf_voices:
             voice_name = voice.get("name") or voice.get("voiceId")
@@ -131,7 +192,61 @@ def get_voices_endpoint():
         logger.error(f"Error fetching voices: {e}")
         raise HTTPException(status_code=500, detail="Could not fetch voices.")
 
+@app.get("/quota")
+def get_quota_endpoint(session_id: str = Query(...)):
+    """Remaining LLM turns for a live session: its own burst budget and its Gemini key's quota."""
+    api_keys = session_api_keys.get(session_id)
+    if not api_keys:
+        raise HTTPException(status_code=404, detail="Unknown or disconnected session.")
+    return {"session_id": session_id, **rate_limiter.quota(session_id, api_keys.get("gemini", ""))}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics_endpoint():
+    """Per-stage turn latency histograms and p50/p95/p99, plus cache and pool gauges, in Prometheus text format."""
+    return PlainTextResponse(turn_metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.on_event("shutdown")
+async def close_shared_resources():
+    """Releases pooled outbound HTTP connections and flushes session state."""
+    await http_client.close_all()
+    await asyncio.to_thread(llm.chat_histories.close)
+    session_store.close()
+
 # --- Utility Functions ---
+def resumable_session_id(requested):
+    """
+    The session ID a reconnecting client asked for, if it is well-formed, has history
+    and is not live on any worker; its lease is then taken for this worker.
+    Blocking (reads the session store), so call it off the event loop.
+    """
+    if not isinstance(requested, str):
+        return None
+    try:
+        session_id = str(uuid.UUID(requested))
+    except ValueError:
+        return None
+    if session_id in session_api_keys:
+        return None
+    if not session_store.claim_session(session_id, WORKER_ID):
+        logger.warning(f"⚠️ Session {session_id} is live on another worker, not resuming it")
+        return None
+    # The session may have moved on elsewhere since this worker last held it
+    llm.chat_histories.refresh(session_id)
+    if session_id not in llm.chat_histories:
+        session_store.release_session(session_id, WORKER_ID)
+        return None
+    return session_id
+
+async def hold_session_lease(session_id: str):
+    """Renews this worker's lease on a live session until cancelled."""
+    while True:
+        await asyncio.sleep(SESSION_LEASE_SECONDS / 3)
+        try:
+            if not await asyncio.to_thread(session_store.claim_session, session_id, WORKER_ID):
+                logger.warning(f"⚠️ Lost the lease on session {session_id} to another worker")
+        except Exception as e:
+            logger.error(f"❌ Could not renew the lease on session {session_id}: {e}")
+
 def normalize_text(text: str) -> str:
     """Remove punctuation and convert to lowercase for comparison"""
     return re.sub(r'[^\w\s]', '', text.strip().lower())
@@ -145,160 +260,535 @@ def schedule_websocket_message(loop: asyncio.AbstractEventLoop, websocket: WebSo
     except Exception as e:
         logger.error(f"Error scheduling WebSocket message: {e}")
 
-# --- Enhanced LLM streaming WITH RATE LIMITING ---
-def schedule_llm_streaming(loop: asyncio.AbstractEventLoop, websocket: WebSocket, user_input: str, turn_number: int, session_id: str):
-    """Enhanced LLM streaming WITH CHAT HISTORY AND RATE LIMITING."""
-    
-    def stream_llm_response():
+async def send_websocket_message(websocket: WebSocket, message: dict):
+    """WebSocket message sending from the event loop."""
+    try:
+        await websocket.send_text(json.dumps(message))
+    except Exception as e:
+        logger.error(f"Error sending WebSocket message: {e}")
+
+# --- LLM stage: Gemini → speech chunks, buffered for the turn that consumes them ---
+class LLMStream:
+    """Runs Gemini for one user input in the executor and buffers its speech chunks."""
+
+    def __init__(self, session_id: str, user_input: str, api_keys: dict, key_counted: bool = False):
+        self.session_id = session_id
+        self.user_input = user_input
+        self.normalized = normalize_text(user_input)
+        self.api_keys = api_keys
+        self.key_counted = key_counted  # Already counted against the API key's quota (speculations)
+        # History version the response was generated against (read with the history, off the
+        # loop); a speculation is stale if it moves
+        self.history_version = None
+        self.chat_instance = None
+        self.replayed = 0  # Contents the chat was started with; anything after them is this turn
+        self.chunks = asyncio.Queue()  # Speech chunks, then None (or an exception) at the end
+        # Lets an interrupted turn stop the Gemini stream running in the executor
+        self.cancel_event = threading.Event()
+        # Latency marks for the turn that consumes this stream (it adds end_of_turn)
+        self.timings = TurnTimings()
+
+        self.task = asyncio.create_task(self._produce())
+
+    async def _produce(self):
+        self.timings.mark("llm_request_start")
         try:
+            self.history_version, self.chat_instance = await run_blocking(self._start_chat)
+            self.replayed = len(self.chat_instance.history)
+            speech_chunks = llm.iter_speech_chunks(
+                llm.iter_llm_response_text(self.chat_instance, self.user_input, self.api_keys, self.cancel_event,
+                                           self.timings)
+            )
+            async for chunk in iterate_in_executor(speech_chunks):
+                self.chunks.put_nowait(chunk)
+            self.timings.mark("final_llm_text")
+            self.chunks.put_nowait(None)
+        except Exception as e:
+            self.chunks.put_nowait(e)
 
-            # ⭐ MODIFIED: Fetch keys for the current session
-            api_keys = session_api_keys.get(session_id)
-            if not api_keys:
-                logger.error(f"API keys not found for session {session_id}. Aborting LLM stream.")
-                schedule_websocket_message(loop, websocket, {
-                    "type": "llm_error", "error": "API keys not found for session. Please reconnect."
-                })
+    def _start_chat(self):
+        """Loads the session's history once for this turn and builds the chat from it (blocking)."""
+        version = llm.chat_histories.version(self.session_id)
+        return version, llm.start_chat_session(self.session_id, self.api_keys, self.user_input)
+
+    async def iter_chunks(self):
+        """Yields buffered and upcoming speech chunks until the response ends."""
+        while True:
+            item = await self.chunks.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def matches(self, user_input: str) -> bool:
+        """True if this speculation answered the same words against the same history."""
+        # Chat not built yet: it will be, from the history as it is now
+        history_current = (self.history_version is None
+                           or self.history_version == llm.chat_histories.loaded_version(self.session_id))
+        return (self.normalized == normalize_text(user_input)
+                and history_current
+                and not self.cancel_event.is_set())
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.task.cancel()
+
+# --- Speculative LLM start on stable partial transcripts ---
+def is_stable_partial(event: TurnEvent) -> bool:
+    """A partial worth speculating on: long enough and likely to be the end of the turn."""
+    confidence = getattr(event, 'end_of_turn_confidence', None) or 0.0
+    return (confidence >= SPECULATION_MIN_CONFIDENCE
+            and len(event.transcript.split()) >= SPECULATION_MIN_WORDS)
+
+def schedule_speculation(loop: asyncio.AbstractEventLoop, session_id: str, partial_text: str):
+    """Schedules a speculative LLM start on the server loop (callable from the STT thread)."""
+    return asyncio.run_coroutine_threadsafe(start_speculation(session_id, partial_text), loop)
+
+async def start_speculation(session_id: str, partial_text: str):
+    """Starts Gemini on a partial transcript, replacing any speculation on different words."""
+    # One at a time per session, so each start counts against the quota exactly once
+    async with speculation_locks.setdefault(session_id, asyncio.Lock()):
+        current = speculations.get(session_id)
+        if current and current.normalized == normalize_text(partial_text):
+            return
+        if current:
+            logger.info(f"♻️ Partial changed, restarting speculation for session {session_id}")
+            speculations.pop(session_id).cancel()
+
+        # Speculation is a latency optimisation only: skip it when short on capacity or quota
+        api_keys = session_api_keys.get(session_id)
+        if not api_keys or turn_slots.locked():
+            return
+        # Every start is a real upstream request, so it counts against the key's quota even if
+        # it is discarded; the session's bucket is spent only if it becomes the turn
+        if await asyncio.to_thread(rate_limiter.try_acquire_speculation, session_id, api_keys.get("gemini", "")):
+            return
+
+        logger.info(f"🔮 Speculative LLM start on partial: '{partial_text}'")
+        speculations[session_id] = LLMStream(session_id, partial_text, api_keys, key_counted=True)
+
+def take_speculation(session_id: str, user_input: str):
+    """Returns the session's speculation if it matches the final transcript, else discards it."""
+    speculation = speculations.pop(session_id, None)
+    if not speculation:
+        return None
+    if speculation.matches(user_input):
+        logger.info(f"✅ Speculation committed for session {session_id}")
+        return speculation
+    logger.info(f"🗑️ Speculation discarded for session {session_id}: '{speculation.user_input}' ≠ '{user_input}'")
+    speculation.cancel()
+    return None
+
+# --- Enhanced LLM streaming WITH RATE LIMITING ---
+def schedule_llm_streaming(loop: asyncio.AbstractEventLoop, websocket: WebSocket, user_input: str, turn_number: int,
+                           session_id: str, end_of_turn_at: float = None):
+    """Schedules the turn pipeline on the server loop (callable from the STT thread).
+    end_of_turn_at is the monotonic time the end-of-turn event arrived, for latency metrics."""
+    return asyncio.run_coroutine_threadsafe(
+        start_turn(websocket, user_input, turn_number, session_id, end_of_turn_at), loop
+    )
+
+async def start_turn(websocket: WebSocket, user_input: str, turn_number: int, session_id: str,
+                     end_of_turn_at: float = None):
+    """Makes the new turn the session's owner, interrupting whatever was still answering."""
+    end_of_turn_at = end_of_turn_at or time.monotonic()
+    # One at a time per session: a turn arriving while an older one is being cancelled
+    # waits, then cancels whichever turn owns the session by then
+    async with turn_start_locks.setdefault(session_id, asyncio.Lock()):
+        await cancel_active_turn(websocket, session_id, reason="new_turn")
+        llm_stream = take_speculation(session_id, user_input)
+        task = asyncio.create_task(
+            run_turn_pipeline(websocket, user_input, turn_number, session_id, llm_stream, end_of_turn_at)
+        )
+        task.turn_number = turn_number
+        active_turns[session_id] = task
+        task.add_done_callback(
+            lambda done: active_turns.pop(session_id, None) if active_turns.get(session_id) is done else None
+        )
+
+async def cancel_active_turn(websocket: WebSocket, session_id: str, reason: str, notify_client: bool = True):
+    """Cancels the session's in-flight LLM + TTS work and tells the client to flush playback."""
+    task = active_turns.pop(session_id, None)
+    if not task or task.done():
+        return
+
+    logger.info(f"🛑 Interrupting turn #{task.turn_number} for session {session_id} ({reason})")
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"Error while cancelling turn #{task.turn_number}: {e}")
+
+    if notify_client:
+        await send_websocket_message(websocket, {
+            "type": "playback_interrupt",
+            "turn_number": task.turn_number,
+            "reason": reason,
+            "timestamp": datetime.now().isoformat()
+        })
+
+async def stream_turn_audio(websocket: WebSocket, session_id: str, turn_number: int,
+                            murf_api_key: str, text_queue: asyncio.Queue, timings: TurnTimings = None):
+    """Feeds queued text chunks to the session's Murf connection until None arrives."""
+    binary_audio = session_id in binary_audio_sessions
+
+    # Reuse the session's warm Murf connection with a fresh context for this turn; acquired
+    # while the LLM is still producing its first chunk, not after it
+    acquire_task = asyncio.create_task(murf_pool.acquire(session_id, murf_api_key, **MURF_STREAM_CONFIG))
+    if timings:
+        def mark_murf_ready(task):
+            # When the connection is actually ready, not when the first text reaches it
+            if not task.cancelled() and task.exception() is None:
+                timings.mark("murf_ready")
+        acquire_task.add_done_callback(mark_murf_ready)
+    murf = None
+    completed = False
+    try:
+        # Short replies usually end moments after their first chunk: wait briefly for the rest,
+        # so a reply seen whole can come from the TTS cache instead of Murf
+        pending = [await text_queue.get()]
+        deadline = asyncio.get_running_loop().time() + TTS_CACHE_LOOKUP_WAIT
+        while pending[-1] is not None and tts_cache_key(" ".join(pending), **MURF_VOICE_SETTINGS):
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(text_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        spoken = [chunk for chunk in pending if chunk is not None]
+        if pending[-1] is None:
+            cache_key = tts_cache_key(" ".join(spoken), **MURF_VOICE_SETTINGS)
+            cached_wav = await asyncio.to_thread(tts_cache.get, cache_key) if cache_key else None
+            if cached_wav:
+                logger.info(f"💾 TTS cache hit for turn {turn_number}, skipping Murf")
+                await send_complete_wav(websocket, turn_number, cached_wav, binary_audio, timings)
                 return
-            
-            # Check rate limit before making API call
-            if not rate_limiter.can_make_request():
-                logger.warning("⚠️ Rate limit reached - skipping request")
-                schedule_websocket_message(loop, websocket, {
+
+        murf = await asyncio.shield(acquire_task)
+
+        # Pass client WebSocket and turn number to Murf client; the audio is kept for the
+        # cache until the reply grows too long to be cached
+        murf.begin_turn(turn_number, websocket, binary_audio=binary_audio, timings=timings,
+                        cacheable=tts_cache_key(" ".join(spoken), **MURF_VOICE_SETTINGS) is not None)
+        logger.info(f"🎵 Murf WebSocket ready for turn {turn_number}")
+
+        # Push each chunk as soon as the LLM produces it
+        for chunk in spoken:
+            logger.info("🗣️ Sending to TTS: '%s'", chunk, extra=TTS_TEXT_LOG)
+            await murf.send_text_chunk(chunk, end=False)
+        ended = pending[-1] is None
+        while not ended:
+            chunk = await text_queue.get()
+            if chunk is None:
+                ended = True
+                continue
+            spoken.append(chunk)
+            if murf.cacheable and not tts_cache_key(" ".join(spoken), **MURF_VOICE_SETTINGS):
+                murf.stop_caching()
+            logger.info("🗣️ Sending to TTS: '%s'", chunk, extra=TTS_TEXT_LOG)
+            await murf.send_text_chunk(chunk, end=False)
+        await murf.send_text_chunk("", end=True)
+
+        # Wait for Murf to finish streaming audio
+        await murf.wait_for_complete(timeout=90)
+        completed = murf.completion_event.is_set()
+        logger.info(f"🎵 Audio streaming complete for turn {turn_number}")
+
+        # The reply is complete now, so whether it can be cached is known
+        cache_key = tts_cache_key(" ".join(spoken), **MURF_VOICE_SETTINGS) if murf.cacheable else None
+        turn_wav = murf.turn_audio() if cache_key else None
+        if turn_wav:
+            await asyncio.to_thread(tts_cache.put, cache_key, turn_wav)
+    except asyncio.CancelledError:
+        # Barge-in: stop synthesis for this context; the socket itself stays reusable
+        if murf:
+            await murf.cancel_turn()
+        completed = True
+        raise
+    finally:
+        if murf is not None:
+            await murf_pool.release(session_id, murf, reusable=completed)
+        else:
+            release_when_acquired(session_id, acquire_task)
+
+# Connections acquired for turns that ended before using them, being handed back to the pool
+pending_murf_releases = set()
+
+def release_when_acquired(session_id: str, acquire_task: asyncio.Task):
+    """Returns an unused Murf connection to the pool once it is up, without making the turn wait."""
+    async def release():
+        try:
+            murf = await acquire_task
+        except Exception as e:
+            logger.info(f"🎵 Unused Murf connection for session {session_id} failed to open: {e}")
+            return
+        await murf_pool.release(session_id, murf)
+
+    task = asyncio.create_task(release())
+    pending_murf_releases.add(task)
+    task.add_done_callback(pending_murf_releases.discard)
+
+async def run_turn_pipeline(websocket: WebSocket, user_input: str, turn_number: int, session_id: str,
+                            llm_stream: LLMStream = None, end_of_turn_at: float = None):
+    """Enhanced LLM streaming WITH CHAT HISTORY AND RATE LIMITING, as a task on the server loop.
+    llm_stream is a committed speculation whose Gemini call is already under way."""
+    try:
+        # ⭐ MODIFIED: Fetch keys for the current session
+        api_keys = session_api_keys.get(session_id)
+        if not api_keys:
+            logger.error(f"API keys not found for session {session_id}. Aborting LLM stream.")
+            await send_websocket_message(websocket, {
+                "type": "llm_error", "error": "API keys not found for session. Please reconnect."
+            })
+            return
+
+        # ⭐ MODIFIED: Use Murf API key from session data
+        murf_api_key = api_keys.get("murf", "").strip()
+        if not murf_api_key:
+            raise ValueError("MURF_API_KEY is missing")
+
+        # Global cap on turns in flight; wait briefly for a slot before giving up
+        if turn_slots.locked():
+            logger.warning(f"⏳ All {MAX_CONCURRENT_TURNS} turn slots busy, turn #{turn_number} is queued")
+        try:
+            await asyncio.wait_for(turn_slots.acquire(), timeout=TURN_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            if llm_stream is not None:
+                llm_stream.cancel()
+            await send_websocket_message(websocket, {
+                "type": "llm_error",
+                "turn_number": turn_number,
+                "error": "Server is busy right now. Please try again in a moment.",
+                "timestamp": datetime.now().isoformat()
+            })
+            return
+
+        try:
+            # Count the turn against both rate limits in one atomic check-and-consume; a committed
+            # speculation was counted against the key when it started, so only the session pays here
+            limit_reason = await asyncio.to_thread(rate_limiter.try_acquire, session_id, api_keys.get("gemini", ""),
+                                                   llm_stream is not None and llm_stream.key_counted)
+            if limit_reason:
+                logger.warning(f"⚠️ Rate limit reached for session {session_id} - skipping request")
+                if llm_stream is not None:
+                    llm_stream.cancel()
+                await send_websocket_message(websocket, {
                     "type": "llm_error",
                     "turn_number": turn_number,
-                    "error": "Daily quota limit reached. Try again tomorrow!",
+                    "error": limit_reason,
                     "timestamp": datetime.now().isoformat()
                 })
                 return
-            
-            rate_limiter.add_request()
-            logger.info(f"🤖 Starting LLM streaming for turn #{turn_number}: '{user_input}'")
-            logger.info(f"📋 Using session ID: {session_id}")
-            logger.info(f"📊 API calls used: {len(rate_limiter.requests)}/{rate_limiter.max_requests}")
-            
-            schedule_websocket_message(loop, websocket, {
-                "type": "llm_streaming_start",
-                "turn_number": turn_number,
-                "message": f"🤖 AI responding to turn #{turn_number}...",
-                "timestamp": datetime.now().isoformat()
-            })
 
-            # Import and use the streaming function WITH chat history
-            from services.llm import get_streaming_llm_response, chat_histories
-            streaming_response, chat_instance = get_streaming_llm_response(
-                session_id, user_input, api_keys=api_keys
-            )
-            
-            # Since our LLM function returns the full response in a list, join it.
-            accumulated_response = "".join(streaming_response)
-
-            # ⭐ MODIFIED: Use Murf API key from session data
-            murf_api_key = api_keys.get("murf", "").strip()
-            if not murf_api_key:
-                raise ValueError("MURF_API_KEY is missing")
-            voice_id = os.getenv("MURF_DEFAULT_VOICE_ID", "en-US-terrell").strip()
-
-            async def run_murf_streaming():
-                # nonlocal accumulated_response
-                text_to_speak = accumulated_response
-
-                # NEW: Check for and handle the open URL action
-                # ** THE ROBUST FIX IS HERE **
-                # Use a regular expression to reliably find the action and extract the URL
-                match = re.search(r"ACTION_OPEN_URL::(https?://[^\s]+)", accumulated_response)
-
-                if match:
-                    try:
-                        url_to_open = match.group(1).strip()
-                        # Remove the entire action string from the text to be spoken
-                        text_to_speak = accumulated_response.replace(match.group(0), "").strip()
-                        
-                        logger.info(f"🖥️ ACTION DETECTED: Open URL '{url_to_open}'. Spoken response: '{text_to_speak}'")
-                        
-                        schedule_websocket_message(loop, websocket, {
-                            "type": "open_url",
-                            "url": url_to_open,
-                            "turn_number": turn_number,
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    except Exception as e:
-                        logger.error(f"Error parsing ACTION_OPEN_URL with regex: {e}")
-                        # Fallback to original text if regex parsing fails
-                        text_to_speak = accumulated_response
-
-                        
-                if not text_to_speak:
-                    text_to_speak = "As you wish, Sir."
-
-                # Send LLM chunk for UI display
-                schedule_websocket_message(loop, websocket, {
-                    "type": "llm_chunk", "turn_number": turn_number, "chunk": text_to_speak,
-                    "accumulated": text_to_speak, "timestamp": datetime.now().isoformat()
+            await _run_turn(websocket, user_input, turn_number, session_id, api_keys, murf_api_key, llm_stream,
+                            end_of_turn_at)
+        finally:
+            turn_slots.release()
+
+    except BaseException as e:
+        if llm_stream is not None:
+            llm_stream.cancel()
+        if not isinstance(e, Exception):
+            raise
+
+        logger.error(f"❌ LLM streaming error: {e}", exc_info=True)
+        await send_websocket_message(websocket, {
+            "type": "llm_error",
+            "turn_number": turn_number,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        })
+
+async def _run_turn(websocket: WebSocket, user_input: str, turn_number: int, session_id: str,
+                    api_keys: dict, murf_api_key: str, llm_stream: LLMStream = None, end_of_turn_at: float = None):
+    logger.info(f"🤖 Starting LLM streaming for turn #{turn_number}: '{user_input}'")
+    logger.info(f"📋 Using session ID: {session_id}")
+    if llm_stream is None:
+        llm_stream = LLMStream(session_id, user_input, api_keys)
+    timings = llm_stream.timings
+    timings.mark("end_of_turn", end_of_turn_at)
+
+    await send_websocket_message(websocket, {
+        "type": "llm_streaming_start",
+        "turn_number": turn_number,
+        "message": f"🤖 AI responding to turn #{turn_number}...",
+        "timestamp": datetime.now().isoformat()
+    })
+
+    # Text chunks flow from the LLM stage to the Murf task; None marks the end
+    text_queue = asyncio.Queue()
+    # Start Murf right away so the connection is up before the first chunk
+    murf_task = asyncio.create_task(
+        stream_turn_audio(websocket, session_id, turn_number, murf_api_key, text_queue, timings)
+    )
+
+    accumulated_response = ""
+    spoken_text = ""
+    try:
+        async for chunk in llm_stream.iter_chunks():
+            accumulated_response += chunk
+            text_to_speak = chunk
+
+            # NEW: Check for and handle the open URL action
+            # Use a regular expression to reliably find the action and extract the URL
+            match = re.search(r"ACTION_OPEN_URL::(https?://[^\s]+)", chunk)
+            if match:
+                url_to_open = match.group(1).strip()
+                # Remove the entire action string from the text to be spoken
+                text_to_speak = chunk.replace(match.group(0), "")
+                logger.info(f"🖥️ ACTION DETECTED: Open URL '{url_to_open}'")
+                await send_websocket_message(websocket, {
+                    "type": "open_url",
+                    "url": url_to_open,
+                    "turn_number": turn_number,
+                    "timestamp": datetime.now().isoformat()
                 })
-                
-                # Enhanced Murf configuration for better audio quality
-                async with MurfStreamInputWS(
-                    api_key=murf_api_key,
-                    voice_id=voice_id,
-                    sample_rate=44100,  # Standard sample rate
-                    channel_type="MONO",
-                    audio_format="WAV",  # Ensure WAV format
-                    style="Conversational",
-                    rate=0,
-                    pitch=0,
-                    variation=1,
-                ) as murf:
-                    # Pass client WebSocket and turn number to Murf client
-                    murf.client_websocket = websocket
-                    murf.turn_number = turn_number
-                    logger.info(f"🎵 Murf WebSocket connected for turn {turn_number}")
-
-                    logger.info(f"🗣️ Sending to TTS: '{text_to_speak}'")
-                    # Send the entire text at once and mark it as the end
-                    await murf.send_text_chunk(text_to_speak, end=True)    
-                    
-                    # ⭐ CRITICAL: Update chat history after streaming completes
-                    chat_histories[session_id] = chat_instance.history
-                    logger.info(f"💾 Chat history updated for session {session_id}: {len(chat_histories[session_id])} total messages")
-                    
-                    # Wait for Murf to finish streaming audio
-                    await murf.wait_for_complete(timeout=90)
-                    logger.info(f"🎵 Audio streaming complete for turn {turn_number}")
-
-            # Run the async Murf coroutine
-            murf_task = asyncio.run_coroutine_threadsafe(run_murf_streaming(), loop)
-            
-            # Wait for Murf to finish
-            try:
-                murf_task.result(timeout=120)
-            except Exception as e:
-                logger.error(f"Murf streaming task error: {e}")
 
-            logger.info("=" * 60)
-            logger.info(f"🤖 LLM RESPONSE COMPLETED for turn #{turn_number}")
-            logger.info(f"📝 Full Response: '{accumulated_response}'")
-            logger.info(f"📊 Response Length: {len(accumulated_response)} characters")
-            logger.info("=" * 60)
+            if not text_to_speak.strip():
+                continue
 
-            schedule_websocket_message(loop, websocket, {
-                "type": "llm_streaming_complete",
-                "turn_number": turn_number,
-                "full_response": accumulated_response,
-                "message": f"🤖 AI response complete for turn #{turn_number}",
-                "timestamp": datetime.now().isoformat()
+            spoken_text += text_to_speak
+            # Send LLM chunk for UI display
+            await send_websocket_message(websocket, {
+                "type": "llm_chunk", "turn_number": turn_number, "chunk": text_to_speak,
+                "accumulated": spoken_text, "timestamp": datetime.now().isoformat()
             })
+            text_queue.put_nowait(text_to_speak)
 
-        except Exception as e:
-            logger.error(f"❌ LLM streaming error: {e}", exc_info=True)
-            schedule_websocket_message(loop, websocket, {
-                "type": "llm_error",
-                "turn_number": turn_number,
-                "error": str(e),
-                "timestamp": datetime.now().isoformat()
+        if not spoken_text.strip():
+            spoken_text = "As you wish, Sir."
+            await send_websocket_message(websocket, {
+                "type": "llm_chunk", "turn_number": turn_number, "chunk": spoken_text,
+                "accumulated": spoken_text, "timestamp": datetime.now().isoformat()
             })
+            text_queue.put_nowait(spoken_text)
+    except BaseException:
+        # Interrupted or failed: stop Gemini and Murf, and leave the chat history untouched
+        llm_stream.cancel()
+        murf_task.cancel()
+        raise
+    finally:
+        text_queue.put_nowait(None)
+
+    # ⭐ CRITICAL: Update chat history once the full response has streamed
+    try:
+        await asyncio.to_thread(llm.chat_histories.append_turn, session_id, llm_stream.chat_instance.history,
+                                llm_stream.replayed)
+        logger.info(f"💾 Chat history updated for session {session_id}: "
+                    f"{llm.chat_histories.message_count(session_id)} messages kept, "
+                    f"{llm.chat_histories.memory_usage(session_id)} bytes")
+    except Exception as e:
+        logger.error(f"Could not update chat history for session {session_id}: {e}")
+
+    # Wait for Murf to finish
+    try:
+        await asyncio.wait_for(murf_task, timeout=120)
+    except asyncio.CancelledError:
+        murf_task.cancel()
+        raise
+    except Exception as e:
+        logger.error(f"Murf streaming task error: {e}")
+
+    logger.info("=" * 60)
+    logger.info(f"🤖 LLM RESPONSE COMPLETED for turn #{turn_number}")
+    logger.info("📝 Full Response: '%s'", accumulated_response, extra=RESPONSE_BODY_LOG)
+    logger.info(f"📊 Response Length: {len(accumulated_response)} characters")
+    logger.info("=" * 60)
+
+    timings.mark("complete")
+    turn_metrics.observe_turn(timings)
+    turn_timings = timings.as_dict()
+    logger.info(f"⏱️ Turn #{turn_number} timings (ms since end of turn): {turn_timings['stages_ms']}")
+
+    await send_websocket_message(websocket, {
+        "type": "llm_streaming_complete",
+        "turn_number": turn_number,
+        "full_response": accumulated_response,
+        "timings": turn_timings,
+        "message": f"🤖 AI response complete for turn #{turn_number}",
+        "timestamp": datetime.now().isoformat()
+    })
+
+def connect_streaming_client(api_key: str, websocket: WebSocket, loop, turn_counter: dict, last_turn: dict,
+                             session_id: str):
+    """
+    Creates the session's AssemblyAI client and connects it. Blocking (the SDK does a
+    synchronous WebSocket handshake), so call it from a worker thread.
+    Returns (client, seconds spent connecting).
+    """
+    started = time.monotonic()
+    streaming_client = StreamingClient(
+        StreamingClientOptions(
+            api_key=api_key,
+            api_host=ASSEMBLYAI_STREAMING_HOST
+        )
+    )
+
+    # Event handlers - UPDATED to pass session_id
+    streaming_client.on(StreamingEvents.Begin,
+        lambda client, event: handle_begin(event, websocket, loop))
+
+    streaming_client.on(StreamingEvents.Turn,
+        lambda client, event: handle_turn_with_llm_streaming(event, websocket, loop, turn_counter, last_turn, session_id))
+
+    streaming_client.on(StreamingEvents.Error,
+        lambda client, error: handle_error(error, websocket, loop))
+
+    streaming_client.on(StreamingEvents.Termination,
+        lambda client, event: handle_termination(event, websocket, loop))
+
+    # Enhanced streaming parameters for better turn detection
+    try:
+        streaming_client.connect(
+            StreamingParameters(
+                sample_rate=16000,
+                format_turns=True,
+                end_of_turn_confidence_threshold=0.7,
+                min_end_of_turn_silence_when_confident=800,
+                max_turn_silence=1500,
+                enable_extra_session_information=True,
+                punctuation_level="high"
+            )
+        )
+    except BaseException:
+        # A half-open client still has its threads (and maybe a session) running
+        disconnect_streaming_client(streaming_client)
+        raise
+    return streaming_client, time.monotonic() - started
+
+
+def disconnect_streaming_client(streaming_client):
+    """Terminates an AssemblyAI client, logging instead of raising. Blocking."""
+    try:
+        streaming_client.disconnect(terminate=True)
+    except Exception as e:
+        logger.error(f"Error disconnecting AssemblyAI client: {e}")
+
+
+def disconnect_when_connected(connect_future):
+    """Done-callback for a connect nobody will use any more: terminates the client once it exists."""
+    if connect_future.cancelled() or connect_future.exception() is not None:
+        return
+    streaming_client, _ = connect_future.result()
+    logger.info("🧹 Disconnecting AssemblyAI client whose session went away during setup")
+    setup_executor.submit(disconnect_streaming_client, streaming_client)
+
+
+def prewarm_gemini(session_id: str, gemini_api_key: str):
+    """Builds (and caches) the Gemini client for the session's key before its first turn."""
+    if not gemini_api_key:
+        return
+    started = time.monotonic()
+    try:
+        llm.get_model(gemini_api_key)
+        turn_metrics.observe_setup("gemini_client", time.monotonic() - started)
+    except Exception as e:
+        logger.warning(f"⚠️ Gemini pre-warm failed for session {session_id}: {e}")
 
-    threading.Thread(target=stream_llm_response, daemon=True).start()
 
 # --- WebSocket endpoint with enhanced audio handling ---
 @app.websocket("/ws")
@@ -309,6 +799,10 @@ async def websocket_endpoint(websocket: WebSocket):
     session_id = str(uuid.uuid4())
     loop = asyncio.get_running_loop()
     streaming_client = None
+    audio_ingest = None
+    voice_gate = None
+    reframer = None
+    lease_task = None
 
     # Turn tracking
     turn_counter = {'count': 0}
@@ -317,6 +811,7 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         # ⭐ MODIFIED: First message must be API key configuration
         config_data = await websocket.receive_text()
+        setup_started = time.monotonic()
         config = json.loads(config_data)
 
         if config.get("type") != "configure_api_keys":
@@ -324,63 +819,94 @@ async def websocket_endpoint(websocket: WebSocket):
             logger.warning("Client did not send API keys first. Connection closed.")
             return
         
+        # Continue a previous conversation if the client still has its session ID
+        resumed_session_id = await asyncio.to_thread(resumable_session_id, config.get("resume_session_id"))
+        if resumed_session_id:
+            session_id = resumed_session_id
+            logger.info(f"🔁 Resuming session {session_id}")
+        else:
+            await asyncio.to_thread(session_store.claim_session, session_id, WORKER_ID)
+        # While connected, the lease keeps other workers from handing this session to anyone else
+        lease_task = asyncio.create_task(hold_session_lease(session_id))
+
         # Store the keys for this session
         session_api_keys[session_id] = config.get("keys", {})
         logger.info(f"✅ API keys received and stored for session {session_id}")
 
+        if config.get("capabilities", {}).get("binary_audio"):
+            binary_audio_sessions.add(session_id)
+
         assembly_api_key = session_api_keys[session_id].get("assemblyai")
         if not assembly_api_key:
             await websocket.send_text(json.dumps({"type": "error", "message": "AssemblyAI API key not provided."}))
             await websocket.close(code=1008)
             return
-        
-        streaming_client = StreamingClient(
-            StreamingClientOptions(
-                api_key=assembly_api_key,
-                api_host="streaming.assemblyai.com"
-            )
-        )
 
-        # Event handlers - UPDATED to pass session_id
-        streaming_client.on(StreamingEvents.Begin,
-            lambda client, event: handle_begin(event, websocket, loop))
-        
-        streaming_client.on(StreamingEvents.Turn,
-            lambda client, event: handle_turn_with_llm_streaming(event, websocket, loop, turn_counter, last_turn, session_id))
-        
-        streaming_client.on(StreamingEvents.Error,
-            lambda client, error: handle_error(error, websocket, loop))
-        
-        streaming_client.on(StreamingEvents.Termination,
-            lambda client, event: handle_termination(event, websocket, loop))
+        # Open the session's Murf connection now so the first turn starts warm
+        murf_api_key = session_api_keys[session_id].get("murf", "").strip()
+        if murf_api_key:
+            await murf_pool.prewarm(session_id, murf_api_key, **MURF_STREAM_CONFIG)
 
-        # Enhanced streaming parameters for better turn detection
-        streaming_client.connect(
-            StreamingParameters(
-                sample_rate=16000,
-                format_turns=True,
-                end_of_turn_confidence_threshold=0.7,
-                min_end_of_turn_silence_when_confident=800,
-                max_turn_silence=1500,
-                enable_extra_session_information=True,
-                punctuation_level="high"
+        # The AssemblyAI handshake blocks, so it runs on the setup executor alongside the
+        # Gemini client setup (Murf is already warming) and never stalls the conversations on this loop
+        stt_future = asyncio.ensure_future(run_setup(connect_streaming_client, assembly_api_key, websocket, loop,
+                                                     turn_counter, last_turn, session_id))
+        try:
+            # Shielded: the connect finishes on its thread regardless, and its client must not be lost
+            stt_connect, _ = await asyncio.gather(
+                asyncio.shield(stt_future),
+                run_setup(prewarm_gemini, session_id, session_api_keys[session_id].get("gemini", "").strip()),
             )
-        )
+        except BaseException:
+            # Cancelled (or failed) mid-setup: streaming_client is never assigned, so clean up here
+            stt_future.add_done_callback(disconnect_when_connected)
+            raise
+        streaming_client, stt_connect_seconds = stt_connect
+        setup_seconds = time.monotonic() - setup_started
+        turn_metrics.observe_setup("stt_connect", stt_connect_seconds)
+        turn_metrics.observe_setup("ready", setup_seconds)
 
-        logger.info("🚀 Connected to AssemblyAI with Enhanced Turn Detection and Chat History!")
+        logger.info(f"🚀 Connected to AssemblyAI with Enhanced Turn Detection and Chat History! "
+                    f"(ready in {setup_seconds * 1000:.0f} ms, STT handshake {stt_connect_seconds * 1000:.0f} ms)")
+
+        # Mic frames reach the SDK from a sender thread, never from the event loop;
+        # on that thread the VAD drops long silences we would otherwise pay to transcribe,
+        # and the re-framer hands the SDK uniform AUDIO_FRAME_MS frames whatever the client sends
+        reframer = AudioReframer(streaming_client.stream, name=session_id)
+        stt_sink = reframer.process
+        if VAD_ENABLED:
+            voice_gate = VoiceActivityGate(reframer.process, name=session_id, keepalive_ms=AUDIO_FRAME_MS)
+            stt_sink = voice_gate.process
+
+        def flush_audio_stages():
+            # On the ingest sender thread, after its last frame: the stages are never touched concurrently
+            if voice_gate:
+                voice_gate.flush()
+            reframer.flush()
+
+        audio_ingest = AudioIngest(stt_sink, name=session_id, on_close=flush_audio_stages)
 
         await websocket.send_text(json.dumps({
             "type": "connection_established",
             "message": "Connected to AssemblyAI with Enhanced Turn Detection and Chat History",
             "session_id": session_id,
+            "audio_transport": "binary" if session_id in binary_audio_sessions else "json",
+            "setup_ms": round(setup_seconds * 1000),
+            "stt_connect_ms": round(stt_connect_seconds * 1000),
             "timestamp": datetime.now().isoformat()
         }))
 
-        # Main WebSocket loop
+        # Main WebSocket loop: binary frames are mic audio, text frames are control messages
         while True:
             try:
-                data = await websocket.receive_bytes()
-                streaming_client.stream(data)
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    logger.info("Client disconnected")
+                    break
+                if message.get("bytes") is not None:
+                    audio_ingest.put(message["bytes"])
+                elif message.get("text"):
+                    await handle_client_control(websocket, session_id, message["text"])
             except WebSocketDisconnect:
                 logger.info("Client disconnected")
                 break
@@ -400,16 +926,48 @@ async def websocket_endpoint(websocket: WebSocket):
         }))
 
     finally:
+        await cancel_active_turn(websocket, session_id, reason="disconnect", notify_client=False)
+        if session_id in speculations:
+            speculations.pop(session_id).cancel()
+        turn_start_locks.pop(session_id, None)
+        speculation_locks.pop(session_id, None)
         if streaming_client:
             try:
                 logger.info("🧹 Cleaning up AssemblyAI connection...")
-                streaming_client.disconnect(terminate=True)
+                # Both block (queued audio is flushed, then the SDK waits on its threads)
+                if audio_ingest:
+                    await asyncio.to_thread(audio_ingest.close)
+                if reframer:
+                    logger.info(f"🎚️ Re-framer for session {session_id}: {reframer.stats()}")
+                if voice_gate:
+                    logger.info(f"🔇 VAD for session {session_id}: {voice_gate.stats()}")
+                await asyncio.to_thread(streaming_client.disconnect, terminate=True)
                 logger.info("✅ AssemblyAI connection cleaned up")
             except Exception as e:
                 logger.error(f"Error during cleanup: {e}")
+        await murf_pool.close_session(session_id)
+        binary_audio_sessions.discard(session_id)
         if session_id in session_api_keys:
             del session_api_keys[session_id]
             logger.info(f"🧹 Cleaned up API keys for session {session_id}")
+        if lease_task:
+            lease_task.cancel()
+            await asyncio.to_thread(session_store.release_session, session_id, WORKER_ID)
+
+async def handle_client_control(websocket: WebSocket, session_id: str, text: str):
+    """Handles JSON control messages the client sends after setup; malformed ones are ignored."""
+    try:
+        control = json.loads(text)
+    except ValueError:
+        control = None
+    if not isinstance(control, dict):
+        logger.warning(f"⚠️ Ignoring malformed control message from session {session_id}: {text[:100]!r}")
+        return
+
+    if control.get("type") == "interrupt":
+        await cancel_active_turn(websocket, session_id, reason="client")
+    else:
+        logger.info(f"📨 Ignoring unknown client message: {control.get('type')}")
 
 # --- Event Handlers ---
 def handle_begin(event: BeginEvent, websocket: WebSocket, loop: asyncio.AbstractEventLoop):
@@ -425,6 +983,7 @@ def handle_turn_with_llm_streaming(event: TurnEvent, websocket: WebSocket, loop:
     """Enhanced turn handler with chat history support."""
     if event.transcript:
         if event.end_of_turn:
+            end_of_turn_at = time.monotonic()
             current_time = time.time()
             current_normalized = normalize_text(event.transcript)
             last_normalized = normalize_text(last_turn['raw'])
@@ -480,11 +1039,14 @@ def handle_turn_with_llm_streaming(event: TurnEvent, websocket: WebSocket, loop:
 
             # Trigger LLM streaming → Murf streaming → Client audio streaming WITH SESSION ID
             if event.transcript.strip():
-                schedule_llm_streaming(loop, websocket, event.transcript, turn_counter['count'], session_id)
+                schedule_llm_streaming(loop, websocket, event.transcript, turn_counter['count'], session_id,
+                                       end_of_turn_at)
 
         else:
             # Partial transcript
-            logger.info(f"📝 Partial (Turn in progress): '{event.transcript}'")
+            logger.info("📝 Partial (Turn in progress): '%s'", event.transcript, extra=PARTIAL_TRANSCRIPT_LOG)
+            if SPECULATIVE_LLM and is_stable_partial(event):
+                schedule_speculation(loop, session_id, event.transcript)
             schedule_websocket_message(loop, websocket, {
                 "type": "partial_transcript",
                 "text": event.transcript,
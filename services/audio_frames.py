@@ -0,0 +1,26 @@
+# services/audio_frames.py - Binary WebSocket framing for audio sent to the browser
+
+import struct
+
+# version (u8), flags (u8), reserved (u16), turn_number (u32), sequence (u32) - little endian
+AUDIO_FRAME_HEADER = struct.Struct("<BBHII")
+AUDIO_FRAME_VERSION = 1
+
+FLAG_FINAL = 0x01  # Last frame of the turn (payload may be empty)
+FLAG_WAV = 0x02  # Payload is a complete WAV file instead of raw PCM
+
+
+def pack_audio_frame(turn_number: int, sequence: int, payload: bytes = b"",
+                     final: bool = False, wav: bool = False) -> bytes:
+    """Builds one binary audio frame: fixed header followed by the raw audio bytes."""
+    flags = (FLAG_FINAL if final else 0) | (FLAG_WAV if wav else 0)
+    header = AUDIO_FRAME_HEADER.pack(AUDIO_FRAME_VERSION, flags, 0, turn_number or 0, sequence)
+    return header + payload
+
+
+def unpack_audio_frame(frame: bytes):
+    """Splits a binary audio frame into (turn_number, sequence, flags, payload)."""
+    version, flags, _, turn_number, sequence = AUDIO_FRAME_HEADER.unpack_from(frame)
+    if version != AUDIO_FRAME_VERSION:
+        raise ValueError(f"Unsupported audio frame version: {version}")
+    return turn_number, sequence, flags, memoryview(frame)[AUDIO_FRAME_HEADER.size:]
@@ -0,0 +1,162 @@
+# services/audio_ingest.py - Bounded per-session mic audio queue drained to STT by a sender thread
+
+import logging
+import os
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Mic audio buffered per session before the overflow policy applies (16 kHz PCM16 = 32000 bytes/s)
+AUDIO_INGEST_MAX_SECONDS = float(os.getenv("AUDIO_INGEST_MAX_SECONDS", "5"))
+AUDIO_INGEST_BYTES_PER_SECOND = 16000 * 2
+# "drop_oldest" keeps the freshest audio (best for live turn detection); "drop_newest" keeps what is queued
+AUDIO_INGEST_OVERFLOW = os.getenv("AUDIO_INGEST_OVERFLOW", "drop_oldest").strip().lower()
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+
+
+class IngestTotals:
+    """Process-wide counters across all sessions, for /metrics."""
+
+    def __init__(self):
+        self.active_sessions = 0
+        self.frames_in = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.bytes_dropped = 0
+        self.send_errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active_sessions": self.active_sessions,
+                "frames_in": self.frames_in,
+                "frames_sent": self.frames_sent,
+                "frames_dropped": self.frames_dropped,
+                "bytes_dropped": self.bytes_dropped,
+                "send_errors": self.send_errors,
+            }
+
+
+ingest_totals = IngestTotals()
+
+
+class AudioIngest:
+    """
+    Decouples the event loop from the STT client: put() only appends to a bounded
+    queue, and a dedicated thread hands frames to sink (e.g. StreamingClient.stream).
+    When the queue is full, the overflow policy drops audio and counts it.
+    on_close, if given, runs on the sender thread after the last frame, so stateful
+    sinks can flush without racing it.
+    """
+
+    def __init__(self, sink, name: str = "", max_bytes: int = None, overflow: str = AUDIO_INGEST_OVERFLOW,
+                 on_close=None):
+        self.sink = sink
+        self.name = name
+        self.on_close = on_close
+        self.max_bytes = max_bytes or int(AUDIO_INGEST_MAX_SECONDS * AUDIO_INGEST_BYTES_PER_SECOND)
+        if overflow not in OVERFLOW_POLICIES:
+            logger.warning(f"⚠️ Unknown AUDIO_INGEST_OVERFLOW '{overflow}', using drop_oldest")
+            overflow = "drop_oldest"
+        self.overflow = overflow
+
+        self.frames_in = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.bytes_dropped = 0
+        self.send_errors = 0
+        self.max_queued_bytes = 0
+
+        self._frames = deque()
+        self._queued_bytes = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"vocalix-ingest-{name[:8]}", daemon=True)
+        self._thread.start()
+        ingest_totals.add(active_sessions=1)
+
+    def put(self, frame: bytes) -> bool:
+        """Queues one frame without blocking. Returns False if audio had to be dropped."""
+        dropped_frames = dropped_bytes = 0
+        with self._condition:
+            if self._closed:
+                return False
+            self.frames_in += 1
+            if self.overflow == "drop_newest" and self._queued_bytes + len(frame) > self.max_bytes:
+                dropped_frames, dropped_bytes = 1, len(frame)
+            else:
+                self._frames.append(frame)
+                self._queued_bytes += len(frame)
+                while self._queued_bytes > self.max_bytes and len(self._frames) > 1:
+                    oldest = self._frames.popleft()
+                    self._queued_bytes -= len(oldest)
+                    dropped_frames += 1
+                    dropped_bytes += len(oldest)
+                self.max_queued_bytes = max(self.max_queued_bytes, self._queued_bytes)
+                self._condition.notify()
+            self.frames_dropped += dropped_frames
+            self.bytes_dropped += dropped_bytes
+
+        ingest_totals.add(frames_in=1, frames_dropped=dropped_frames, bytes_dropped=dropped_bytes)
+        if dropped_frames and self.frames_dropped == dropped_frames:
+            logger.warning(f"⚠️ STT ingest for session {self.name} is backed up, dropping audio ({self.overflow})")
+        return not dropped_frames
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._frames and not self._closed:
+                    self._condition.wait()
+                if not self._frames:
+                    break
+                frame = self._frames.popleft()
+                self._queued_bytes -= len(frame)
+
+            try:
+                self.sink(frame)
+                self.frames_sent += 1
+                ingest_totals.add(frames_sent=1)
+            except Exception as e:
+                self.send_errors += 1
+                ingest_totals.add(send_errors=1)
+                if self.send_errors == 1:
+                    logger.error(f"❌ STT ingest for session {self.name} failed to send audio: {e}")
+
+        if self.on_close:
+            try:
+                self.on_close()
+            except Exception as e:
+                logger.error(f"❌ STT ingest for session {self.name} failed to flush on close: {e}")
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "frames_in": self.frames_in,
+                "frames_sent": self.frames_sent,
+                "frames_dropped": self.frames_dropped,
+                "bytes_dropped": self.bytes_dropped,
+                "send_errors": self.send_errors,
+                "queued_bytes": self._queued_bytes,
+                "max_queued_bytes": self.max_queued_bytes,
+            }
+
+    def close(self, timeout: float = 2.0):
+        """Sends what is still queued and runs on_close (up to timeout), then stops the sender thread."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=timeout)
+        ingest_totals.add(active_sessions=-1)
+        stats = self.stats()
+        logger.info(f"🎙️ STT ingest closed for session {self.name}: {stats['frames_sent']}/{stats['frames_in']} "
+                    f"frames sent, {stats['frames_dropped']} dropped, peak queue {stats['max_queued_bytes']} bytes")
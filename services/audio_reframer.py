@@ -0,0 +1,84 @@
+# services/audio_reframer.py - Re-frames mic audio into uniform fixed-duration frames for the STT stream
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+AUDIO_REFRAME_SAMPLE_RATE = 16000
+# Duration of every frame handed to the STT client. AssemblyAI v3 rejects frames
+# shorter than 50 ms; longer ones delay its turn detection.
+AUDIO_FRAME_MS = int(os.getenv("AUDIO_FRAME_MS", "50"))
+# Ring buffer capacity, in frames
+AUDIO_REFRAME_RING_FRAMES = 8
+
+
+class AudioReframer:
+    """
+    Cuts PCM16 mono audio of any chunk size into frames of exactly frame_ms.
+    Audio is staged in a preallocated ring buffer whose size is a whole number of
+    frames, so reads stay frame-aligned and a frame never wraps. Not thread-safe:
+    call from one thread (the session's ingest sender).
+    """
+
+    def __init__(self, sink, name: str = "", sample_rate: int = AUDIO_REFRAME_SAMPLE_RATE,
+                 frame_ms: int = AUDIO_FRAME_MS, ring_frames: int = AUDIO_REFRAME_RING_FRAMES):
+        self.sink = sink
+        self.name = name
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.capacity = self.frame_bytes * max(2, ring_frames)
+
+        self._ring = bytearray(self.capacity)
+        self._view = memoryview(self._ring)
+        self._read = 0  # Always a multiple of frame_bytes
+        self._fill = 0
+
+        self.chunks_in = 0
+        self.bytes_in = 0
+        self.frames_out = 0
+        self.padded_frames = 0
+
+    def process(self, chunk: bytes):
+        source = memoryview(chunk).cast("B")
+        self.chunks_in += 1
+        self.bytes_in += len(source)
+        offset = 0
+        while offset < len(source):
+            # Copy as much as fits, in at most two slices when the write wraps
+            count = min(len(source) - offset, self.capacity - self._fill)
+            write = (self._read + self._fill) % self.capacity
+            first = min(count, self.capacity - write)
+            self._view[write:write + first] = source[offset:offset + first]
+            self._view[:count - first] = source[offset + first:offset + count]
+            self._fill += count
+            offset += count
+            self._emit_ready()
+
+    def _emit_ready(self):
+        while self._fill >= self.frame_bytes:
+            # The STT client queues what it is given, so the frame leaves the ring as its own bytes
+            self.sink(bytes(self._view[self._read:self._read + self.frame_bytes]))
+            self._read = (self._read + self.frame_bytes) % self.capacity
+            self._fill -= self.frame_bytes
+            self.frames_out += 1
+
+    def flush(self):
+        """Pads a trailing partial frame with silence and sends it."""
+        if not self._fill:
+            return
+        start = self._read + self._fill
+        self._view[start:self._read + self.frame_bytes] = bytes(self.frame_bytes - self._fill)
+        self._fill = self.frame_bytes
+        self.padded_frames += 1
+        self._emit_ready()
+
+    def stats(self) -> dict:
+        return {
+            "frame_ms": self.frame_ms,
+            "chunks_in": self.chunks_in,
+            "bytes_in": self.bytes_in,
+            "frames_out": self.frames_out,
+            "padded_frames": self.padded_frames,
+            "buffered_bytes": self._fill,
+        }
@@ -0,0 +1,62 @@
+# services/executors.py - Bounded executors and turn capacity for the async turn pipeline
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Threads available for blocking SDK calls (Gemini, tools). Sized, never unbounded.
+LLM_EXECUTOR_WORKERS = int(os.getenv("LLM_EXECUTOR_WORKERS", "16"))
+# Threads for tool calls (web search, weather, ...) run in parallel within a turn
+TOOL_EXECUTOR_WORKERS = int(os.getenv("TOOL_EXECUTOR_WORKERS", "8"))
+# Threads for session setup (blocking STT handshakes, client construction) so a burst of
+# new connections queues here instead of starving other blocking work
+SESSION_SETUP_WORKERS = int(os.getenv("SESSION_SETUP_WORKERS", "16"))
+# Turns allowed to run LLM + TTS at the same time across all sessions
+MAX_CONCURRENT_TURNS = int(os.getenv("MAX_CONCURRENT_TURNS", "16"))
+# How long a turn may wait for a free slot before the client is told we're busy
+TURN_QUEUE_TIMEOUT = float(os.getenv("TURN_QUEUE_TIMEOUT_SECONDS", "30"))
+
+llm_executor = ThreadPoolExecutor(max_workers=LLM_EXECUTOR_WORKERS, thread_name_prefix="vocalix-llm")
+tool_executor = ThreadPoolExecutor(max_workers=TOOL_EXECUTOR_WORKERS, thread_name_prefix="vocalix-tool")
+setup_executor = ThreadPoolExecutor(max_workers=SESSION_SETUP_WORKERS, thread_name_prefix="vocalix-setup")
+turn_slots = asyncio.Semaphore(MAX_CONCURRENT_TURNS)
+
+_EXHAUSTED = object()
+
+
+async def run_blocking(func, *args):
+    """Runs a blocking call on the LLM executor without holding up the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(llm_executor, func, *args)
+
+
+async def run_setup(func, *args):
+    """Runs a blocking session-setup call on the setup executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(setup_executor, func, *args)
+
+
+def _close_iterator(iterator):
+    try:
+        iterator.close()
+    except ValueError:
+        # Still executing in another worker; it finishes on its own
+        pass
+
+
+async def iterate_in_executor(sync_iterable):
+    """Drives a blocking iterator from async code, one next() per executor job."""
+    loop = asyncio.get_running_loop()
+    iterator = iter(sync_iterable)
+    try:
+        while True:
+            item = await loop.run_in_executor(llm_executor, next, iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                break
+            yield item
+    finally:
+        if hasattr(iterator, "close"):
+            loop.run_in_executor(llm_executor, _close_iterator, iterator)
@@ -0,0 +1,270 @@
+# services/history.py - Bounded per-session chat history for Gemini
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from services.session_store import WriteBehindWriter
+
+logger = logging.getLogger(__name__)
+
+# Approximate tokens replayed per turn: recent turns plus the summary of older ones
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", "300"))
+# Sessions idle longer than this are dropped; beyond the cap the least recently used go first
+HISTORY_IDLE_TTL = float(os.getenv("HISTORY_IDLE_TTL_SECONDS", "3600"))
+HISTORY_MAX_SESSIONS = int(os.getenv("HISTORY_MAX_SESSIONS", "1000"))
+
+# Characters per token for English text; close enough for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+# Characters of each older message kept in the rolling summary
+SUMMARY_SNIPPET_CHARS = 160
+
+SUMMARY_PREFIX = "Summary of our earlier conversation: "
+SUMMARY_ACK = "Understood, Sir."
+RECALL_PREFIX = "Things from earlier in our conversation that may matter now:\n"
+RECALL_ACK = "Noted, Sir."
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _content_text(content) -> str:
+    """Text of a Gemini Content, ignoring function call/response parts."""
+    return "".join(part.text for part in content.parts if part.text).strip()
+
+
+def _snippet(text: str) -> str:
+    """First sentence of a message, capped for the summary."""
+    sentence = text.split(". ")[0]
+    if len(sentence) > SUMMARY_SNIPPET_CHARS:
+        sentence = sentence[:SUMMARY_SNIPPET_CHARS].rsplit(" ", 1)[0] + "..."
+    return sentence
+
+
+class SessionHistory:
+    """One session's history: compact (role, text) turns and a rolling summary."""
+
+    def __init__(self):
+        self.turns = []  # Each turn: [(role, text), ...], starting with the user message
+        self.summary = ""
+        self.version = 0  # Bumped on every change, so stale work can be detected
+        self.last_used = time.monotonic()
+
+    def tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(
+            estimate_tokens(text) for turn in self.turns for _, text in turn
+        )
+
+    def memory_bytes(self) -> int:
+        return len(self.summary.encode("utf-8")) + sum(
+            len(text.encode("utf-8")) for turn in self.turns for _, text in turn
+        )
+
+    def contents(self, recalled: list = None) -> list:
+        """History in the form start_chat accepts, with any recalled memories ahead of the window."""
+        contents = []
+        if self.summary:
+            contents.append({"role": "user", "parts": [SUMMARY_PREFIX + self.summary]})
+            contents.append({"role": "model", "parts": [SUMMARY_ACK]})
+        if recalled:
+            contents.append({"role": "user", "parts": [RECALL_PREFIX + "\n".join(f"- {s}" for s in recalled)]})
+            contents.append({"role": "model", "parts": [RECALL_ACK]})
+        for turn in self.turns:
+            contents.extend({"role": role, "parts": [text]} for role, text in turn)
+        return contents
+
+    def to_state(self) -> dict:
+        return {"turns": [[list(message) for message in turn] for turn in self.turns],
+                "summary": self.summary, "version": self.version}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        history = cls()
+        history.turns = [[tuple(message) for message in turn] for turn in state.get("turns", [])]
+        history.summary = state.get("summary", "")
+        history.version = state.get("version", 0)
+        return history
+
+    def fold_into_summary(self, turn):
+        """Moves an old turn into the rolling summary, dropping the oldest summary text past its budget."""
+        snippets = [f"{'User' if role == 'user' else 'You'}: {_snippet(text)}" for role, text in turn]
+        self.summary = " ".join(filter(None, [self.summary] + snippets))
+        max_chars = HISTORY_SUMMARY_TOKENS * CHARS_PER_TOKEN
+        if len(self.summary) > max_chars:
+            self.summary = "..." + self.summary[-max_chars:].split(" ", 1)[-1]
+
+
+class ChatHistoryStore:
+    """
+    Per-session chat histories held to a token budget, with idle TTL and LRU eviction.
+    With a memory_index, turns leaving the window are indexed there and recalled by relevance.
+    With a store, sessions are loaded from it on first use and written back behind each turn.
+    """
+
+    def __init__(self, token_budget: int = HISTORY_TOKEN_BUDGET, idle_ttl: float = HISTORY_IDLE_TTL,
+                 max_sessions: int = HISTORY_MAX_SESSIONS, memory_index=None, store=None):
+        self.memory_index = memory_index
+        self.store = store
+        self._writer = WriteBehindWriter(store) if store else None
+        self.token_budget = token_budget
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session_id -> SessionHistory, least recently used first
+        self._lock = threading.Lock()
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return self._get(session_id) is not None
+
+    def _load(self, session_id: str):
+        """Reads a session from the store (caller holds the lock); queued writes win."""
+        state = self._writer.pending(session_id) or self.store.load_history(session_id)
+        if not state:
+            return None
+        history = SessionHistory.from_state(state)
+        if self.memory_index:
+            self.memory_index.restore(session_id, state.get("memories", []))
+        logger.info(f"📂 Loaded chat history for session {session_id} from the session store")
+        return history
+
+    def _persist(self, session_id: str, history: SessionHistory):
+        """Queues the session's state for the write-behind writer (caller holds the lock)."""
+        if not self._writer:
+            return
+        state = history.to_state()
+        if self.memory_index:
+            state["memories"] = self.memory_index.export(session_id)
+        self._writer.save(session_id, state)
+
+    def _get(self, session_id: str, create: bool = False):
+        """Looks up a session (caller holds the lock), evicting idle ones along the way."""
+        now = time.monotonic()
+        history = self._sessions.get(session_id)
+        if history is not None and now - history.last_used > self.idle_ttl:
+            history = None
+            del self._sessions[session_id]
+        if history is None and self.store:
+            history = self._load(session_id)
+            if history is not None:
+                self._sessions[session_id] = history
+        if history is None and create:
+            history = self._sessions[session_id] = SessionHistory()
+        if history is not None:
+            history.last_used = now
+            self._sessions.move_to_end(session_id)
+
+        # Least recently used first: drop expired sessions, then any past the cap
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if oldest_id == session_id or (now - oldest.last_used <= self.idle_ttl
+                                           and len(self._sessions) <= self.max_sessions):
+                break
+            del self._sessions[oldest_id]
+            if self.memory_index:
+                self.memory_index.discard(oldest_id)
+            logger.info(f"🧹 Evicted chat history for session {oldest_id}")
+        return history
+
+    def contents(self, session_id: str, user_text: str = None) -> list:
+        """History to replay for the next turn (creates the session if new).
+        Given the user's words, past turns relevant to them are recalled into it."""
+        recalled = None
+        if user_text and self.memory_index:
+            recalled = self.memory_index.recall(session_id, user_text)
+        with self._lock:
+            return self._get(session_id, create=True).contents(recalled)
+
+    def version(self, session_id: str) -> int:
+        """Current version, loading the session from the store if needed (blocking)."""
+        with self._lock:
+            history = self._get(session_id)
+            return history.version if history else 0
+
+    def loaded_version(self, session_id: str) -> int:
+        """Version of a session already in memory (0 if it isn't); never touches the store."""
+        with self._lock:
+            history = self._sessions.get(session_id)
+            return history.version if history else 0
+
+    def message_count(self, session_id: str) -> int:
+        with self._lock:
+            history = self._get(session_id)
+            return sum(len(turn) for turn in history.turns) if history else 0
+
+    def append_turn(self, session_id: str, chat_history: list, replayed: int = 0):
+        """
+        Records the latest turn of a finished chat (SDK Content list) in compact form,
+        then folds the oldest turns into the summary until the window fits the budget.
+        The first `replayed` contents are the history the chat was started with; if the
+        request failed nothing follows them, and nothing is recorded.
+        """
+        # The turn starts at the last user message with text; function responses have none
+        start = len(chat_history)
+        for index in range(len(chat_history) - 1, replayed - 1, -1):
+            if chat_history[index].role == "user" and _content_text(chat_history[index]):
+                start = index
+                break
+        turn = [(content.role, _content_text(content)) for content in chat_history[start:]]
+        turn = [(role, text) for role, text in turn if text]
+        if not turn:
+            return
+
+        folded = []
+        with self._lock:
+            history = self._get(session_id, create=True)
+            history.turns.append(turn)
+            while len(history.turns) > 1 and history.tokens() > self.token_budget:
+                folded.append(history.turns.pop(0))
+                history.fold_into_summary(folded[-1])
+            history.version += 1
+
+        if self.memory_index:
+            for old_turn in folded:
+                self.memory_index.add_turn(session_id, old_turn)
+        with self._lock:
+            self._persist(session_id, history)
+
+    def refresh(self, session_id: str):
+        """
+        Drops this worker's in-memory copy of a session (and its recalled memories) so the
+        next use reloads it from the store, where another worker may have moved it on.
+        Without a store the memory copy is the only one, and is kept.
+        """
+        if not self.store:
+            return
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if self.memory_index:
+            self.memory_index.discard(session_id)
+
+    def discard(self, session_id: str):
+        """Forgets a session everywhere, including the store."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            if self._writer:
+                self._writer.discard(session_id)
+                self.store.delete_history(session_id)
+        if self.memory_index:
+            self.memory_index.discard(session_id)
+
+    def close(self):
+        """Flushes pending writes to the store."""
+        if self._writer:
+            self._writer.close()
+
+    def memory_usage(self, session_id: str) -> int:
+        """Bytes of text held for a session."""
+        with self._lock:
+            history = self._sessions.get(session_id)
+            return history.memory_bytes() if history else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "memory_bytes": sum(history.memory_bytes() for history in self._sessions.values()),
+            }
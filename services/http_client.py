@@ -0,0 +1,125 @@
+# services/http_client.py - Shared keep-alive HTTP clients for outbound REST calls
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Connect / read timeouts in seconds for every outbound call
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT_SECONDS", "20"))
+# Keep-alive connections kept per host, and hosts kept pools for
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_MAX_HOSTS = int(os.getenv("HTTP_MAX_HOSTS", "10"))
+# Per-API-key clients (e.g. Tavily) kept alive at once
+HTTP_MAX_KEYED_CLIENTS = int(os.getenv("HTTP_MAX_KEYED_CLIENTS", "64"))
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+def new_session() -> requests.Session:
+    """A requests Session with a bounded keep-alive pool per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_MAX_HOSTS, pool_maxsize=HTTP_MAX_CONNECTIONS_PER_HOST)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared sync session for calls that carry their credentials per request
+http_session = new_session()
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET through the shared session, with the default timeouts unless given."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return http_session.get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """POST through the shared session, with the default timeouts unless given."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return http_session.post(url, **kwargs)
+
+
+_async_client = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Shared async client for code running on the event loop; created on first use."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=HTTP_MAX_HOSTS * HTTP_MAX_CONNECTIONS_PER_HOST,
+                                max_keepalive_connections=HTTP_MAX_CONNECTIONS_PER_HOST),
+        )
+    return _async_client
+
+
+class KeyedClientCache:
+    """
+    One client per API key for SDKs that bind the key into their client (and its
+    session headers), so each key keeps its own warm connections. LRU-bounded.
+    """
+
+    def __init__(self, factory, max_clients: int = HTTP_MAX_KEYED_CLIENTS):
+        self.factory = factory
+        self.max_clients = max_clients
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str):
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is not None:
+                self._clients.move_to_end(api_key)
+                return client
+            client = self._clients[api_key] = self.factory(api_key)
+            while len(self._clients) > self.max_clients:
+                _, evicted = self._clients.popitem(last=False)
+                _close_quietly(evicted)
+            return client
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                _close_quietly(client)
+            self._clients.clear()
+
+
+def _close_quietly(client):
+    """Closes a client and its requests Session; SDKs leave a session passed in to them open."""
+    closers = [getattr(client, "close", None), getattr(getattr(client, "session", None), "close", None)]
+    for closer in filter(None, closers):
+        try:
+            closer()
+        except Exception as e:
+            logger.info(f"🌐 Error closing HTTP client: {e}")
+
+
+_keyed_caches = []
+
+
+def keyed_clients(factory, max_clients: int = HTTP_MAX_KEYED_CLIENTS) -> KeyedClientCache:
+    """Creates a per-API-key client cache that close_all() will also close."""
+    cache = KeyedClientCache(factory, max_clients)
+    _keyed_caches.append(cache)
+    return cache
+
+
+async def close_all():
+    """Closes every pooled connection; called on server shutdown."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    for cache in _keyed_caches:
+        cache.close()
+    http_session.close()
@@ -3,18 +3,29 @@
 import os
 import google.generativeai as genai
 import logging
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from google.generativeai.types import HarmCategory, HarmBlockThreshold, content_types
+import google.ai.generativelanguage as glm
 import json
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 # --- MODIFIED: Import all tool functions directly ---
 from services.tools import web_search, get_current_weather, get_current_time, open_website_function
+from services.executors import tool_executor
+from services.history import ChatHistoryStore
+from services.memory_index import memory_index
+from services.session_store import session_store
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# In-memory datastore for chat history
-chat_histories = {}
+# In-memory datastore for chat history, bounded per session and evicted when idle
+# A shared session store also persists it, so other workers and restarts can pick it up
+chat_histories = ChatHistoryStore(memory_index=memory_index,
+                                  store=session_store if session_store.shared else None)
 
 VOCALIX_PERSONA = """You are Vocalix, an Advanced Responsive Intelligence Assistant. You embody the sophistication and helpfulness of JARVIS from Iron Man, but with your own unique personality.
 
@@ -51,30 +62,261 @@ AVAILABLE_TOOLS_IMPL = {
     "open_website_function": (open_website_function, None), # No key needed
 }
 
-def get_streaming_llm_response(session_id: str, user_text: str, api_keys: dict):
+# Tool declarations are derived from the Python functions once, not per turn
+TOOL_LIBRARY = content_types.to_function_library(
+    [impl for impl, key_name in AVAILABLE_TOOLS_IMPL.values()]
+)
+
+GEMINI_MODEL_NAME = 'gemini-1.5-flash'
+# Override to point Gemini at another endpoint, e.g. the local stand-in in benchmarks/
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "").strip()
+GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "grpc").strip().lower()
+# Per-key Gemini models kept ready; least recently used are dropped past this
+GEMINI_MAX_CACHED_MODELS = int(os.getenv("GEMINI_MAX_CACHED_MODELS", "64"))
+_models = OrderedDict()  # Gemini API key -> KeyedGenerativeModel holding that key's client
+_models_lock = threading.Lock()
+
+# Seconds each tool may run before the model is told it timed out
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT_SECONDS", "10"))
+TOOL_TIMEOUTS = {
+    "web_search": float(os.getenv("WEB_SEARCH_TIMEOUT_SECONDS", "15")),
+    "get_current_weather": float(os.getenv("WEATHER_TIMEOUT_SECONDS", "8")),
+}
+
+# Clause/sentence grouping for streamed TTS. Sentence ends flush as soon as a
+# reasonably sized phrase is buffered; commas/semicolons only flush longer runs
+# so Murf doesn't get a stream of two-word fragments.
+SENTENCE_BOUNDARY_RE = re.compile(r'[.!?]+["\')\]]*\s')
+CLAUSE_BOUNDARY_RE = re.compile(r'[,;:]\s')
+MIN_SENTENCE_CHARS = 12
+MIN_CLAUSE_CHARS = 60
+
+LLM_ERROR_RESPONSE = "I apologize, but I'm experiencing technical difficulties. Please try again."
+
+
+class KeyedGenerativeModel(genai.GenerativeModel):
     """
-    Gets a Gemini response, manually handling the function-calling loop to inject API keys.
+    GenerativeModel that talks through the client it is given. genai.configure() is
+    process-wide, so it can't hold one client per API key; the SDK only reads the
+    model's client lazily, which is where this one is bound.
+    """
+
+    def __init__(self, client, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = client
+
+
+def _close_client(client):
+    """Closes a Gemini client's transport, ignoring errors (it may already be gone)."""
+    try:
+        client.transport.close()
+    except Exception as e:
+        logger.debug(f"Gemini client close failed: {e}")
+
+
+def _build_model(gemini_api_key: str):
+    client_options = {"api_key": gemini_api_key}
+    if GEMINI_API_ENDPOINT:
+        client_options["api_endpoint"] = GEMINI_API_ENDPOINT
+    client = glm.GenerativeServiceClient(client_options=client_options, transport=GEMINI_TRANSPORT)
+    model = KeyedGenerativeModel(client, GEMINI_MODEL_NAME, system_instruction=VOCALIX_PERSONA, tools=TOOL_LIBRARY)
+    # Closed once the model is dropped from the cache and no chat still uses it,
+    # so an eviction never cuts off a turn that is streaming through the client
+    weakref.finalize(model, _close_client, client)
+    return model
+
+
+def get_model(gemini_api_key: str):
+    """
+    Returns the GenerativeModel for this API key. Each key gets its own client,
+    so sessions with different keys never share (or reconfigure) the global one.
+    """
+    with _models_lock:
+        model = _models.get(gemini_api_key)
+        if model is not None:
+            _models.move_to_end(gemini_api_key)
+            return model
+
+    # Building the client can be slow (channel setup), so other keys aren't held up by it
+    built = _build_model(gemini_api_key)
+    with _models_lock:
+        model = _models.get(gemini_api_key)
+        if model is not None:
+            # Another thread built this key's model first; ours is dropped and its client closed
+            _models.move_to_end(gemini_api_key)
+            return model
+        _models[gemini_api_key] = built
+        while len(_models) > GEMINI_MAX_CACHED_MODELS:
+            _models.popitem(last=False)
+        logger.info(f"✅ Created Gemini client ({len(_models)} cached)")
+    return built
+
+
+def start_chat_session(session_id: str, api_keys: dict, user_text: str = None):
+    """
+    Creates a Gemini chat session primed with the stored history for this session,
+    plus older turns relevant to user_text recalled from long-term memory.
     """
     gemini_api_key = api_keys.get("gemini")
     if not gemini_api_key:
         raise ValueError("Gemini API key not found in session data.")
-    genai.configure(api_key=gemini_api_key)
-    
-    # We pass the function objects themselves so the model knows their schemas
-    tool_functions = [impl for impl, key_name in AVAILABLE_TOOLS_IMPL.values()]
-    model = genai.GenerativeModel(
-        'gemini-1.5-flash',
-        system_instruction=VOCALIX_PERSONA,
-        tools=tool_functions
-    )
+    model = get_model(gemini_api_key)
 
     if session_id not in chat_histories:
-        chat_histories[session_id] = []
         logger.info(f"✅ NEW CHAT SESSION: {session_id}")
     else:
-        logger.info(f"🔄 EXISTING SESSION: {session_id} with {len(chat_histories[session_id])} messages")
+        logger.info(f"🔄 EXISTING SESSION: {session_id} with {chat_histories.message_count(session_id)} messages")
+
+    return model.start_chat(history=chat_histories.contents(session_id, user_text))
 
-    chat = model.start_chat(history=chat_histories[session_id])
+
+def _run_tool(function_name: str, function_args: dict, api_keys: dict, timings=None):
+    """Runs one tool with the session's API key injected and returns its result.
+    Records the call's start and end on timings, if given."""
+    tool_impl, required_key_name = AVAILABLE_TOOLS_IMPL.get(function_name, (None, None))
+
+    if not tool_impl:
+        return f"Error: Unknown function '{function_name}' called."
+
+    # Prepare arguments for our Python tool function
+    tool_kwargs = {'params': function_args}
+    if required_key_name:
+        # Inject the API key from the user's session data
+        tool_kwargs['api_key'] = api_keys.get(required_key_name)
+
+    # Execute the tool and get the result
+    started = time.monotonic()
+    try:
+        return tool_impl(**tool_kwargs)
+    finally:
+        if timings is not None:
+            timings.tool_call(function_name, started, time.monotonic())
+
+
+def _execute_function_calls(function_calls, api_keys: dict, timings=None):
+    """
+    Runs every intercepted Gemini function call of one response concurrently on the
+    tool executor, each bounded by its timeout. Returns the function_response Parts,
+    in call order, to send back to the model as one batch.
+    """
+    futures = []
+    for function_call in function_calls:
+        function_args = dict(function_call.args or {})
+        logger.info(f"🔧 Intercepted function call: {function_call.name}({function_args})")
+        futures.append(tool_executor.submit(_run_tool, function_call.name, function_args, api_keys, timings))
+
+    parts = []
+    started = time.monotonic()
+    for function_call, future in zip(function_calls, futures):
+        # Timeouts are measured from the batch start since the calls run side by side
+        timeout = TOOL_TIMEOUTS.get(function_call.name, DEFAULT_TOOL_TIMEOUT)
+        try:
+            function_result = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+        except FutureTimeoutError:
+            logger.warning(f"⏱️ Tool {function_call.name} timed out after {timeout}s")
+            function_result = f"Error: {function_call.name} timed out."
+        except Exception as e:
+            logger.error(f"❌ Tool {function_call.name} failed: {e}")
+            function_result = f"Error: {function_call.name} failed: {e}"
+
+        parts.append(genai.protos.Part(function_response=genai.protos.FunctionResponse(
+            name=function_call.name,
+            response={"result": function_result}
+        )))
+
+    logger.info(f"🔧 Ran {len(parts)} function call(s) in {time.monotonic() - started:.2f}s")
+    return parts
+
+
+def _response_parts(response):
+    """Returns the parts of the first candidate, or an empty list."""
+    if not response.candidates:
+        return []
+    return response.candidates[0].content.parts
+
+
+def iter_llm_response_text(chat, user_text: str, api_keys: dict, cancel_event=None, timings=None):
+    """
+    Streams Gemini text deltas as they arrive, running the function-calling loop
+    between streamed responses. Yields plain text fragments.
+    Stops early, without running further tools, once cancel_event is set.
+    Marks first_llm_token and tool call spans on timings, if given.
+    """
+    logger.info(f"📝 User input (streaming): '{user_text}'")
+    produced_text = False
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    try:
+        message = user_text
+        while True:
+            response = chat.send_message(
+                message, stream=True, tool_config={'function_calling_config': 'NONE'}
+            )
+
+            for chunk in response:
+                if cancelled():
+                    logger.info("🛑 LLM stream cancelled")
+                    return
+                for part in _response_parts(chunk):
+                    if part.text:
+                        if not produced_text and timings is not None:
+                            timings.mark("first_llm_token")
+                        produced_text = True
+                        yield part.text
+
+            # The streamed response is aggregated once fully iterated
+            function_calls = [part.function_call for part in _response_parts(response)
+                              if part.function_call]
+            if not function_calls or cancelled():
+                break
+
+            message = _execute_function_calls(function_calls, api_keys, timings)
+
+        if not produced_text:
+            yield "I apologize, I could not generate a response."
+
+    except Exception as e:
+        logger.error(f"❌ Error in streaming LLM response: {e}", exc_info=True)
+        if not produced_text:
+            yield LLM_ERROR_RESPONSE
+
+
+def iter_speech_chunks(text_deltas):
+    """
+    Groups streamed text deltas into clause/sentence sized chunks for TTS.
+    Splits only on punctuation followed by whitespace, so URLs stay intact.
+    """
+    buffer = ""
+    for delta in text_deltas:
+        buffer += delta
+        while True:
+            split_at = None
+            for match in SENTENCE_BOUNDARY_RE.finditer(buffer):
+                if match.end() >= MIN_SENTENCE_CHARS:
+                    split_at = match.end()
+                    break
+            if split_at is None:
+                for match in CLAUSE_BOUNDARY_RE.finditer(buffer):
+                    if match.end() >= MIN_CLAUSE_CHARS:
+                        split_at = match.end()
+                        break
+            if split_at is None:
+                break
+            chunk, buffer = buffer[:split_at], buffer[split_at:]
+            if chunk.strip():
+                yield chunk
+
+    if buffer.strip():
+        yield buffer
+
+
+def get_streaming_llm_response(session_id: str, user_text: str, api_keys: dict):
+    """
+    Gets a Gemini response, manually handling the function-calling loop to inject API keys.
+    """
+    chat = start_chat_session(session_id, api_keys, user_text)
     logger.info(f"📝 User input: '{user_text}'")
 
     try:
@@ -82,34 +324,16 @@ def get_streaming_llm_response(session_id: str, user_text: str, api_keys: dict):
         # First, send the message but tell the model not to call functions automatically
         response = chat.send_message(user_text, tool_config={'function_calling_config': 'NONE'})
 
-        # Loop until the model gives us text instead of another function call
-        while response.candidates[0].content.parts and response.candidates[0].content.parts[0].function_call:
-            function_call = response.candidates[0].content.parts[0].function_call
-            function_name = function_call.name
-            function_args = dict(function_call.args)
-
-            logger.info(f"🔧 Intercepted function call: {function_name}({function_args})")
-            
-            tool_impl, required_key_name = AVAILABLE_TOOLS_IMPL.get(function_name, (None, None))
-            
-            if not tool_impl:
-                function_result = f"Error: Unknown function '{function_name}' called."
-            else:
-                # Prepare arguments for our Python tool function
-                tool_kwargs = {'params': function_args}
-                if required_key_name:
-                    # Inject the API key from the user's session data
-                    tool_kwargs['api_key'] = api_keys.get(required_key_name)
-                
-                # Execute the tool and get the result
-                function_result = tool_impl(**tool_kwargs)
-
-            # Send the result back to the model to continue its reasoning
+        # Loop until the model gives us text instead of more function calls
+        while True:
+            function_calls = [part.function_call for part in _response_parts(response)
+                              if part.function_call]
+            if not function_calls:
+                break
+
+            # Send all results back to the model in one batch to continue its reasoning
             response = chat.send_message(
-                genai.Part(function_response=genai.FunctionResponse(
-                    name=function_name,
-                    response={"result": function_result}
-                )),
+                _execute_function_calls(function_calls, api_keys),
                 tool_config={'function_calling_config': 'NONE'}
             )
         
@@ -119,8 +343,7 @@ def get_streaming_llm_response(session_id: str, user_text: str, api_keys: dict):
         
     except Exception as e:
         logger.error(f"❌ Error in LLM response: {e}", exc_info=True)
-        error_response = "I apologize, but I'm experiencing technical difficulties. Please try again."
-        return [error_response], chat
+        return [LLM_ERROR_RESPONSE], chat
 
 
 def get_llm_response(session_id: str, user_text: str, api_keys: dict) -> str:
@@ -128,6 +351,6 @@ def get_llm_response(session_id: str, user_text: str, api_keys: dict) -> str:
     Gets a response from the Google Gemini LLM (non-streaming version) with function calling.
     """
     text_chunks, chat = get_streaming_llm_response(session_id, user_text, api_keys)
-    if session_id in chat_histories and text_chunks and not text_chunks[0].startswith("I apologize"):
-        chat_histories[session_id] = chat.history
+    if text_chunks and not text_chunks[0].startswith("I apologize"):
+        chat_histories.append_turn(session_id, chat.history)
     return "".join(text_chunks)
\ No newline at end of file
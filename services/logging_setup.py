@@ -0,0 +1,117 @@
+# services/logging_setup.py - Queue-based logging with sampling for hot-path messages
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+LOG_FILE = os.getenv("LOG_FILE", "day23_complete_agent.log")
+# "text" for humans, "json" for one structured record per line
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").strip().lower()
+# Per-chunk messages (audio chunks, partial transcripts, ...): "all", "sampled" or "off"
+LOG_HOT_PATH = os.getenv("LOG_HOT_PATH", "sampled").strip().lower()
+# In "sampled" mode, hot-path messages let through per category per second
+LOG_HOT_PATH_PER_SECOND = float(os.getenv("LOG_HOT_PATH_PER_SECOND", "2"))
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Pass as extra= on hot-path log calls so they can be sampled or switched off
+AUDIO_CHUNK_LOG = {"category": "audio_chunk"}
+PARTIAL_TRANSCRIPT_LOG = {"category": "partial_transcript"}
+TTS_TEXT_LOG = {"category": "tts_text"}
+RESPONSE_BODY_LOG = {"category": "response_body"}
+
+
+class HotPathFilter(logging.Filter):
+    """
+    Rate-limits records tagged with a category, per category. Records without
+    one always pass. The next record let through reports how many were dropped.
+    """
+
+    def __init__(self, mode: str = LOG_HOT_PATH, per_second: float = LOG_HOT_PATH_PER_SECOND):
+        super().__init__()
+        self.mode = mode
+        self.per_second = per_second
+        self._allowance = {}  # category -> (tokens, last update)
+        self._suppressed = {}  # category -> records dropped since the last one let through
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        category = getattr(record, "category", None)
+        if category is None or self.mode == "all":
+            return True
+        if self.mode == "off":
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._allowance.get(category, (self.per_second, now))
+            tokens = min(self.per_second, tokens + (now - updated) * self.per_second)
+            if tokens < 1:
+                self._allowance[category] = (tokens, now)
+                self._suppressed[category] = self._suppressed.get(category, 0) + 1
+                return False
+            self._allowance[category] = (tokens - 1, now)
+            suppressed = self._suppressed.pop(category, 0)
+
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.msg} (+{suppressed} similar suppressed)"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, keeping category and suppression counts as fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for field in ("category", "suppressed"):
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+_listener = None
+
+
+def configure_logging():
+    """
+    Routes all logging through a queue: callers on the event loop or turn threads
+    only enqueue, and a background listener does the console and file I/O.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if LOG_FILE:
+        handlers.append(logging.FileHandler(LOG_FILE, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(HotPathFilter())
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,153 @@
+# services/memory_index.py - Local long-term memory: past turns as hashed vectors, top-k recall
+
+import logging
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Width of the hashed embedding; more dimensions mean fewer collisions
+MEMORY_EMBED_DIMS = int(os.getenv("MEMORY_EMBED_DIMS", "512"))
+# Snippets injected per turn, and how similar they must be to the user's words
+MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", "3"))
+MEMORY_MIN_SCORE = float(os.getenv("MEMORY_MIN_SCORE", "0.1"))
+# Oldest memories are dropped past this many per session
+MEMORY_MAX_ITEMS = int(os.getenv("MEMORY_MAX_ITEMS_PER_SESSION", "500"))
+# Characters of each message stored as the recalled snippet
+MEMORY_SNIPPET_CHARS = 300
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+STOPWORDS = frozenset("""
+a an and are as at be but by can could did do does for from had has have how i i'm in is it it's
+me my of on or please sir so that the their them then there this to was we were what when where
+which who why will with would you your ma'am
+""".split())
+
+
+def _stem(word: str) -> str:
+    """Crude suffix folding so "dog's" and "dogs" match "dog"."""
+    word = word.rstrip("'")
+    if word.endswith("'s"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _tokens(text: str) -> list:
+    words = [_stem(word) for word in WORD_RE.findall(text.lower()) if word not in STOPWORDS]
+    # Bigrams keep a little word order ("new york" vs "york new")
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def embed_text(text: str, dims: int = MEMORY_EMBED_DIMS) -> np.ndarray:
+    """
+    Offline embedding stand-in: signed feature hashing of words and bigrams,
+    L2-normalized so a dot product is cosine similarity.
+    """
+    vector = np.zeros(dims, dtype=np.float32)
+    for token in _tokens(text):
+        digest = zlib.crc32(token.encode("utf-8"))
+        vector[digest % dims] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SessionMemory:
+    """Vectors in one growable matrix, alongside the turns they came from."""
+
+    def __init__(self, dims: int, max_items: int):
+        self.max_items = max_items
+        self.vectors = np.zeros((16, dims), dtype=np.float32)
+        self.turns = []
+
+    def add(self, vector: np.ndarray, turn: list):
+        count = len(self.turns)
+        if count >= self.max_items:
+            # Drop the oldest memory
+            self.vectors[:count - 1] = self.vectors[1:count]
+            self.turns.pop(0)
+        elif count == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+        self.vectors[len(self.turns)] = vector
+        self.turns.append(turn)
+
+    def search(self, query: np.ndarray, k: int, min_score: float) -> list:
+        count = len(self.turns)
+        if not count or not query.any():
+            return []
+        scores = self.vectors[:count] @ query
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.turns[i] for i in top if scores[i] >= min_score]
+
+
+def _format_turn(turn: list) -> str:
+    return " ".join(
+        f"{'User' if role == 'user' else 'You'}: {text[:MEMORY_SNIPPET_CHARS]}" for role, text in turn
+    )
+
+
+class MemoryIndex:
+    """Per-session long-term memory of turns that have left the replayed history window."""
+
+    def __init__(self, dims: int = MEMORY_EMBED_DIMS, max_items: int = MEMORY_MAX_ITEMS):
+        self.dims = dims
+        self.max_items = max_items
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def add_turn(self, session_id: str, turn: list):
+        """Indexes one compact turn, [(role, text), ...], as a single memory."""
+        vector = embed_text(" ".join(text for _, text in turn), self.dims)
+        with self._lock:
+            memory = self._sessions.get(session_id)
+            if memory is None:
+                memory = self._sessions[session_id] = SessionMemory(self.dims, self.max_items)
+            memory.add(vector, [tuple(message) for message in turn])
+
+    def recall(self, session_id: str, query: str, k: int = MEMORY_TOP_K,
+               min_score: float = MEMORY_MIN_SCORE) -> list:
+        """The k past turns most similar to query, best first."""
+        with self._lock:
+            memory = self._sessions.get(session_id)
+            if memory is None:
+                return []
+            snippets = [_format_turn(turn) for turn in memory.search(embed_text(query, self.dims), k, min_score)]
+        if snippets:
+            logger.info(f"🧠 Recalled {len(snippets)} memories for session {session_id}")
+        return snippets
+
+    def export(self, session_id: str) -> list:
+        """The session's remembered turns, oldest first, for persistence."""
+        with self._lock:
+            memory = self._sessions.get(session_id)
+            return [list(map(list, turn)) for turn in memory.turns] if memory else []
+
+    def restore(self, session_id: str, turns: list):
+        """Rebuilds a session's index from exported turns (embeddings are recomputed)."""
+        self.discard(session_id)
+        for turn in turns:
+            self.add_turn(session_id, turn)
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def memory_bytes(self, session_id: str) -> int:
+        with self._lock:
+            memory = self._sessions.get(session_id)
+            if memory is None:
+                return 0
+            return memory.vectors.nbytes + sum(
+                len(text.encode("utf-8")) for turn in memory.turns for _, text in turn
+            )
+
+
+# Shared index for all sessions on this server
+memory_index = MemoryIndex()
@@ -0,0 +1,172 @@
+# services/metrics.py - Per-turn latency breakdown and Prometheus text exposition
+
+import bisect
+import os
+import threading
+import time
+from collections import deque
+
+# Turn stages, in pipeline order; each is measured from the end-of-turn event
+TURN_STAGES = (
+    "llm_request_start",  # Gemini request sent (negative when started speculatively)
+    "first_llm_token",
+    "final_llm_text",
+    "murf_ready",  # Murf connection acquired for the turn
+    "first_murf_audio",  # First audio chunk received from Murf
+    "first_audio_sent",  # First audio byte sent to the client
+    "complete",
+)
+
+# Histogram bucket bounds in seconds, Prometheus style
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0)
+# Recent samples kept per series for p50/p95/p99
+METRICS_RESERVOIR_SIZE = int(os.getenv("METRICS_RESERVOIR_SIZE", "1024"))
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class TurnTimings:
+    """Monotonic timestamps for one turn. Marks keep their first value; safe from any thread."""
+
+    def __init__(self):
+        self.marks = {}
+        self.tool_calls = []  # (name, started, ended)
+        self._lock = threading.Lock()
+
+    def mark(self, stage: str, at: float = None):
+        with self._lock:
+            self.marks.setdefault(stage, time.monotonic() if at is None else at)
+
+    def tool_call(self, name: str, started: float, ended: float):
+        with self._lock:
+            self.tool_calls.append((name, started, ended))
+
+    def stage_seconds(self) -> dict:
+        """Seconds from the end-of-turn event to each stage reached."""
+        with self._lock:
+            origin = self.marks.get("end_of_turn")
+            if origin is None:
+                return {}
+            return {stage: self.marks[stage] - origin for stage in TURN_STAGES if stage in self.marks}
+
+    def as_dict(self) -> dict:
+        """Millisecond breakdown for the client."""
+        stages = self.stage_seconds()
+        with self._lock:
+            origin = self.marks.get("end_of_turn")
+            tools = [{"name": name,
+                      "start_ms": round((started - origin) * 1000) if origin is not None else None,
+                      "duration_ms": round((ended - started) * 1000)}
+                     for name, started, ended in self.tool_calls]
+        return {"stages_ms": {stage: round(seconds * 1000) for stage, seconds in stages.items()},
+                "tools": tools}
+
+
+class LatencySeries:
+    """Cumulative histogram buckets plus a reservoir of recent samples for quantiles."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=METRICS_RESERVOIR_SIZE)
+
+    def observe(self, seconds: float):
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        if index < len(self.bucket_counts):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def quantiles(self) -> dict:
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+class TurnMetrics:
+    """Aggregates turn timings and renders them with any registered gauges and counters as Prometheus text."""
+
+    def __init__(self):
+        self._stages = {}  # stage -> LatencySeries
+        self._tools = {}  # tool name -> LatencySeries
+        self._setup = {}  # session setup phase -> LatencySeries
+        self._gauges = []  # (name, help, read, Prometheus type)
+        self.turns_completed = 0
+        self._lock = threading.Lock()
+
+    def observe_turn(self, timings: TurnTimings):
+        stages = timings.stage_seconds()
+        with self._lock:
+            self.turns_completed += 1
+            for stage, seconds in stages.items():
+                # A speculative start precedes the end of turn; that counts as zero wait
+                self._stages.setdefault(stage, LatencySeries()).observe(max(0.0, seconds))
+            for name, started, ended in timings.tool_calls:
+                self._tools.setdefault(name, LatencySeries()).observe(ended - started)
+
+    def observe_setup(self, phase: str, seconds: float):
+        """Records one phase of WebSocket session setup (STT handshake, ready, ...)."""
+        with self._lock:
+            self._setup.setdefault(phase, LatencySeries()).observe(seconds)
+
+    def register_gauge(self, name: str, help_text: str, read):
+        """read() returns a number, or a dict of {label value: number} for a 'kind' label."""
+        self._gauges.append((name, help_text, read, "gauge"))
+
+    def register_counter(self, name: str, help_text: str, read):
+        """Like register_gauge, for values that only ever increase; name should end in _total."""
+        self._gauges.append((name, help_text, read, "counter"))
+
+    def _render_series(self, lines: list, name: str, help_text: str, label: str, series: dict):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, s in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, s.bucket_counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{_labels(**{label: key})},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{_labels(**{label: key})},le="+Inf"}} {s.count}')
+            lines.append(f"{name}_sum{{{_labels(**{label: key})}}} {s.total:.6f}")
+            lines.append(f"{name}_count{{{_labels(**{label: key})}}} {s.count}")
+
+        quantile_name = f"{name.rsplit('_seconds', 1)[0]}_quantile_seconds"
+        lines.append(f"# HELP {quantile_name} {help_text.rstrip('.')} (p50/p95/p99 over recent samples).")
+        lines.append(f"# TYPE {quantile_name} gauge")
+        for key, s in sorted(series.items()):
+            for q, value in s.quantiles().items():
+                lines.append(f'{quantile_name}{{{_labels(**{label: key})},quantile="{q}"}} {value:.6f}')
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            lines.append("# HELP vocalix_turns_completed_total Turns that ran to completion.")
+            lines.append("# TYPE vocalix_turns_completed_total counter")
+            lines.append(f"vocalix_turns_completed_total {self.turns_completed}")
+            self._render_series(lines, "vocalix_turn_stage_seconds",
+                                "Time from end of user turn to each pipeline stage.", "stage", self._stages)
+            self._render_series(lines, "vocalix_tool_call_seconds",
+                                "Duration of each tool call.", "tool", self._tools)
+            self._render_series(lines, "vocalix_session_setup_seconds",
+                                "Duration of each session setup phase; ready spans configuration to usable session.",
+                                "phase", self._setup)
+
+        for name, help_text, read, metric_type in self._gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            value = read()
+            if isinstance(value, dict):
+                for kind, number in value.items():
+                    lines.append(f'{name}{{{_labels(kind=kind)}}} {number}')
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry for this process
+turn_metrics = TurnMetrics()
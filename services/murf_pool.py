@@ -0,0 +1,134 @@
+# services/murf_pool.py - Warm Murf stream-input connections reused across turns
+
+import asyncio
+import logging
+import os
+
+from services.murf_ws import MurfStreamInputWS
+
+logger = logging.getLogger(__name__)
+
+# Idle connections older than this are pinged before reuse
+MURF_POOL_PING_AFTER = float(os.getenv("MURF_POOL_PING_AFTER_SECONDS", "15"))
+# Idle connections older than this are closed instead of reused
+MURF_POOL_MAX_IDLE = float(os.getenv("MURF_POOL_MAX_IDLE_SECONDS", "120"))
+# Warm connections kept per session and voice/format
+MURF_POOL_MAX_IDLE_PER_KEY = int(os.getenv("MURF_POOL_MAX_IDLE_PER_KEY", "1"))
+
+
+class MurfConnectionPool:
+    """Keeps warm MurfStreamInputWS connections per session and voice/format settings."""
+
+    def __init__(self, max_idle_per_key: int = MURF_POOL_MAX_IDLE_PER_KEY,
+                 ping_after: float = MURF_POOL_PING_AFTER, max_idle: float = MURF_POOL_MAX_IDLE):
+        self.max_idle_per_key = max_idle_per_key
+        self.ping_after = ping_after
+        self.max_idle = max_idle
+        self._idle = {}  # key -> list of idle connections
+        self._warming = {}  # key -> task opening a connection
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    @staticmethod
+    def _key(session_id: str, api_key: str, config: dict):
+        return (session_id, api_key) + tuple(sorted(config.items()))
+
+    async def _open(self, key, api_key: str, config: dict) -> MurfStreamInputWS:
+        murf = MurfStreamInputWS(api_key=api_key, **config)
+        murf.pool_key = key
+        await murf.connect()
+        self.connections_opened += 1
+        return murf
+
+    async def _close(self, murf: MurfStreamInputWS):
+        try:
+            await murf.disconnect()
+        except Exception as e:
+            logger.info(f"🎵 Error closing pooled Murf connection: {e}")
+
+    async def _reap_expired(self):
+        """Close idle connections that have sat unused past max_idle."""
+        now = asyncio.get_running_loop().time()
+        for key, connections in list(self._idle.items()):
+            expired = [murf for murf in connections if now - murf.last_used > self.max_idle]
+            for murf in expired:
+                connections.remove(murf)
+                await self._close(murf)
+            if not connections:
+                del self._idle[key]
+
+    async def acquire(self, session_id: str, api_key: str, **config) -> MurfStreamInputWS:
+        """Returns a healthy connection for this session, opening one if none is warm."""
+        key = self._key(session_id, api_key, config)
+
+        # A pre-warm for this key may still be connecting; wait for it instead of racing it
+        warming = self._warming.get(key)
+        if warming:
+            await asyncio.wait([warming])
+
+        await self._reap_expired()
+        loop = asyncio.get_running_loop()
+        connections = self._idle.get(key, [])
+        while connections:
+            murf = connections.pop()
+            if not murf.is_healthy():
+                await self._close(murf)
+                continue
+            if loop.time() - murf.last_used > self.ping_after and not await murf.ping():
+                await self._close(murf)
+                continue
+            self.connections_reused += 1
+            logger.info(f"🎵 Reusing warm Murf connection for session {session_id}")
+            return murf
+
+        logger.info(f"🎵 Opening new Murf connection for session {session_id}")
+        return await self._open(key, api_key, config)
+
+    async def release(self, session_id: str, murf: MurfStreamInputWS, reusable: bool = True):
+        """Returns a connection to the pool after a turn, or closes it."""
+        connections = self._idle.setdefault(murf.pool_key, [])
+        if reusable and murf.is_healthy() and len(connections) < self.max_idle_per_key:
+            murf.last_used = asyncio.get_running_loop().time()
+            connections.append(murf)
+            return
+        if not connections:
+            del self._idle[murf.pool_key]
+        await self._close(murf)
+
+    async def prewarm(self, session_id: str, api_key: str, **config):
+        """Opens a connection ahead of the first turn so it starts warm."""
+        key = self._key(session_id, api_key, config)
+        if self._idle.get(key) or key in self._warming:
+            return
+
+        async def warm():
+            try:
+                murf = await self._open(key, api_key, config)
+                await self.release(session_id, murf)
+                logger.info(f"🎵 Pre-warmed Murf connection for session {session_id}")
+            except Exception as e:
+                logger.warning(f"🎵 Murf pre-warm failed for session {session_id}: {e}")
+            finally:
+                self._warming.pop(key, None)
+
+        self._warming[key] = asyncio.create_task(warm())
+
+    async def close_session(self, session_id: str):
+        """Closes every connection held for a session."""
+        for key in [key for key in self._warming if key[0] == session_id]:
+            self._warming[key].cancel()
+        for key in [key for key in self._idle if key[0] == session_id]:
+            for murf in self._idle.pop(key):
+                await self._close(murf)
+
+    def stats(self) -> dict:
+        return {
+            "idle": sum(len(connections) for connections in self._idle.values()),
+            "warming": len(self._warming),
+            "opened": self.connections_opened,
+            "reused": self.connections_reused,
+        }
+
+
+# Shared pool for all sessions on this server
+murf_pool = MurfConnectionPool()
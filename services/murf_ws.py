@@ -4,18 +4,106 @@ import asyncio
 import base64
 import json
 import logging
+import os
 import websockets
+from websockets.exceptions import ConnectionClosed
+from websockets.protocol import State
 import uuid
-import math
+import struct
+from functools import lru_cache
+
+import numpy as np
+
+from services.audio_frames import pack_audio_frame
+from services.logging_setup import AUDIO_CHUNK_LOG
 
 logger = logging.getLogger(__name__)
 
+# Stream-input endpoint; override to use a local stand-in (see benchmarks/)
+MURF_WS_URL = os.getenv("MURF_WS_URL", "wss://api.murf.ai/v1/speech/stream-input")
+
+# Seconds without audio after the last text chunk before a turn is treated as
+# complete. Only a safeguard for a connection that has gone dead: Murf's final
+# flag, the connection closing or the WAV header length complete the turn, and
+# the gap between two synthesis segments can be well over a second.
+DEFAULT_COMPLETION_FALLBACK = float(os.getenv("MURF_COMPLETION_FALLBACK_SECONDS", "5.0"))
+
+# Longer wait used when no audio has arrived since the last text chunk was sent,
+# so slow first audio isn't mistaken for the end of the turn
+FIRST_AUDIO_GRACE = float(os.getenv("MURF_FIRST_AUDIO_GRACE_SECONDS", "10.0"))
+
+# WAV data sizes used by streaming encoders when the length is unknown
+UNKNOWN_WAV_DATA_SIZES = (0, 0xFFFFFFFF, 0x7FFFFFFF)
+
+# Length of the speech-like clip played when Murf is unreachable
+MOCK_AUDIO_SECONDS = 3.0
+
+@lru_cache(maxsize=4)
+def mock_speech_wav(sample_rate: int = 44100, seconds: float = MOCK_AUDIO_SECONDS) -> bytes:
+    """Speech-like 16-bit mono WAV (moving formants under a syllable envelope), computed once per rate."""
+    i = np.arange(int(seconds * sample_rate))
+    t = i / sample_rate
+
+    # Create speech-like formants
+    f1 = 300 + 200 * np.sin(2 * np.pi * 2 * t)
+    f2 = 800 + 400 * np.sin(2 * np.pi * 1.5 * t)
+    f3 = 1600 + 600 * np.sin(2 * np.pi * 1 * t)
+    sample = (0.4 * np.sin(2 * np.pi * f1 * t)
+              + 0.25 * np.sin(2 * np.pi * f2 * t)
+              + 0.15 * np.sin(2 * np.pi * f3 * t)
+              + 0.1 * np.sin(2 * np.pi * (f1 * 2) * t))
+
+    # Speech envelope plus a slight sawtooth "noise"
+    sample *= 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+    sample += 0.02 * (0.5 - (i % 147) / 147.0)
+
+    audio_data = np.clip((sample * 18000).astype(np.int64), -32768, 32767).astype('<i2').tobytes()
+    header = (b"RIFF" + struct.pack('<I', 36 + len(audio_data)) + b"WAVEfmt "
+              + struct.pack('<IHHIIHH', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+              + b"data" + struct.pack('<I', len(audio_data)))
+    return header + audio_data
+
+async def send_complete_wav(client_websocket, turn_number: int, wav_bytes: bytes, binary_audio: bool = False,
+                            timings=None):
+    """Send one complete WAV file for a turn, followed by the completion message."""
+    if binary_audio:
+        await client_websocket.send_bytes(
+            pack_audio_frame(turn_number, 0, wav_bytes, final=True, wav=True)
+        )
+        total_audio_data = len(wav_bytes)
+    else:
+        # Encode complete audio
+        complete_audio_b64 = base64.b64encode(wav_bytes).decode('utf-8')
+
+        # Send complete audio as single chunk
+        final_message = {
+            "type": "audio_chunk",
+            "turn_number": turn_number,
+            "audio_data": complete_audio_b64,
+            "final": True,
+            "timestamp": asyncio.get_running_loop().time()
+        }
+        await client_websocket.send_text(json.dumps(final_message))
+        total_audio_data = len(complete_audio_b64)
+    if timings is not None:
+        timings.mark("first_audio_sent")
+
+    # Send completion message
+    completion_message = {
+        "type": "audio_streaming_complete",
+        "turn_number": turn_number,
+        "total_chunks": 1,  # We send as 1 complete chunk
+        "total_audio_data": total_audio_data
+    }
+    await client_websocket.send_text(json.dumps(completion_message))
+
 class MurfStreamInputWS:
     """Fixed Murf WebSocket client for complete audio playback."""
 
     def __init__(self, api_key: str, voice_id: str, sample_rate: int = 44100,
                  channel_type: str = "MONO", audio_format: str = "WAV",
-                 style: str = "Conversational", rate: int = 0, pitch: int = 0, variation: int = 1):
+                 style: str = "Conversational", rate: int = 0, pitch: int = 0, variation: int = 1,
+                 progressive: bool = False, completion_fallback: float = None):
         self.api_key = api_key
         self.voice_id = voice_id
         self.sample_rate = sample_rate
@@ -25,9 +113,26 @@ class MurfStreamInputWS:
         self.rate = rate
         self.pitch = pitch
         self.variation = variation
+        self.progressive = progressive  # Relay each PCM chunk as soon as it is decoded
+        self.completion_fallback = (DEFAULT_COMPLETION_FALLBACK if completion_fallback is None
+                                    else completion_fallback)
         self.websocket = None
-        self.client_websocket = None
-        self.turn_number = None
+        self.listener_task = None
+        self.context_id = None  # Set per turn when the connection is reused
+        self.last_used = 0.0  # Loop time the connection last finished a turn
+        self.reset_turn_state()
+
+    def reset_turn_state(self, turn_number: int = None, client_websocket=None, binary_audio: bool = False,
+                         timings=None, cacheable: bool = False):
+        """Clear all per-turn audio tracking."""
+        if getattr(self, 'completion_watchdog', None):
+            self.completion_watchdog.cancel()
+
+        self.client_websocket = client_websocket
+        self.turn_number = turn_number
+        self.binary_audio = binary_audio  # Client negotiated binary audio frames
+        self.timings = timings  # The turn's latency marks (first Murf audio, first audio sent)
+        self.cacheable = cacheable  # Progressive mode: keep the PCM so the finished turn can be cached
 
         # Fixed: Audio tracking with proper buffer management
         self.audio_chunks_sent = 0
@@ -35,8 +140,62 @@ class MurfStreamInputWS:
         self.completion_event = asyncio.Event()
         self.first_chunk = True
         self.last_chunk_time = 0
-        self.completion_task = None
+        self.end_sent_time = None  # Loop time the end=True text message went out
+        self.completion_watchdog = None  # Single fallback task, armed once per turn
+        self.pcm_bytes_received = 0
+        self.expected_pcm_bytes = None  # From the WAV header, when it can be trusted
+        self.audio_complete = False  # Murf confirmed all audio arrived (final flag or full length)
         self.audio_buffer = []  # ⭐ NEW: Buffer to collect all audio chunks
+        self.mock_text = ""  # Text accumulated across chunks in mock mode
+        self.sequence = 0  # Progressive mode: sequence number of the next chunk sent
+        self.pcm_remainder = b""  # Progressive mode: odd byte carried to keep samples aligned
+        if hasattr(self, 'wav_header'):
+            del self.wav_header
+
+    def begin_turn(self, turn_number: int, client_websocket, binary_audio: bool = False, timings=None,
+                   cacheable: bool = False):
+        """Start a new turn on this (possibly reused) connection with a fresh context ID."""
+        self.reset_turn_state(turn_number, client_websocket, binary_audio, timings, cacheable)
+        self.context_id = str(uuid.uuid4())
+        logger.info(f"🎵 Turn {turn_number} using Murf context {self.context_id}")
+
+    def stop_caching(self):
+        """Stops keeping this turn's audio for the cache (its text grew too long to be cached)."""
+        self.cacheable = False
+        if self.progressive:
+            # Only kept for the cache; non-progressive mode still needs it for playback
+            self.audio_buffer = []
+
+    async def cancel_turn(self):
+        """Stop the current turn: clear its Murf context and drop any audio still coming."""
+        self.completion_event.set()
+        if self.completion_watchdog:
+            self.completion_watchdog.cancel()
+        if hasattr(self, 'use_mock') or not self.websocket or not self.context_id:
+            return
+        try:
+            await self.websocket.send(json.dumps({"context_id": self.context_id, "clear": True}))
+            logger.info(f"🎵 Cleared Murf context {self.context_id} for turn {self.turn_number}")
+        except Exception as e:
+            logger.info(f"🎵 Could not clear Murf context: {e}")
+
+    def is_healthy(self) -> bool:
+        """True if the socket is open and its listener is still running."""
+        if hasattr(self, 'use_mock') or not self.websocket:
+            return False
+        if self.listener_task is None or self.listener_task.done():
+            return False
+        return self.websocket.state is State.OPEN
+
+    async def ping(self, timeout: float = 2.0) -> bool:
+        """Round-trip a WebSocket ping to check an idle connection."""
+        try:
+            pong_waiter = await self.websocket.ping()
+            await asyncio.wait_for(pong_waiter, timeout=timeout)
+            return True
+        except Exception as e:
+            logger.info(f"🎵 Murf ping failed: {e}")
+            return False
 
     async def __aenter__(self):
         await self.connect()
@@ -50,7 +209,7 @@ class MurfStreamInputWS:
         try:
             # Official URL format with parameters
             websocket_url = (
-                f"wss://api.murf.ai/v1/speech/stream-input"
+                f"{MURF_WS_URL}"
                 f"?api-key={self.api_key}"
                 f"&sample_rate={self.sample_rate}"
                 f"&channel_type={self.channel_type}"
@@ -76,7 +235,7 @@ class MurfStreamInputWS:
             logger.info(f"🎵 Sent voice config: {self.voice_id}")
 
             # Start listening for responses
-            asyncio.create_task(self._listen_for_responses())
+            self.listener_task = asyncio.create_task(self._listen_for_responses())
 
         except Exception as e:
             logger.error(f"Failed to connect to Murf WebSocket: {e}")
@@ -90,8 +249,8 @@ class MurfStreamInputWS:
 
     async def disconnect(self):
         """Disconnect from Murf WebSocket."""
-        if self.completion_task:
-            self.completion_task.cancel()
+        if self.completion_watchdog:
+            self.completion_watchdog.cancel()
 
         if self.websocket:
             try:
@@ -103,23 +262,32 @@ class MurfStreamInputWS:
     async def send_text_chunk(self, text: str, end: bool = False):
         """Send text chunk using official Murf format."""
         if hasattr(self, 'use_mock'):
+            self.mock_text += text
             if end:  # Only generate mock audio at the end
-                await self._generate_mock_audio(text, end)
+                await self._generate_mock_audio(self.mock_text, end)
             return
 
         if not self.websocket:
             logger.error("WebSocket not connected")
             return
 
+        if not text and not end:
+            return
+
         try:
             # Official message format
             text_msg = {
                 "text": text,
                 "end": end
             }
+            if self.context_id:
+                text_msg["context_id"] = self.context_id
 
             await self.websocket.send(json.dumps(text_msg))
-            logger.info(f"🎵 Sent to Murf: '{text[:50]}...' (end: {end})")
+            logger.info("🎵 Sent to Murf: '%.50s...' (end: %s)", text, end, extra=AUDIO_CHUNK_LOG)
+
+            if end:
+                self._arm_completion_fallback()
 
         except Exception as e:
             logger.error(f"Error sending text to Murf: {e}")
@@ -130,31 +298,39 @@ class MurfStreamInputWS:
             while True:
                 response = await self.websocket.recv()
                 data = json.loads(response)
-                logger.info(f"🎵 Received from Murf: {list(data.keys())}")
+                logger.info("🎵 Received from Murf: %s", list(data), extra=AUDIO_CHUNK_LOG)
+
+                # Audio for an earlier turn's context, or for a turn that already completed
+                if self.context_id and data.get("context_id") not in (None, self.context_id):
+                    continue
+                if self.completion_event.is_set():
+                    continue
 
                 # Handle audio response
                 if "audio" in data:
                     await self._collect_audio_chunk(data)
-                    self.last_chunk_time = asyncio.get_event_loop().time()
+                    self.last_chunk_time = asyncio.get_running_loop().time()
 
-                    # Cancel existing completion task and start new one
-                    if self.completion_task:
-                        self.completion_task.cancel()
-                    self.completion_task = asyncio.create_task(self._delayed_completion())
+                    if (self.expected_pcm_bytes is not None
+                            and self.pcm_bytes_received >= self.expected_pcm_bytes):
+                        logger.info("🎵 Received all audio announced in the WAV header")
+                        self.audio_complete = True
+                        await self._send_complete_audio()
+                        continue
 
                 # Handle explicit final flag
-                if data.get("final"):
+                if data.get("final") or data.get("isFinalAudio"):
                     logger.info("🎵 Murf marked final chunk")
+                    self.audio_complete = True
                     await self._send_complete_audio()
-                    break
 
-        except websockets.exceptions.ConnectionClosed:
+        except ConnectionClosed:
             logger.info("🎵 Murf WebSocket connection closed")
         except Exception as e:
             logger.error(f"Error in Murf listener: {e}")
         finally:
             # Send any remaining audio
-            if not self.completion_event.is_set():
+            if not self.completion_event.is_set() and self.client_websocket:
                 await self._send_complete_audio()
 
     async def _collect_audio_chunk(self, data: dict):
@@ -170,6 +346,8 @@ class MurfStreamInputWS:
 
             # Decode audio bytes
             audio_bytes = base64.b64decode(audio_base64)
+            if self.timings is not None:
+                self.timings.mark("first_murf_audio")
 
             # Skip WAV header for first chunk only
             if self.first_chunk and len(audio_bytes) > 44:
@@ -177,25 +355,147 @@ class MurfStreamInputWS:
                 self.wav_header = audio_bytes[:44]
                 audio_bytes = audio_bytes[44:]
                 self.first_chunk = False
+                self._read_expected_length()
+
+            self.pcm_bytes_received += len(audio_bytes)
+
+            if self.progressive:
+                # Relayed audio is only kept when the finished turn will be cached
+                if self.cacheable:
+                    self.audio_buffer.append(audio_bytes)
+                await self._relay_audio_chunk(audio_bytes)
+                return
 
             # ⭐ FIXED: Collect chunks instead of sending immediately
             if len(audio_bytes) > 0:
                 self.audio_buffer.append(audio_bytes)
                 self.audio_chunks_sent += 1
-                logger.info(f"🎵 Collected audio chunk {self.audio_chunks_sent}")
+                logger.info("🎵 Collected audio chunk %d", self.audio_chunks_sent, extra=AUDIO_CHUNK_LOG)
 
         except Exception as e:
             logger.error(f"Error collecting audio chunk: {e}")
 
-    async def _delayed_completion(self):
-        """Wait for silence then send complete audio."""
+    def _pcm_format(self):
+        """Returns (sample_rate, channels, bits_per_sample) from the WAV header if we have one."""
+        if hasattr(self, 'wav_header'):
+            channels, sample_rate = struct.unpack('<HI', self.wav_header[22:28])
+            bits_per_sample, = struct.unpack('<H', self.wav_header[34:36])
+            if channels and sample_rate and bits_per_sample:
+                return sample_rate, channels, bits_per_sample
+        return self.sample_rate, 1, 16
+
+    async def _relay_audio_chunk(self, audio_bytes: bytes):
+        """Progressive mode: forward raw PCM to the client as soon as it is decoded."""
+        audio_bytes = self.pcm_remainder + audio_bytes
+        sample_rate, channels, bits_per_sample = self._pcm_format()
+        frame_size = channels * bits_per_sample // 8
+
+        # Only whole sample frames go out; the rest waits for the next chunk
+        aligned_length = len(audio_bytes) - (len(audio_bytes) % frame_size)
+        self.pcm_remainder = audio_bytes[aligned_length:]
+        audio_bytes = audio_bytes[:aligned_length]
+        if not audio_bytes:
+            return
+
+        if self.binary_audio:
+            if self.sequence == 0:
+                # Format travels once per turn on the JSON control channel
+                await self.client_websocket.send_text(json.dumps({
+                    "type": "audio_stream_start",
+                    "turn_number": self.turn_number,
+                    "encoding": "pcm_s16le",
+                    "sample_rate": sample_rate,
+                    "channels": channels,
+                }))
+            await self.client_websocket.send_bytes(
+                pack_audio_frame(self.turn_number, self.sequence, audio_bytes)
+            )
+        else:
+            message = {
+                "type": "audio_chunk",
+                "turn_number": self.turn_number,
+                "audio_data": base64.b64encode(audio_bytes).decode('utf-8'),
+                "progressive": True,
+                "encoding": "pcm_s16le",
+                "sample_rate": sample_rate,
+                "channels": channels,
+                "sequence": self.sequence,
+                "final": False,
+                "timestamp": asyncio.get_running_loop().time()
+            }
+            await self.client_websocket.send_text(json.dumps(message))
+
+        if self.timings is not None:
+            self.timings.mark("first_audio_sent")
+        self.sequence += 1
+        self.audio_chunks_sent += 1
+        self.total_audio_data += len(audio_bytes)
+        logger.info("🎵 Relayed audio chunk %d (%d bytes)", self.sequence, len(audio_bytes), extra=AUDIO_CHUNK_LOG)
+
+    async def _send_progressive_completion(self):
+        """Progressive mode: send the final marker once Murf is done."""
         try:
-            await asyncio.sleep(1.0)  # Wait 1 second for more chunks
-            current_time = asyncio.get_event_loop().time()
-            
-            if current_time - self.last_chunk_time >= 1.0:  # No chunks for 1 second
-                logger.info("🎵 No new audio chunks, sending complete audio")
-                await self._send_complete_audio()
+            if self.binary_audio:
+                await self.client_websocket.send_bytes(
+                    pack_audio_frame(self.turn_number, self.sequence, final=True)
+                )
+            else:
+                final_message = {
+                    "type": "audio_chunk",
+                    "turn_number": self.turn_number,
+                    "audio_data": "",
+                    "progressive": True,
+                    "sequence": self.sequence,
+                    "final": True,
+                    "timestamp": asyncio.get_running_loop().time()
+                }
+                await self.client_websocket.send_text(json.dumps(final_message))
+
+            completion_message = {
+                "type": "audio_streaming_complete",
+                "turn_number": self.turn_number,
+                "progressive": True,
+                "total_chunks": self.sequence,
+                "total_audio_data": self.total_audio_data
+            }
+            await self.client_websocket.send_text(json.dumps(completion_message))
+            logger.info(f"🎵 Progressive audio complete for turn {self.turn_number}: {self.sequence} chunks, {self.total_audio_data} bytes")
+
+        except Exception as e:
+            logger.error(f"Error sending progressive completion: {e}")
+
+        self.completion_event.set()
+
+    def _read_expected_length(self):
+        """Trust the WAV header's data size only if all text was sent before it arrived."""
+        data_size, = struct.unpack('<I', self.wav_header[40:44])
+        if self.end_sent_time is not None and data_size not in UNKNOWN_WAV_DATA_SIZES:
+            self.expected_pcm_bytes = data_size
+
+    def _arm_completion_fallback(self):
+        """Start the silence fallback once the last text chunk has been sent."""
+        self.end_sent_time = asyncio.get_running_loop().time()
+        if self.completion_watchdog is None and self.completion_fallback > 0:
+            self.completion_watchdog = asyncio.create_task(self._completion_watchdog())
+
+    async def _completion_watchdog(self):
+        """Complete the turn if the connection goes quiet for completion_fallback seconds after end."""
+        loop = asyncio.get_running_loop()
+        try:
+            while not self.completion_event.is_set():
+                if self.last_chunk_time >= self.end_sent_time:
+                    idle_limit = self.completion_fallback
+                    last_activity = self.last_chunk_time
+                else:
+                    idle_limit = max(self.completion_fallback, FIRST_AUDIO_GRACE)
+                    last_activity = self.end_sent_time
+                remaining = last_activity + idle_limit - loop.time()
+                if remaining <= 0:
+                    logger.warning(f"🎵 No audio for {idle_limit}s after end and no final from Murf, completing turn")
+                    await self._send_complete_audio()
+                    return
+                # Re-check at least every fallback interval so new audio shortens the wait
+                await asyncio.sleep(min(remaining, self.completion_fallback))
         except asyncio.CancelledError:
             pass
 
@@ -204,6 +504,10 @@ class MurfStreamInputWS:
         if self.completion_event.is_set():
             return  # Already completed
 
+        if self.progressive and self.client_websocket:
+            await self._send_progressive_completion()
+            return
+
         if not self.client_websocket or len(self.audio_buffer) == 0:
             logger.warning("🎵 No audio chunks to send")
             self.completion_event.set()
@@ -220,31 +524,8 @@ class MurfStreamInputWS:
                 # Update WAV header with correct data length
                 combined_audio = self._update_wav_header(self.wav_header, combined_audio)
             
-            # Encode complete audio
-            complete_audio_b64 = base64.b64encode(combined_audio).decode('utf-8')
-            
-            # Send complete audio as single chunk
-            final_message = {
-                "type": "audio_chunk",
-                "turn_number": self.turn_number,
-                "audio_data": complete_audio_b64,
-                "final": True,
-                "timestamp": asyncio.get_event_loop().time()
-            }
-
-            await self.client_websocket.send_text(json.dumps(final_message))
-            
+            await self._send_complete_wav(combined_audio)
             logger.info(f"🎵 Sent complete audio: {len(combined_audio)} bytes from {len(self.audio_buffer)} chunks")
-
-            # Send completion message
-            completion_message = {
-                "type": "audio_streaming_complete",
-                "turn_number": self.turn_number,
-                "total_chunks": 1,  # We send as 1 complete chunk
-                "total_audio_data": len(complete_audio_b64)
-            }
-
-            await self.client_websocket.send_text(json.dumps(completion_message))
             logger.info(f"🎵 Audio streaming complete for turn {self.turn_number}")
 
         except Exception as e:
@@ -252,10 +533,19 @@ class MurfStreamInputWS:
 
         self.completion_event.set()
 
+    async def _send_complete_wav(self, wav_bytes: bytes):
+        """Send one complete WAV file for the turn, followed by the completion message."""
+        await send_complete_wav(self.client_websocket, self.turn_number, wav_bytes, self.binary_audio, self.timings)
+
+    def turn_audio(self):
+        """Complete WAV for the finished turn, or None if it was mocked or cut short."""
+        if (hasattr(self, 'use_mock') or not self.audio_complete
+                or not hasattr(self, 'wav_header') or not self.audio_buffer):
+            return None
+        return self._update_wav_header(self.wav_header, b''.join(self.audio_buffer))
+
     def _update_wav_header(self, header: bytes, audio_data: bytes) -> bytes:
         """Update WAV header with correct data length."""
-        import struct
-        
         # Update the total file size (bytes 4-8)
         new_file_size = len(header) + len(audio_data) - 8
         header = header[:4] + struct.pack('<I', new_file_size) + header[8:]
@@ -273,92 +563,18 @@ class MurfStreamInputWS:
         try:
             logger.info(f"🎵 Generating mock audio: 'Hello there! How can I help you today?'")
 
-            # Generate complete WAV file
-            samples = int(3.0 * 44100)  # 3 seconds of audio
-            wav_data = self._create_realistic_wav(samples)
-
-            # Send as single complete audio chunk
-            message = {
-                "type": "audio_chunk",
-                "turn_number": self.turn_number,
-                "audio_data": wav_data,
-                "final": True,
-                "timestamp": asyncio.get_event_loop().time()
-            }
+            # Built once per sample rate, in a worker thread so other sessions keep streaming
+            wav_data = await asyncio.to_thread(mock_speech_wav, self.sample_rate, MOCK_AUDIO_SECONDS)
 
-            await self.client_websocket.send_text(json.dumps(message))
+            await self._send_complete_wav(wav_data)
             self.audio_chunks_sent = 1
 
             logger.info(f"🎵 Mock audio sent for turn {self.turn_number}")
-
-            # Send completion
-            completion_message = {
-                "type": "audio_streaming_complete",
-                "turn_number": self.turn_number,
-                "total_chunks": 1,
-                "total_audio_data": len(wav_data)
-            }
-            await self.client_websocket.send_text(json.dumps(completion_message))
             self.completion_event.set()
 
         except Exception as e:
             logger.error(f"Error generating mock audio: {e}")
 
-    def _create_realistic_wav(self, samples: int):
-        """Create realistic speech-like WAV file."""
-        # WAV header for 44.1kHz, 16-bit, mono
-        data_size = samples * 2
-        file_size = 36 + data_size
-
-        header = bytearray([
-            0x52, 0x49, 0x46, 0x46,  # "RIFF"
-            *file_size.to_bytes(4, 'little'),
-            0x57, 0x41, 0x56, 0x45,  # "WAVE"
-            0x66, 0x6D, 0x74, 0x20,  # "fmt "
-            0x10, 0x00, 0x00, 0x00,  # fmt chunk size (16)
-            0x01, 0x00,  # PCM format
-            0x01, 0x00,  # mono channel
-            0x44, 0xAC, 0x00, 0x00,  # 44100 sample rate
-            0x88, 0x58, 0x01, 0x00,  # byte rate (44100 * 2)
-            0x02, 0x00,  # block align (2)
-            0x10, 0x00,  # 16-bit samples
-            0x64, 0x61, 0x74, 0x61,  # "data"
-            *data_size.to_bytes(4, 'little')
-        ])
-
-        # Generate realistic speech audio
-        audio_data = bytearray()
-        for i in range(samples):
-            t = i / 44100
-
-            # Create speech-like formants
-            f1 = 300 + 200 * math.sin(2 * math.pi * 2 * t)
-            f2 = 800 + 400 * math.sin(2 * math.pi * 1.5 * t)
-            f3 = 1600 + 600 * math.sin(2 * math.pi * 1 * t)
-
-            # Combine formants
-            sample = (
-                0.4 * math.sin(2 * math.pi * f1 * t) +
-                0.25 * math.sin(2 * math.pi * f2 * t) +
-                0.15 * math.sin(2 * math.pi * f3 * t) +
-                0.1 * math.sin(2 * math.pi * (f1 * 2) * t)
-            )
-
-            # Add speech envelope
-            envelope = 0.6 + 0.4 * math.sin(2 * math.pi * 4 * t)
-            sample *= envelope
-
-            # Add slight randomness
-            sample += 0.02 * (0.5 - (i % 147) / 147.0)
-
-            # Convert to 16-bit integer
-            sample_int = max(-32768, min(32767, int(sample * 18000)))
-            audio_data.extend(sample_int.to_bytes(2, 'little', signed=True))
-
-        # Combine header and audio data
-        complete_wav = header + audio_data
-        return base64.b64encode(complete_wav).decode('utf-8')
-
     async def wait_for_complete(self, timeout: int = 60):
         """Wait for audio generation to complete."""
         try:
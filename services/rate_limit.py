@@ -0,0 +1,168 @@
+# services/rate_limit.py - Constant-time rate limits per session and per upstream API key
+
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Per session: short bursts allowed, then a steady rate
+RATE_LIMIT_SESSION_BURST = int(os.getenv("RATE_LIMIT_SESSION_BURST", "5"))
+RATE_LIMIT_SESSION_PER_MINUTE = float(os.getenv("RATE_LIMIT_SESSION_PER_MINUTE", "12"))
+# Per Gemini API key: the upstream quota (40 requests per day leaves a buffer on the free tier)
+RATE_LIMIT_KEY_MAX_REQUESTS = int(os.getenv("RATE_LIMIT_KEY_MAX_REQUESTS", "40"))
+RATE_LIMIT_KEY_WINDOW = float(os.getenv("RATE_LIMIT_KEY_WINDOW_SECONDS", "86400"))
+# Session buckets kept at once; idle ones are dropped least recently used first
+RATE_LIMIT_MAX_SESSIONS = int(os.getenv("RATE_LIMIT_MAX_SESSIONS", "10000"))
+
+SESSION_LIMIT_MESSAGE = "You're going a little fast, Sir. Please wait a moment and try again."
+KEY_LIMIT_MESSAGE = "Daily quota limit reached. Try again tomorrow!"
+
+
+def api_key_id(api_key: str) -> str:
+    """Stable, non-reversible identifier for an API key, safe to store and log."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class TokenBucket:
+    """Classic token bucket, refilled lazily on each call. Caller provides locking."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def consume(self, amount: float = 1.0):
+        """Takes tokens even if that leaves the bucket in debt, like the old add_request."""
+        self._refill()
+        self.tokens -= amount
+
+    def seconds_until(self, amount: float = 1.0) -> float:
+        missing = amount - self.available()
+        return max(0.0, missing / self.refill_per_second) if self.refill_per_second else math.inf
+
+
+class SlidingWindowCounter:
+    """
+    Sliding-window counter: the previous fixed window's count, weighted by how much
+    of it still overlaps the sliding window, plus the current window's count.
+    Counts live in the session store so workers sharing it share the limit.
+    """
+
+    def __init__(self, store, key: str, limit: int, window: float):
+        self.store = store
+        self.key = key
+        self.limit = limit
+        self.window = window
+
+    def _estimate(self, now: float) -> float:
+        index = int(now // self.window)
+        counts = self.store.window_counts(self.key, (index - 1, index))
+        overlap = 1.0 - (now % self.window) / self.window
+        return counts.get(index - 1, 0) * overlap + counts.get(index, 0)
+
+    def remaining(self) -> int:
+        return max(0, math.floor(self.limit - self._estimate(time.time()) + 1e-9))
+
+    def try_add(self, amount: int = 1) -> bool:
+        """Counts amount if the limit allows it, in one atomic store call."""
+        now = time.time()
+        overlap = 1.0 - (now % self.window) / self.window
+        return self.store.consume_from_window(self.key, int(now // self.window), self.limit, overlap, amount)
+
+    def reset_in(self) -> float:
+        """Seconds until the current fixed window rolls over."""
+        return self.window - time.time() % self.window
+
+
+class TurnRateLimiter:
+    """Limits LLM turns by session (token bucket) and by Gemini API key (sliding window)."""
+
+    def __init__(self, store, session_burst: int = RATE_LIMIT_SESSION_BURST,
+                 session_per_minute: float = RATE_LIMIT_SESSION_PER_MINUTE,
+                 key_max_requests: int = RATE_LIMIT_KEY_MAX_REQUESTS, key_window: float = RATE_LIMIT_KEY_WINDOW,
+                 max_sessions: int = RATE_LIMIT_MAX_SESSIONS):
+        self.store = store
+        self.session_burst = session_burst
+        self.session_refill = session_per_minute / 60.0
+        self.key_max_requests = key_max_requests
+        self.key_window = key_window
+        self.max_sessions = max_sessions
+        self._buckets = OrderedDict()  # session_id -> TokenBucket
+        self._lock = threading.Lock()
+
+    def _bucket(self, session_id: str) -> TokenBucket:
+        """Caller holds the lock."""
+        bucket = self._buckets.get(session_id)
+        if bucket is None:
+            bucket = self._buckets[session_id] = TokenBucket(self.session_burst, self.session_refill)
+            while len(self._buckets) > self.max_sessions:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(session_id)
+        return bucket
+
+    def _key_counter(self, api_key: str) -> SlidingWindowCounter:
+        return SlidingWindowCounter(self.store, f"gemini:{api_key_id(api_key)}",
+                                    self.key_max_requests, self.key_window)
+
+    def try_acquire(self, session_id: str, api_key: str, key_counted: bool = False):
+        """
+        Counts one turn against both limits if both allow it. Returns None if the turn may
+        run, else a message for the user. key_counted skips the key's limit for a request
+        already counted by try_acquire_speculation. Blocking (the key's counter lives in the
+        session store), so call it off the event loop.
+        """
+        with self._lock:
+            bucket = self._bucket(session_id)
+            if bucket.available() < 1:
+                return SESSION_LIMIT_MESSAGE
+            if not key_counted and not self._key_counter(api_key).try_add():
+                return KEY_LIMIT_MESSAGE
+            bucket.consume()
+        return None
+
+    def try_acquire_speculation(self, session_id: str, api_key: str):
+        """
+        Counts a speculative Gemini request against the key's limit, since it reaches
+        upstream whether or not it is used; the session's bucket is only checked, and is
+        spent if the speculation becomes the turn. Same return value and blocking as try_acquire.
+        """
+        with self._lock:
+            if self._bucket(session_id).available() < 1:
+                return SESSION_LIMIT_MESSAGE
+            if not self._key_counter(api_key).try_add():
+                return KEY_LIMIT_MESSAGE
+        return None
+
+    def quota(self, session_id: str, api_key: str) -> dict:
+        with self._lock:
+            bucket = self._bucket(session_id)
+            counter = self._key_counter(api_key)
+            return {
+                "session": {
+                    "remaining": max(0, math.floor(bucket.available())),
+                    "burst": self.session_burst,
+                    "per_minute": self.session_refill * 60,
+                    "next_request_in_seconds": round(bucket.seconds_until(1), 1),
+                },
+                "api_key": {
+                    "remaining": counter.remaining(),
+                    "limit": self.key_max_requests,
+                    "window_seconds": self.key_window,
+                    "window_resets_in_seconds": round(counter.reset_in()),
+                },
+            }
@@ -0,0 +1,299 @@
+# services/session_store.py - Session state backends shared across worker processes
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+# "memory" keeps state in this process; "sqlite" shares it across workers and restarts
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE", "memory").strip().lower()
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", os.path.join("data", "sessions.sqlite3"))
+# How often queued history writes are flushed to the backend
+SESSION_STORE_FLUSH_SECONDS = float(os.getenv("SESSION_STORE_FLUSH_SECONDS", "1.0"))
+# How long a worker's lease on a live session lasts without renewal
+SESSION_LEASE_SECONDS = float(os.getenv("SESSION_LEASE_SECONDS", "30"))
+
+# Owner recorded in the leases this worker process takes
+WORKER_ID = uuid.uuid4().hex
+
+
+class SessionStore(ABC):
+    """
+    Backend interface for state that must outlive one process: chat history per
+    session, fixed-window request counters for shared rate limits, and leases naming
+    the worker a session is live on. API keys are never stored; they stay in the
+    memory of the worker holding the WebSocket.
+    """
+
+    # True if state written here is visible to other workers and survives restarts
+    shared = False
+
+    @abstractmethod
+    def load_history(self, session_id: str):
+        """Returns the saved history state for a session, or None."""
+
+    @abstractmethod
+    def save_history(self, session_id: str, state: dict):
+        """Replaces the saved history state for a session."""
+
+    @abstractmethod
+    def delete_history(self, session_id: str):
+        """Forgets a session's saved history."""
+
+    @abstractmethod
+    def consume_from_window(self, key: str, window: int, limit: float, previous_weight: float,
+                            amount: int = 1) -> bool:
+        """
+        Atomically adds amount to the counter for one fixed window if the sliding estimate
+        (previous window * previous_weight + this window) stays within limit; windows
+        before window - 1 may be pruned. False, and nothing added, if it would not.
+        """
+
+    @abstractmethod
+    def window_counts(self, key: str, windows) -> dict:
+        """Counters for the given fixed windows, as {window: count} (missing means 0)."""
+
+    @abstractmethod
+    def claim_session(self, session_id: str, owner: str, ttl: float = SESSION_LEASE_SECONDS) -> bool:
+        """Takes or renews the lease on a live session. False if another owner holds an unexpired one."""
+
+    @abstractmethod
+    def release_session(self, session_id: str, owner: str):
+        """Drops the lease if owner still holds it."""
+
+    def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """Single-process backend: plain dicts."""
+
+    def __init__(self):
+        self._histories = {}
+        self._windows = {}  # key -> {window: count}
+        self._leases = {}  # session_id -> (owner, expires_at)
+        self._lock = threading.Lock()
+
+    def load_history(self, session_id: str):
+        with self._lock:
+            return self._histories.get(session_id)
+
+    def save_history(self, session_id: str, state: dict):
+        with self._lock:
+            self._histories[session_id] = state
+
+    def delete_history(self, session_id: str):
+        with self._lock:
+            self._histories.pop(session_id, None)
+
+    def consume_from_window(self, key: str, window: int, limit: float, previous_weight: float,
+                            amount: int = 1) -> bool:
+        with self._lock:
+            counts = self._windows.setdefault(key, {})
+            for old in [w for w in counts if w < window - 1]:
+                del counts[old]
+            estimate = counts.get(window - 1, 0) * previous_weight + counts.get(window, 0)
+            if estimate + amount > limit + 1e-9:
+                return False
+            counts[window] = counts.get(window, 0) + amount
+            return True
+
+    def window_counts(self, key: str, windows) -> dict:
+        with self._lock:
+            counts = self._windows.get(key, {})
+            return {w: counts[w] for w in windows if w in counts}
+
+    def claim_session(self, session_id: str, owner: str, ttl: float = SESSION_LEASE_SECONDS) -> bool:
+        now = time.time()
+        with self._lock:
+            holder, expires_at = self._leases.get(session_id, (owner, 0.0))
+            if holder != owner and expires_at > now:
+                return False
+            self._leases[session_id] = (owner, now + ttl)
+            for expired in [sid for sid, (_, until) in self._leases.items() if until <= now]:
+                del self._leases[expired]
+            return True
+
+    def release_session(self, session_id: str, owner: str):
+        with self._lock:
+            if self._leases.get(session_id, (None,))[0] == owner:
+                del self._leases[session_id]
+
+
+class SQLiteSessionStore(SessionStore):
+    """Local SQLite file in WAL mode, safe for several worker processes on one host."""
+
+    shared = True
+
+    def __init__(self, path: str = SESSION_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_history ("
+                "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_windows ("
+                "key TEXT NOT NULL, window INTEGER NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (key, window))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_leases ("
+                "session_id TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        logger.info(f"🗄️ SQLite session store at {path}")
+
+    def load_history(self, session_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM chat_history WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_history(self, session_id: str, state: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO chat_history (session_id, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                (session_id, json.dumps(state), time.time()),
+            )
+
+    def delete_history(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_history WHERE session_id = ?", (session_id,))
+
+    def consume_from_window(self, key: str, window: int, limit: float, previous_weight: float,
+                            amount: int = 1) -> bool:
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so workers sharing the file
+            # can't both read the same count and pass the check
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                counts = dict(self._conn.execute(
+                    "SELECT window, count FROM rate_windows WHERE key = ? AND window IN (?, ?)",
+                    (key, window - 1, window),
+                ).fetchall())
+                estimate = counts.get(window - 1, 0) * previous_weight + counts.get(window, 0)
+                allowed = estimate + amount <= limit + 1e-9
+                if allowed:
+                    self._conn.execute(
+                        "INSERT INTO rate_windows (key, window, count) VALUES (?, ?, ?) "
+                        "ON CONFLICT(key, window) DO UPDATE SET count = count + excluded.count",
+                        (key, window, amount),
+                    )
+                    self._conn.execute("DELETE FROM rate_windows WHERE key = ? AND window < ?", (key, window - 1))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return allowed
+
+    def window_counts(self, key: str, windows) -> dict:
+        windows = list(windows)
+        placeholders = ", ".join("?" for _ in windows)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT window, count FROM rate_windows WHERE key = ? AND window IN ({placeholders})",
+                (key, *windows),
+            ).fetchall()
+        return dict(rows)
+
+    def claim_session(self, session_id: str, owner: str, ttl: float = SESSION_LEASE_SECONDS) -> bool:
+        now = time.time()
+        with self._lock:
+            # One statement, so two workers can never both take the same lease
+            cursor = self._conn.execute(
+                "INSERT INTO session_leases (session_id, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE session_leases.owner = excluded.owner OR session_leases.expires_at <= ?",
+                (session_id, owner, now + ttl, now),
+            )
+            claimed = cursor.rowcount > 0
+            if claimed:
+                self._conn.execute("DELETE FROM session_leases WHERE expires_at <= ?", (now,))
+        return claimed
+
+    def release_session(self, session_id: str, owner: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM session_leases WHERE session_id = ? AND owner = ?", (session_id, owner))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WriteBehindWriter:
+    """
+    Queues history writes and flushes them from a background thread, keeping only
+    the latest state per session so a burst of turns costs one write.
+    """
+
+    def __init__(self, store: SessionStore, flush_interval: float = SESSION_STORE_FLUSH_SECONDS):
+        self.store = store
+        self.flush_interval = flush_interval
+        self._pending = {}  # session_id -> latest state not yet written
+        self._lock = threading.Lock()
+        self._wakeup = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="vocalix-session-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, session_id: str, state: dict):
+        with self._lock:
+            self._pending[session_id] = state
+
+    def pending(self, session_id: str):
+        """Latest queued state, so reads in this process never see an older one."""
+        with self._lock:
+            return self._pending.get(session_id)
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._pending.pop(session_id, None)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for session_id, state in pending.items():
+            try:
+                self.store.save_history(session_id, state)
+            except Exception as e:
+                logger.error(f"❌ Could not persist history for session {session_id}: {e}")
+
+    def _run(self):
+        while True:
+            try:
+                stop = self._wakeup.get(timeout=self.flush_interval)
+            except queue.Empty:
+                stop = False
+            self.flush()
+            if stop:
+                return
+
+    def close(self):
+        """Flushes everything still queued and stops the writer thread."""
+        self._wakeup.put(True)
+        self._thread.join(timeout=10)
+
+
+def create_session_store(backend: str = SESSION_STORE_BACKEND) -> SessionStore:
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend != "memory":
+        logger.warning(f"⚠️ Unknown SESSION_STORE '{backend}', using memory")
+    return MemorySessionStore()
+
+
+# Backend for this process, chosen by SESSION_STORE
+session_store = create_session_store()
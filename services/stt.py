@@ -4,8 +4,6 @@ import assemblyai
 from fastapi import UploadFile
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def transcribe_audio(audio_file: UploadFile) -> str:
@@ -0,0 +1,123 @@
+# services/tool_cache.py - Shared TTL cache with request coalescing for tool calls
+
+import functools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+# Entries kept across all tools; least recently used go first
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "512"))
+
+
+def normalize_tool_arg(value) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a tool argument."""
+    return " ".join(str(value or "").lower().split()).strip(" ?!.,")
+
+
+def is_error_result(result) -> bool:
+    """Tools report failures as text starting with "Error"; those are never cached or shared."""
+    return isinstance(result, str) and result.startswith("Error")
+
+
+class ToolResultCache:
+    """
+    Caches tool results for a per-tool TTL. Concurrent identical calls share one
+    upstream request: the first caller runs the tool, the others wait for its result.
+    Thread-safe, since tools run on executor threads.
+    """
+
+    def __init__(self, max_entries: int = TOOL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._in_flight = {}  # key -> Future for the call currently running
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_call(self, key, ttl: float, func):
+        """Returns the cached result for key, or runs func() once and caches it for ttl seconds."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            logger.info(f"🔗 Joining in-flight {key[0]} call")
+            result = future.result()
+            if is_error_result(result):
+                # The leader's failure may be its own (a timeout, a bad key); try for ourselves
+                result = func()
+                if not is_error_result(result):
+                    self._store(key, ttl, result)
+            return result
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            if not is_error_result(result):
+                self._store(key, ttl, result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _store(self, key, ttl: float, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+# Shared cache for all sessions on this server
+tool_cache = ToolResultCache()
+
+
+def cached_tool(ttl: float, key_arg: str):
+    """
+    Decorator for tool functions: results are cached by the normalized params[key_arg]
+    and shared across sessions whatever API key they use; only successful results are
+    cached or shared, so one key's failure never reaches another.
+    """
+    def decorator(tool_func):
+        @functools.wraps(tool_func)
+        def wrapper(params: dict, api_key: str = None):
+            value = params.get(key_arg) if isinstance(params, dict) else params
+            normalized = normalize_tool_arg(value)
+            if ttl <= 0 or not normalized:
+                return tool_func(params, api_key=api_key)
+            key = (tool_func.__name__, normalized)
+            return tool_cache.get_or_call(key, ttl, lambda: tool_func(params, api_key=api_key))
+        return wrapper
+    return decorator
@@ -6,8 +6,25 @@ from tavily import TavilyClient
 import logging
 import requests
 
+from services import http_client
+from services.tool_cache import cached_tool
+
 logger = logging.getLogger(__name__)
 
+# How long tool results are shared across sessions (0 disables caching for that tool)
+SEARCH_CACHE_TTL = float(os.getenv("TOOL_CACHE_SEARCH_TTL_SECONDS", "900"))
+WEATHER_CACHE_TTL = float(os.getenv("TOOL_CACHE_WEATHER_TTL_SECONDS", "600"))
+
+# Upstream endpoints; override to use local stand-ins (see benchmarks/)
+TAVILY_API_URL = os.getenv("TAVILY_API_URL") or None  # None keeps the SDK's default
+OPENWEATHER_API_URL = os.getenv("OPENWEATHER_API_URL", "https://api.openweathermap.org/data/2.5/weather")
+
+# The Tavily SDK binds the API key into its session headers, so keep one warm client per key
+tavily_clients = http_client.keyed_clients(
+    lambda api_key: TavilyClient(api_key=api_key, api_base_url=TAVILY_API_URL, session=http_client.new_session())
+)
+
+@cached_tool(ttl=SEARCH_CACHE_TTL, key_arg="query")
 def web_search(params: dict, api_key: str = None) -> str:
     """
     Performs a web search using the Tavily API to find up-to-date information.
@@ -33,7 +50,7 @@ def web_search(params: dict, api_key: str = None) -> str:
             return "Error: Search query was not provided."
 
         logger.info(f"🛰️ Performing Tavily web search for: '{query}'")
-        tavily = TavilyClient(api_key=api_key)
+        tavily = tavily_clients.get(api_key)
         
         # FIXED: Use search_depth="advanced" for better content extraction
         # and include_raw_content=True to get actual content
@@ -42,7 +59,8 @@ def web_search(params: dict, api_key: str = None) -> str:
             search_depth="advanced",  # Changed from "basic" to "advanced"
             max_results=3,  # Reduced to 3 for better quality
             include_raw_content=True,  # NEW: Get actual content
-            include_answer=True  # NEW: Get Tavily's AI-generated answer
+            include_answer=True,  # NEW: Get Tavily's AI-generated answer
+            timeout=int(http_client.HTTP_READ_TIMEOUT)
         )
         
         results = response.get('results', [])
@@ -81,6 +99,7 @@ def web_search(params: dict, api_key: str = None) -> str:
         return f"Error: An exception occurred during web search: {str(e)}"
 
 
+@cached_tool(ttl=WEATHER_CACHE_TTL, key_arg="location")
 def get_current_weather(params: dict, api_key: str = None) -> str:
     """
     Gets the current weather for a specified location using the OpenWeatherMap API.
@@ -99,8 +118,7 @@ def get_current_weather(params: dict, api_key: str = None) -> str:
     logger.info(f"🌦️ Fetching weather for: '{location}'")
     
     try:
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={api_key}&units=metric"
-        response = requests.get(url)
+        response = http_client.get(OPENWEATHER_API_URL, params={"q": location, "appid": api_key, "units": "metric"})
         response.raise_for_status()
         
         weather_data = response.json()
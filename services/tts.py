@@ -1,28 +1,32 @@
 # services/tts.py
 import os
 import requests
+import httpx
 import time
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from services import http_client
+from services.tts_cache import tts_cache, tts_cache_key
+
 logger = logging.getLogger(__name__)
 
-def get_voices() -> list:
-    """Fetches the list of available voices from the Murf AI API."""
+MURF_API_URL = os.getenv("MURF_API_URL", "https://api.murf.ai").rstrip("/")
+MURF_VOICES_URL = f"{MURF_API_URL}/v1/speech/voices"
+
+def _murf_api_key() -> str:
     api_key = os.getenv("MURF_API_KEY")
     if not api_key:
         logger.error("MURF_API_KEY not found in environment variables.")
         raise ValueError("MURF_API_KEY not found.")
-    
-    api_key = api_key.strip()
-    
-    url = "https://api.murf.ai/v1/speech/voices"
-    headers = {"api-key": api_key}
+    return api_key.strip()
+
+def get_voices() -> list:
+    """Fetches the list of available voices from the Murf AI API."""
+    headers = {"api-key": _murf_api_key()}
     
     logger.info("Fetching voices from Murf AI...")
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(MURF_VOICES_URL, headers=headers)
         response.raise_for_status()
         
         voices = response.json()
@@ -32,18 +36,29 @@ def get_voices() -> list:
         logger.error(f"Error fetching voices: {e}")
         raise
 
+async def get_voices_async() -> list:
+    """Async get_voices for handlers on the event loop, over the shared httpx client."""
+    headers = {"api-key": _murf_api_key()}
+
+    logger.info("Fetching voices from Murf AI...")
+    try:
+        response = await http_client.get_async_client().get(MURF_VOICES_URL, headers=headers)
+        response.raise_for_status()
+
+        voices = response.json()
+        logger.info(f"Successfully fetched {len(voices)} voices from Murf AI.")
+        return voices
+    except httpx.HTTPError as e:
+        logger.error(f"Error fetching voices: {e}")
+        raise
+
 def generate_speech_audio(text: str, voice_id: str, session_id: str) -> str:
     """
     Generates speech audio using the Murf AI API.
     """
-    api_key = os.getenv("MURF_API_KEY")
-    if not api_key:
-        logger.error("MURF_API_KEY not found in environment variables.")
-        raise ValueError("MURF_API_KEY not found.")
+    api_key = _murf_api_key()
     
-    api_key = api_key.strip()
-    
-    generate_url = "https://api.murf.ai/v1/speech/generate" 
+    generate_url = f"{MURF_API_URL}/v1/speech/generate"
     headers = {
         "Content-Type": "application/json",
         "api-key": api_key
@@ -56,11 +71,24 @@ def generate_speech_audio(text: str, voice_id: str, session_id: str) -> str:
         "sampleRate": 24000,
         "modelVersion": "GEN2"
     }
-    
+
+    audio_filename = f"response_{session_id}.mp3"
+    audio_filepath = os.path.join("static", audio_filename)
+
+    # Repeated phrases are served from the TTS cache without calling Murf
+    cache_key = tts_cache_key(text, voice_id=voice_id, audio_format="MP3",
+                              sample_rate=24000, model_version="GEN2")
+    cached_audio = tts_cache.get(cache_key) if cache_key else None
+    if cached_audio:
+        with open(audio_filepath, "wb") as f:
+            f.write(cached_audio)
+        logger.info("💾 TTS cache hit, skipped Murf generation")
+        return f"/static/{audio_filename}?v={time.time()}"
+
     logger.info(f"Requesting speech generation from Murf AI...")
     
     try:
-        response = requests.post(generate_url, json=payload, headers=headers)
+        response = http_client.post(generate_url, json=payload, headers=headers)
         response.raise_for_status()
         response_data = response.json()
 
@@ -70,12 +98,11 @@ def generate_speech_audio(text: str, voice_id: str, session_id: str) -> str:
             raise Exception("Failed to get audio URL from Murf AI.")
 
         logger.info(f"Downloading generated audio from {audio_url_from_api}")
-        audio_response = requests.get(audio_url_from_api)
+        audio_response = http_client.get(audio_url_from_api)
         audio_response.raise_for_status()
+        if cache_key:
+            tts_cache.put(cache_key, audio_response.content)
 
-        audio_filename = f"response_{session_id}.mp3"
-        audio_filepath = os.path.join("static", audio_filename)
-        
         with open(audio_filepath, "wb") as f:
             f.write(audio_response.content)
         
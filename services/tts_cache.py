@@ -0,0 +1,152 @@
+# services/tts_cache.py - Content-addressed cache for synthesized speech audio
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").strip().lower() == "true"
+# In-memory LRU tier, bounded by total audio bytes
+TTS_CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+# On-disk tier; survives restarts. Empty TTS_CACHE_DIR disables it.
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(".cache", "tts"))
+TTS_CACHE_DISK_BYTES = int(os.getenv("TTS_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+# Only short phrases repeat often enough to be worth caching
+TTS_CACHE_MAX_TEXT_CHARS = int(os.getenv("TTS_CACHE_MAX_TEXT_CHARS", "300"))
+# How long a turn waits after its first text for the rest of a short reply, so the whole
+# reply can be looked up; overlaps the Murf acquire, so a warm turn barely notices it
+TTS_CACHE_LOOKUP_WAIT = float(os.getenv("TTS_CACHE_LOOKUP_WAIT_MS", "250")) / 1000
+
+
+def normalize_tts_text(text: str) -> str:
+    """Collapses whitespace; case and punctuation are kept since they change the speech."""
+    return " ".join(text.split())
+
+
+def tts_cache_key(text: str, **voice_settings):
+    """Key for the audio of `text` in a given voice/format, or None if it shouldn't be cached."""
+    text = normalize_tts_text(text)
+    if not TTS_CACHE_ENABLED or not text or len(text) > TTS_CACHE_MAX_TEXT_CHARS:
+        return None
+    material = json.dumps({"text": text, **voice_settings}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Two-tier audio cache: a byte-bounded LRU in memory in front of a directory on disk.
+    Thread-safe; disk access blocks, so call get/put off the event loop."""
+
+    def __init__(self, max_memory_bytes: int = TTS_CACHE_MEMORY_BYTES, cache_dir: str = TTS_CACHE_DIR,
+                 max_disk_bytes: int = TTS_CACHE_DISK_BYTES):
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> audio bytes, least recently used first
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".audio")
+
+    def _remember(self, key: str, audio: bytes):
+        """Adds to the memory tier, evicting least recently used entries past the budget."""
+        if len(audio) > self.max_memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= len(self._memory.pop(key))
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get(self, key: str):
+        """Returns cached audio bytes, or None on a miss."""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+
+        if self.cache_dir:
+            try:
+                with open(self._path(key), "rb") as f:
+                    audio = f.read()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"💾 Could not read TTS cache entry {key[:12]}: {e}")
+
+        if audio:
+            self._remember(key, audio)
+            with self._lock:
+                self.disk_hits += 1
+            return audio
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, audio: bytes):
+        """Stores audio in both tiers."""
+        if not key or not audio:
+            return
+        self._remember(key, audio)
+        if not self.cache_dir:
+            return
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(audio)
+            os.replace(temp_path, path)
+            self._prune_disk()
+        except OSError as e:
+            logger.warning(f"💾 Could not write TTS cache entry {key[:12]}: {e}")
+
+    def _prune_disk(self):
+        """Deletes the oldest files once the disk tier is over budget."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".audio"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
+# Shared cache for all sessions on this server
+tts_cache = TTSCache()
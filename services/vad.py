@@ -0,0 +1,179 @@
+# services/vad.py - Energy/zero-crossing voice activity gate in front of the STT stream
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").strip().lower() == "true"
+VAD_SAMPLE_RATE = 16000
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "20"))
+# A frame is speech if its RMS clears both this floor (PCM16 units) and the adaptive noise floor
+VAD_MIN_RMS = float(os.getenv("VAD_MIN_RMS", "150"))
+VAD_NOISE_RATIO = float(os.getenv("VAD_NOISE_RATIO", "3.0"))
+# Frames crossing zero more often than this (fraction of samples) are hiss, not voice
+VAD_MAX_ZCR = float(os.getenv("VAD_MAX_ZCR", "0.35"))
+# Audio kept flowing after speech stops. Must exceed the STT's max_turn_silence (1.5 s),
+# or AssemblyAI never hears the silence that ends the turn.
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "2000"))
+# Audio from before the onset replayed when speech starts, so first syllables aren't clipped
+VAD_PREROLL_MS = int(os.getenv("VAD_PREROLL_MS", "300"))
+# While suppressing, one silent frame is sent this often so the STT session stays alive
+VAD_KEEPALIVE_SECONDS = float(os.getenv("VAD_KEEPALIVE_SECONDS", "5"))
+# Shortest audio message sent to the sink; AssemblyAI v3 rejects messages under 50 ms
+VAD_MIN_SEND_MS = int(os.getenv("VAD_MIN_SEND_MS", "50"))
+
+
+def frame_features(samples: np.ndarray, frame_samples: int):
+    """Per-frame RMS and zero-crossing rate for whole frames of PCM16 samples."""
+    frames = samples[:len(samples) - len(samples) % frame_samples].reshape(-1, frame_samples).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_samples
+    return rms, zcr
+
+
+class VadTotals:
+    """Process-wide audio seconds seen and forwarded, for /metrics."""
+
+    def __init__(self):
+        self.seconds_in = 0.0
+        self.seconds_forwarded = 0.0
+        self.keepalives = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds_in: float = 0.0, seconds_forwarded: float = 0.0, keepalives: int = 0):
+        with self._lock:
+            self.seconds_in += seconds_in
+            self.seconds_forwarded += seconds_forwarded
+            self.keepalives += keepalives
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "seconds_in": round(self.seconds_in, 3),
+                "seconds_forwarded": round(self.seconds_forwarded, 3),
+                "seconds_suppressed": round(self.seconds_in - self.seconds_forwarded, 3),
+                "keepalives": self.keepalives,
+            }
+
+
+vad_totals = VadTotals()
+
+
+class VoiceActivityGate:
+    """
+    Passes speech (plus pre-roll and hangover) to sink and drops long silences.
+    Takes PCM16 mono chunks of any size; not thread-safe, call from one thread
+    (the session's ingest sender).
+    """
+
+    def __init__(self, sink, name: str = "", sample_rate: int = VAD_SAMPLE_RATE, frame_ms: int = VAD_FRAME_MS,
+                 hangover_ms: int = VAD_HANGOVER_MS, preroll_ms: int = VAD_PREROLL_MS,
+                 keepalive_seconds: float = VAD_KEEPALIVE_SECONDS, keepalive_ms: int = None,
+                 min_send_ms: int = VAD_MIN_SEND_MS):
+        self.sink = sink
+        self.name = name
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self.frame_seconds = frame_ms / 1000
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.keepalive_seconds = keepalive_seconds
+        self.noise_floor = VAD_MIN_RMS / VAD_NOISE_RATIO
+
+        self._remainder = b""
+        self._preroll = deque(maxlen=max(0, preroll_ms // frame_ms))
+        self._hangover_left = 0  # Frames still forwarded after the last speech frame
+        self._last_sent = time.monotonic()
+        self.min_send_bytes = sample_rate * min_send_ms // 1000 * 2
+        self._held = []  # Forwarded frames not yet sent because together they are under min_send_bytes
+        # Keepalives are silence of at least the minimum message length (longer if the sink asks)
+        self._silent_frame = bytes(max(self.frame_bytes, self.min_send_bytes,
+                                       sample_rate * (keepalive_ms or 0) // 1000 * 2))
+
+        self.frames_in = 0
+        self.frames_forwarded = 0
+        self.speech_segments = 0
+        self.keepalives = 0
+
+    @property
+    def active(self) -> bool:
+        return self._hangover_left > 0
+
+    def _send(self, frames: list, pad: bool = False):
+        """Sends frames plus any held ones once they reach min_send_bytes; pad tops up a short tail with silence."""
+        self._held.extend(frames)
+        held_bytes = sum(len(frame) for frame in self._held)
+        if not self._held or (held_bytes < self.min_send_bytes and not pad):
+            return
+        if held_bytes < self.min_send_bytes:
+            self._held.append(bytes(self.min_send_bytes - held_bytes))
+        self.sink(b"".join(self._held))
+        self._held = []
+        self._last_sent = time.monotonic()
+
+    def process(self, chunk: bytes):
+        data = self._remainder + chunk
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+        if not usable:
+            return
+
+        rms, zcr = frame_features(np.frombuffer(data[:usable], dtype=np.int16), self.frame_samples)
+        threshold = max(VAD_MIN_RMS, self.noise_floor * VAD_NOISE_RATIO)
+        speech = (rms >= threshold) & (zcr <= VAD_MAX_ZCR)
+        quiet = rms < threshold
+        if quiet.any():
+            # Track background noise from the quiet frames only, slowly; loud frames rejected
+            # for their zero-crossing rate (fricatives, hiss) must not raise the floor
+            self.noise_floor = 0.9 * self.noise_floor + 0.1 * float(np.median(rms[quiet]))
+
+        forward = []
+        view = memoryview(data)
+        for index, is_speech in enumerate(speech):
+            frame = view[index * self.frame_bytes:(index + 1) * self.frame_bytes]
+            if is_speech:
+                if not self.active:
+                    self.speech_segments += 1
+                    forward.extend(self._preroll)
+                    self._preroll.clear()
+                self._hangover_left = self.hangover_frames
+                forward.append(frame)
+            elif self.active:
+                self._hangover_left -= 1
+                forward.append(frame)
+            else:
+                self._preroll.append(bytes(frame))
+
+        self.frames_in += len(speech)
+        self.frames_forwarded += len(forward)
+        keepalive = (not forward and not self._held
+                     and time.monotonic() - self._last_sent >= self.keepalive_seconds)
+        if forward or self._held:
+            # Once the gate has closed nothing follows for a while, so a short tail is padded and sent
+            self._send(forward, pad=not self.active)
+        elif keepalive:
+            self.keepalives += 1
+            self._send([self._silent_frame])
+        vad_totals.add(seconds_in=len(speech) * self.frame_seconds,
+                       seconds_forwarded=len(forward) * self.frame_seconds, keepalives=int(keepalive))
+
+    def flush(self):
+        """Sends any held tail, padded to the minimum message length."""
+        self._send([], pad=True)
+
+    def stats(self) -> dict:
+        seconds_in = self.frames_in * self.frame_seconds
+        seconds_forwarded = self.frames_forwarded * self.frame_seconds
+        return {
+            "seconds_in": round(seconds_in, 2),
+            "seconds_forwarded": round(seconds_forwarded, 2),
+            "suppressed_percent": round(100 * (1 - seconds_forwarded / seconds_in), 1) if seconds_in else 0.0,
+            "speech_segments": self.speech_segments,
+            "keepalives": self.keepalives,
+        }
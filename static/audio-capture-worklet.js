@@ -0,0 +1,32 @@
+// audio-capture-worklet.js - Mic capture on the audio thread, posting small PCM16 frames
+
+class PCM16CaptureProcessor extends AudioWorkletProcessor {
+  constructor(options) {
+    super();
+    const frameMs = (options.processorOptions || {}).frameMs || 50;
+    // sampleRate is the AudioContext rate (16 kHz for the recording context)
+    this.frameSamples = Math.round((sampleRate * frameMs) / 1000);
+    this.frame = new Int16Array(this.frameSamples);
+    this.filled = 0;
+  }
+
+  process(inputs) {
+    const channel = inputs[0] && inputs[0][0];
+    if (!channel) return true;
+
+    for (let i = 0; i < channel.length; i++) {
+      const sample = Math.max(-1, Math.min(1, channel[i]));
+      this.frame[this.filled++] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+
+      if (this.filled === this.frameSamples) {
+        // Hand the buffer over without copying and start a fresh one
+        this.port.postMessage(this.frame.buffer, [this.frame.buffer]);
+        this.frame = new Int16Array(this.frameSamples);
+        this.filled = 0;
+      }
+    }
+    return true;
+  }
+}
+
+registerProcessor("pcm16-capture", PCM16CaptureProcessor);
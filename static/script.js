@@ -195,6 +195,7 @@ document.addEventListener("DOMContentLoaded", async () => {
       gainNode.connect(window.audioContext.destination);
       gainNode.gain.setValueAtTime(0.7, window.audioContext.currentTime);
       source.start(0);
+      window.currentSource = source;
       isPlayingAudio = true;
 
       source.onended = () => {
@@ -314,8 +315,260 @@ document.addEventListener("DOMContentLoaded", async () => {
     }
   }
 
+  // Progressive playback: PCM chunks are scheduled back to back as they arrive
+  window.progressiveAudio = null;
+
+  function pcm16ToAudioBuffer(bytes, sampleRate, numChannels) {
+    const samples = new Int16Array(
+      bytes.buffer,
+      bytes.byteOffset,
+      Math.floor(bytes.byteLength / 2)
+    );
+    const frameCount = Math.floor(samples.length / numChannels);
+    const audioBuffer = window.audioContext.createBuffer(
+      numChannels,
+      frameCount,
+      sampleRate
+    );
+    for (let channel = 0; channel < numChannels; channel++) {
+      const channelData = audioBuffer.getChannelData(channel);
+      for (let i = 0; i < frameCount; i++) {
+        channelData[i] = samples[i * numChannels + channel] / 0x8000;
+      }
+    }
+    return audioBuffer;
+  }
+
+  function startProgressiveTurn(turnNumber) {
+    window.progressiveAudio = {
+      turn: turnNumber,
+      nextStartTime: 0,
+      sources: [],
+      expectedSequence: 0,
+      chunks: 0,
+      duration: 0,
+      finished: false,
+    };
+    console.log(`🎯 NEW TURN: Progressive playback for turn ${turnNumber}`);
+    setAgentStatus("🔊 Playing Audio...", "green");
+    return window.progressiveAudio;
+  }
+
+  function finishProgressiveTurn(state) {
+    console.log(
+      `✅ Progressive playback completed: ${state.duration.toFixed(3)}s (${state.chunks} chunks)`
+    );
+    window.audioChunks.push({
+      turn: state.turn,
+      chunks: state.chunks,
+      duration: state.duration,
+      success: true,
+      timestamp: new Date().toISOString(),
+    });
+    isPlayingAudio = false;
+    if (window.progressiveAudio === state) {
+      window.progressiveAudio = null;
+    }
+    setAgentStatus("Turn Detection + LLM Ready", "green");
+  }
+
+  function schedulePcmChunk(state, bytes, sampleRate, numChannels) {
+    if (bytes.byteLength < 2) return;
+
+    const audioBuffer = pcm16ToAudioBuffer(bytes, sampleRate, numChannels);
+    const source = window.audioContext.createBufferSource();
+    source.buffer = audioBuffer;
+    const gainNode = window.audioContext.createGain();
+    source.connect(gainNode);
+    gainNode.connect(window.audioContext.destination);
+    gainNode.gain.setValueAtTime(0.7, window.audioContext.currentTime);
+
+    // Small lead time so the first chunk and any late chunk don't glitch
+    const startAt = Math.max(
+      state.nextStartTime,
+      window.audioContext.currentTime + 0.05
+    );
+    source.start(startAt);
+    state.nextStartTime = startAt + audioBuffer.duration;
+    state.duration += audioBuffer.duration;
+    state.chunks++;
+    state.sources.push(source);
+    isPlayingAudio = true;
+
+    source.onended = () => {
+      state.sources = state.sources.filter((s) => s !== source);
+      if (state.finished && state.sources.length === 0) {
+        finishProgressiveTurn(state);
+      }
+    };
+  }
+
+  async function handleProgressivePcm(
+    turnNumber,
+    sequence,
+    final,
+    bytes,
+    sampleRate,
+    numChannels
+  ) {
+    try {
+      await initAudioContext();
+    } catch (error) {
+      console.error("❌ Audio context error:", error);
+      setAgentStatus("❌ Audio Context Error", "red");
+      return;
+    }
+
+    let state = window.progressiveAudio;
+    if (!state || state.turn !== turnNumber) {
+      state = startProgressiveTurn(turnNumber);
+    }
+
+    if (final) {
+      state.finished = true;
+      if (state.sources.length === 0) {
+        finishProgressiveTurn(state);
+      }
+      return;
+    }
+
+    if (sequence !== state.expectedSequence) {
+      console.warn(
+        `⚠️ Audio chunk out of order: expected ${state.expectedSequence}, got ${sequence}`
+      );
+    }
+    state.expectedSequence = sequence + 1;
+
+    if (bytes && bytes.byteLength > 0) {
+      schedulePcmChunk(
+        state,
+        bytes,
+        sampleRate || state.sampleRate || 44100,
+        numChannels || state.channels || 1
+      );
+    }
+  }
+
+  function handleProgressiveAudioChunk(data) {
+    const bytes =
+      data.audio_data && data.audio_data.length > 0
+        ? base64ToUint8Array(data.audio_data)
+        : null;
+    handleProgressivePcm(
+      data.turn_number,
+      data.sequence,
+      data.final,
+      bytes,
+      data.sample_rate,
+      data.channels
+    );
+  }
+
+  // Barge-in: audio for turns at or below this number is dropped
+  window.interruptedTurn = 0;
+
+  function flushPlayback(turnNumber) {
+    if (turnNumber) {
+      window.interruptedTurn = Math.max(window.interruptedTurn, turnNumber);
+    }
+    const state = window.progressiveAudio;
+    if (state) {
+      state.sources.forEach((source) => {
+        source.onended = null;
+        try {
+          source.stop();
+        } catch (error) {
+          // Already stopped
+        }
+      });
+      window.progressiveAudio = null;
+    }
+    if (window.currentSource) {
+      window.currentSource.onended = null;
+      try {
+        window.currentSource.stop();
+      } catch (error) {
+        // Already stopped
+      }
+      window.currentSource = null;
+    }
+    window.currentTurnAudio = null;
+    isPlayingAudio = false;
+    console.log(`🛑 Playback flushed (turn ${turnNumber || "current"})`);
+  }
+
+  function isInterruptedTurn(turnNumber) {
+    return turnNumber <= window.interruptedTurn;
+  }
+
+  // Binary audio frames: 12-byte header (version, flags, reserved, turn, sequence) + audio
+  const AUDIO_FRAME_HEADER_SIZE = 12;
+  const AUDIO_FLAG_FINAL = 0x01;
+  const AUDIO_FLAG_WAV = 0x02;
+
+  function handleAudioStreamStart(data) {
+    let state = window.progressiveAudio;
+    if (!state || state.turn !== data.turn_number) {
+      state = startProgressiveTurn(data.turn_number);
+    }
+    state.sampleRate = data.sample_rate;
+    state.channels = data.channels;
+  }
+
+  async function handleBinaryAudioFrame(buffer) {
+    const view = new DataView(buffer);
+    const version = view.getUint8(0);
+    if (version !== 1) {
+      console.warn(`⚠️ Unsupported audio frame version ${version}`);
+      return;
+    }
+    const flags = view.getUint8(1);
+    const turnNumber = view.getUint32(4, true);
+    const sequence = view.getUint32(8, true);
+    const payload = new Uint8Array(buffer, AUDIO_FRAME_HEADER_SIZE);
+    if (isInterruptedTurn(turnNumber)) return;
+
+    if (flags & AUDIO_FLAG_WAV) {
+      await playCompleteWav(turnNumber, payload);
+      return;
+    }
+
+    handleProgressivePcm(
+      turnNumber,
+      sequence,
+      (flags & AUDIO_FLAG_FINAL) !== 0,
+      payload
+    );
+  }
+
+  async function playCompleteWav(turnNumber, wavBytes) {
+    try {
+      await initAudioContext();
+      setAgentStatus("🔄 Processing Audio...", "orange");
+      // decodeAudioData detaches its input, so hand it its own copy
+      const audioBuffer = await window.audioContext.decodeAudioData(
+        wavBytes.slice().buffer
+      );
+      window.audioChunks.push({
+        turn: turnNumber,
+        chunks: 1,
+        duration: audioBuffer.duration,
+        success: true,
+        timestamp: new Date().toISOString(),
+      });
+      setAgentStatus("🔊 Playing Audio...", "green");
+      playCompleteAudio(audioBuffer);
+    } catch (error) {
+      console.error(`❌ AUDIO PROCESSING FAILED: ${error.message}`);
+      setAgentStatus("❌ Audio Decode Failed", "red");
+    }
+  }
+
   function handleAudioStreamingComplete(data) {
     console.log(`🎵 Audio streaming complete for turn ${data.turn_number}`);
+    if (data.progressive) {
+      return; // The final audio_chunk marker already closed the turn
+    }
     if (
       window.currentTurnAudio &&
       window.currentTurnAudio.base64Chunks.length > 0
@@ -384,24 +637,37 @@ document.addEventListener("DOMContentLoaded", async () => {
 
     const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
     ws = new WebSocket(`${protocol}//${window.location.host}/ws`);
+    ws.binaryType = "arraybuffer";
 
     ws.onopen = () => {
       console.log("✅ WebSocket connected, sending API keys...");
       // ⭐ MODIFIED: Send keys as the first message
       ws.send(JSON.stringify({
           type: "configure_api_keys",
-          keys: apiKeys
+          keys: apiKeys,
+          capabilities: { binary_audio: true },
+          // Pick the conversation up where it left off after a reconnect or server restart
+          resume_session_id: localStorage.getItem("sessionId")
       }));
       setAgentStatus("Authenticating...", "blue");
       reconnectAttempts = 0;
     };
 
     ws.onmessage = (event) => {
+      if (event.data instanceof ArrayBuffer) {
+        handleBinaryAudioFrame(event.data);
+        return;
+      }
       try {
         const data = JSON.parse(event.data);
         switch (data.type) {
           case "connection_established":
+            window.interruptedTurn = 0; // Turn numbers restart with each connection
+            if (data.session_id) localStorage.setItem("sessionId", data.session_id);
             setAgentStatus("Turn Detection + LLM Ready", "green");
+            if (data.setup_ms !== undefined) {
+              console.log(`⏱️ Session ready in ${data.setup_ms} ms (STT handshake ${data.stt_connect_ms} ms)`);
+            }
             displaySystemMessage("🎙️ Audio system ready - speak naturally!");
             break;
 
@@ -440,7 +706,23 @@ document.addEventListener("DOMContentLoaded", async () => {
             break;
 
           case "audio_chunk":
-            handleAudioChunk(data);
+            if (isInterruptedTurn(data.turn_number)) break;
+            if (data.progressive) {
+              handleProgressiveAudioChunk(data);
+            } else {
+              handleAudioChunk(data);
+            }
+            break;
+
+          case "audio_stream_start":
+            if (isInterruptedTurn(data.turn_number)) break;
+            handleAudioStreamStart(data);
+            break;
+
+          case "playback_interrupt":
+            flushPlayback(data.turn_number);
+            displaySystemMessage(`🛑 Interrupted turn #${data.turn_number}`);
+            setAgentStatus("Turn Detection + LLM Ready", "green");
             break;
 
           case "audio_streaming_complete":
@@ -499,6 +781,8 @@ document.addEventListener("DOMContentLoaded", async () => {
   let isRecording = false;
   let recordingAudioContext;
   let processor;
+  // Mic frame duration when capturing with an AudioWorklet (the ScriptProcessor fallback sends 256 ms)
+  const CAPTURE_FRAME_MS = 50;
 
   const recordButton = document.getElementById("record-button");
   const recordIcon = document.getElementById("record-icon");
@@ -530,6 +814,39 @@ document.addEventListener("DOMContentLoaded", async () => {
     return int16Buffer;
   }
 
+  function sendMicFrame(buffer) {
+    if (isRecording && ws && ws.readyState === WebSocket.OPEN) {
+      ws.send(buffer);
+    }
+  }
+
+  // Small fixed frames from an AudioWorklet where supported, else 4096-sample ScriptProcessor buffers
+  async function createCaptureNode(context) {
+    if (context.audioWorklet && window.AudioWorkletNode) {
+      try {
+        await context.audioWorklet.addModule("/static/audio-capture-worklet.js");
+        const node = new AudioWorkletNode(context, "pcm16-capture", {
+          numberOfInputs: 1,
+          numberOfOutputs: 1,
+          channelCount: 1,
+          processorOptions: { frameMs: CAPTURE_FRAME_MS },
+        });
+        node.port.onmessage = (event) => sendMicFrame(event.data);
+        console.log(`🎛️ AudioWorklet capture (${CAPTURE_FRAME_MS} ms frames)`);
+        return node;
+      } catch (error) {
+        console.warn("⚠️ AudioWorklet unavailable, using ScriptProcessor:", error);
+      }
+    }
+
+    const node = context.createScriptProcessor(4096, 1, 1);
+    node.onaudioprocess = (event) => {
+      const inputData = event.inputBuffer.getChannelData(0);
+      sendMicFrame(convertFloat32ToInt16(inputData).buffer);
+    };
+    return node;
+  }
+
   async function startRecording() {
     try {
       if (!ws || ws.readyState !== WebSocket.OPEN) {
@@ -560,15 +877,7 @@ document.addEventListener("DOMContentLoaded", async () => {
       });
 
       const source = recordingAudioContext.createMediaStreamSource(stream);
-      processor = recordingAudioContext.createScriptProcessor(4096, 1, 1);
-
-      processor.onaudioprocess = (event) => {
-        if (isRecording && ws && ws.readyState === WebSocket.OPEN) {
-          const inputData = event.inputBuffer.getChannelData(0);
-          const int16Data = convertFloat32ToInt16(inputData);
-          ws.send(int16Data.buffer);
-        }
-      };
+      processor = await createCaptureNode(recordingAudioContext);
 
       source.connect(processor);
       processor.connect(recordingAudioContext.destination);
@@ -591,7 +900,16 @@ document.addEventListener("DOMContentLoaded", async () => {
     updateButtonUI(false);
     setAgentStatus("⏹️ Stopping...", "orange");
 
+    // Stop any answer still in flight
+    flushPlayback();
+    if (ws && ws.readyState === WebSocket.OPEN) {
+      ws.send(JSON.stringify({ type: "interrupt" }));
+    }
+
     if (processor) {
+      if (processor.port) {
+        processor.port.onmessage = null;
+      }
       processor.disconnect();
       processor = null;
     }
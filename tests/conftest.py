@@ -0,0 +1,6 @@
+# tests/conftest.py - Makes the repo's top-level packages importable from the tests
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,95 @@
+# tests/test_audio_ingest.py - Bounded STT ingest queue: ordering, overflow policies, close
+
+import threading
+
+from services.audio_ingest import AudioIngest
+
+
+class BlockingSink:
+    """Collects frames; holds the sender thread on its first frame until released."""
+
+    def __init__(self):
+        self.frames = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, frame):
+        self.started.set()
+        self.release.wait(timeout=5)
+        self.frames.append(frame)
+
+
+def test_frames_are_sent_in_order():
+    sent = []
+    ingest = AudioIngest(sent.append, name="order")
+    for index in range(20):
+        assert ingest.put(bytes([index]) * 4)
+    ingest.close()
+    assert sent == [bytes([index]) * 4 for index in range(20)]
+    assert ingest.stats()["frames_sent"] == 20
+
+
+def _fill_while_blocked(overflow):
+    sink = BlockingSink()
+    ingest = AudioIngest(sink, name=overflow, max_bytes=8, overflow=overflow)
+    ingest.put(b"a" * 4)
+    assert sink.started.wait(timeout=5)  # "a" is in flight, the queue is empty
+    results = [ingest.put(frame * 4) for frame in (b"b", b"c", b"d")]
+    sink.release.set()
+    ingest.close()
+    return ingest, sink.frames, results
+
+
+def test_drop_oldest_keeps_the_freshest_audio():
+    ingest, frames, results = _fill_while_blocked("drop_oldest")
+    assert frames == [b"a" * 4, b"c" * 4, b"d" * 4]
+    assert results == [True, True, False]
+    assert ingest.stats()["frames_dropped"] == 1
+    assert ingest.stats()["bytes_dropped"] == 4
+
+
+def test_drop_newest_keeps_what_is_queued():
+    ingest, frames, results = _fill_while_blocked("drop_newest")
+    assert frames == [b"a" * 4, b"b" * 4, b"c" * 4]
+    assert results == [True, True, False]
+    assert ingest.stats()["frames_dropped"] == 1
+
+
+def test_unknown_overflow_policy_falls_back_to_drop_oldest():
+    ingest = AudioIngest([].append, name="fallback", overflow="bogus")
+    assert ingest.overflow == "drop_oldest"
+    ingest.close()
+
+
+def test_close_runs_on_close_on_the_sender_thread_after_the_last_frame():
+    events = []
+    ingest = AudioIngest(lambda frame: events.append(("frame", threading.current_thread().name)),
+                         name="flush", on_close=lambda: events.append(("close", threading.current_thread().name)))
+    ingest.put(b"xx")
+    ingest.close()
+    assert [kind for kind, _ in events] == ["frame", "close"]
+    assert events[0][1] == events[1][1] != threading.current_thread().name
+
+
+def test_put_after_close_is_refused():
+    sent = []
+    ingest = AudioIngest(sent.append, name="closed")
+    ingest.close()
+    assert not ingest.put(b"late")
+    assert sent == []
+
+
+def test_sink_errors_are_counted_and_do_not_stop_the_sender():
+    sent = []
+
+    def flaky(frame):
+        if frame == b"bad":
+            raise RuntimeError("boom")
+        sent.append(frame)
+
+    ingest = AudioIngest(flaky, name="errors")
+    for frame in (b"ok1", b"bad", b"ok2"):
+        ingest.put(frame)
+    ingest.close()
+    assert sent == [b"ok1", b"ok2"]
+    assert ingest.stats()["send_errors"] == 1
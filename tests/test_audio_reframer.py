@@ -0,0 +1,72 @@
+# tests/test_audio_reframer.py - Fixed-duration re-framing: uniform frames, ring wrap, flush padding
+
+import os
+
+from services.audio_reframer import AudioReframer
+
+FRAME_BYTES = 1600  # 50 ms at 16 kHz PCM16
+
+
+def reframe(audio: bytes, chunk_sizes, ring_frames: int = 8):
+    sent = []
+    reframer = AudioReframer(sent.append, name="test", frame_ms=50, ring_frames=ring_frames)
+    offset = index = 0
+    while offset < len(audio):
+        size = chunk_sizes[index % len(chunk_sizes)]
+        reframer.process(audio[offset:offset + size])
+        offset += size
+        index += 1
+    return reframer, sent
+
+
+def test_frames_are_uniform_and_lossless_across_chunk_sizes():
+    audio = os.urandom(FRAME_BYTES * 40)
+    reframer, sent = reframe(audio, [2, 640, 8192, 3000, 1600, 40000])
+    assert all(len(frame) == FRAME_BYTES for frame in sent)
+    assert b"".join(sent) == audio
+    assert reframer.stats()["frames_out"] == 40
+    assert reframer.stats()["buffered_bytes"] == 0
+
+
+def test_ring_wraps_without_corrupting_frames():
+    # A two-frame ring with chunks that straddle the end of the buffer
+    audio = os.urandom(FRAME_BYTES * 25)
+    _, sent = reframe(audio, [1000, 2100, 700], ring_frames=2)
+    assert b"".join(sent) == audio
+
+
+def test_chunk_larger_than_the_ring_is_emitted_in_full():
+    audio = os.urandom(FRAME_BYTES * 20)
+    _, sent = reframe(audio, [len(audio)], ring_frames=2)
+    assert len(sent) == 20
+    assert b"".join(sent) == audio
+
+
+def test_partial_frame_is_held_until_complete():
+    sent = []
+    reframer = AudioReframer(sent.append, frame_ms=50)
+    reframer.process(b"\x01" * 1000)
+    assert sent == []
+    assert reframer.stats()["buffered_bytes"] == 1000
+    reframer.process(b"\x02" * 600)
+    assert sent == [b"\x01" * 1000 + b"\x02" * 600]
+
+
+def test_flush_pads_the_tail_with_silence():
+    sent = []
+    reframer = AudioReframer(sent.append, frame_ms=50)
+    reframer.process(b"\x07" * 2000)
+    reframer.flush()
+    assert sent == [b"\x07" * FRAME_BYTES, b"\x07" * 400 + bytes(FRAME_BYTES - 400)]
+    assert reframer.stats()["padded_frames"] == 1
+    reframer.flush()
+    assert len(sent) == 2  # Nothing left to flush
+
+
+def test_frames_are_independent_copies():
+    sent = []
+    reframer = AudioReframer(sent.append, frame_ms=50, ring_frames=2)
+    reframer.process(b"\x01" * FRAME_BYTES)
+    reframer.process(b"\x02" * FRAME_BYTES * 2)
+    assert all(isinstance(frame, bytes) for frame in sent)
+    assert sent[0] == b"\x01" * FRAME_BYTES
@@ -0,0 +1,60 @@
+# tests/test_history.py - Recording turns from a finished chat into the bounded history
+
+from google.ai import generativelanguage as glm
+
+from services.history import ChatHistoryStore
+from services.session_store import MemorySessionStore
+
+
+def _content(role, text):
+    return glm.Content(role=role, parts=[glm.Part(text=text)])
+
+
+def _replay(store, session_id):
+    """The SDK Content list a chat started from the stored history would hold."""
+    return [_content(message["role"], message["parts"][0]) for message in store.contents(session_id)]
+
+
+def test_turn_is_recorded():
+    store = ChatHistoryStore()
+    store.append_turn("s", [_content("user", "my dog is Rex"), _content("model", "Noted, Sir.")])
+    assert store.contents("s") == [{"role": "user", "parts": ["my dog is Rex"]},
+                                   {"role": "model", "parts": ["Noted, Sir."]}]
+    assert store.version("s") == 1
+
+
+def test_failed_request_records_nothing():
+    store = ChatHistoryStore()
+    store.append_turn("s", [_content("user", "my dog is Rex"), _content("model", "Noted, Sir.")])
+    history = _replay(store, "s")
+    # The request raised before a response: the chat holds only what was replayed
+    store.append_turn("s", history, replayed=len(history))
+    assert store.contents("s") == [{"role": "user", "parts": ["my dog is Rex"]},
+                                   {"role": "model", "parts": ["Noted, Sir."]}]
+    assert store.version("s") == 1
+
+
+def test_only_contents_after_the_replay_are_recorded():
+    store = ChatHistoryStore()
+    store.append_turn("s", [_content("user", "my dog is Rex"), _content("model", "Noted, Sir.")])
+    history = _replay(store, "s")
+    store.append_turn("s", history + [_content("user", "what is my dog called?"), _content("model", "Rex, Sir.")],
+                      replayed=len(history))
+    assert [message["parts"][0] for message in store.contents("s")] == [
+        "my dog is Rex", "Noted, Sir.", "what is my dog called?", "Rex, Sir."]
+    assert store.version("s") == 2
+
+
+def test_refresh_picks_up_turns_another_worker_stored():
+    shared = MemorySessionStore()
+    worker_a, worker_b = ChatHistoryStore(store=shared), ChatHistoryStore(store=shared)
+    worker_a.append_turn("s", [_content("user", "turn one"), _content("model", "ok")])
+    worker_a._writer.flush()
+    worker_b.append_turn("s", [_content("user", "turn two"), _content("model", "ok")])
+    worker_b._writer.flush()
+
+    # The session comes back to worker A, which still holds its own older copy
+    worker_a.refresh("s")
+    worker_a.append_turn("s", [_content("user", "turn three"), _content("model", "ok")])
+    worker_a._writer.flush()
+    assert [turn[0][1] for turn in shared.load_history("s")["turns"]] == ["turn one", "turn two", "turn three"]
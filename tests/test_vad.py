@@ -0,0 +1,116 @@
+# tests/test_vad.py - Voice activity gate: pre-roll, hangover, minimum message length, noise floor
+
+import numpy as np
+
+from services.vad import VoiceActivityGate
+
+FRAME_SAMPLES = 320  # 20 ms at 16 kHz
+FRAME_BYTES = FRAME_SAMPLES * 2
+MIN_SEND_BYTES = 1600  # 50 ms
+
+
+def silence(frames: int = 1) -> bytes:
+    return bytes(FRAME_BYTES * frames)
+
+
+def tone(frames: int = 1, amplitude: int = 3000) -> bytes:
+    t = np.arange(FRAME_SAMPLES * frames)
+    return (amplitude * np.sin(2 * np.pi * 200 * t / 16000)).astype(np.int16).tobytes()
+
+
+def hiss(frames: int = 1, amplitude: int = 4000) -> bytes:
+    samples = (np.arange(FRAME_SAMPLES * frames) % 2 * 2 - 1) * amplitude
+    return samples.astype(np.int16).tobytes()
+
+
+def gate(sent: list, **options):
+    options.setdefault("keepalive_seconds", 3600)
+    return VoiceActivityGate(sent.append, name="test", frame_ms=20, **options)
+
+
+def test_silence_is_suppressed():
+    sent = []
+    vad = gate(sent)
+    for _ in range(50):
+        vad.process(silence())
+    assert sent == []
+    assert vad.stats()["suppressed_percent"] == 100.0
+
+
+def test_speech_is_forwarded_with_preroll_and_hangover():
+    sent = []
+    vad = gate(sent, preroll_ms=60, hangover_ms=100)
+    lead_in = silence(5)
+    speech = tone(5)
+    vad.process(lead_in)
+    vad.process(speech)
+    for _ in range(10):
+        vad.process(silence())
+
+    forwarded = b"".join(sent)
+    # Three frames of pre-roll, the speech, then five hangover frames (the last message
+    # padded with silence up to the minimum length)
+    expected = silence(3) + speech + silence(5)
+    assert forwarded.startswith(expected)
+    assert not any(forwarded[len(expected):])
+    assert len(forwarded) - len(expected) < MIN_SEND_BYTES
+    assert not vad.active
+    assert vad.stats()["speech_segments"] == 1
+
+
+def test_every_message_meets_the_minimum_length():
+    sent = []
+    vad = gate(sent, preroll_ms=0, hangover_ms=20)
+    for chunk in (silence(), tone(), silence(), silence(), tone(), silence(3)):
+        vad.process(chunk)
+    assert sent
+    assert all(len(message) >= MIN_SEND_BYTES for message in sent)
+
+
+def test_short_tail_is_padded_with_silence_when_the_gate_closes():
+    sent = []
+    vad = gate(sent, preroll_ms=0, hangover_ms=20)
+    vad.process(tone())
+    vad.process(silence(2))
+    assert len(sent) == 1
+    assert len(sent[0]) == MIN_SEND_BYTES
+    assert sent[0].startswith(tone())
+
+
+def test_keepalive_is_at_least_the_minimum_length():
+    sent = []
+    vad = gate(sent, keepalive_seconds=0)
+    vad.process(silence())
+    assert sent == [bytes(MIN_SEND_BYTES)]
+    assert vad.stats()["keepalives"] == 1
+
+
+def test_chunks_of_any_size_are_split_into_frames():
+    sent = []
+    vad = gate(sent, preroll_ms=0, hangover_ms=20)
+    audio = tone(10) + silence(4)
+    for offset in range(0, len(audio), 250):
+        vad.process(audio[offset:offset + 250])
+    assert b"".join(sent).startswith(tone(10))
+
+
+def test_loud_high_zcr_frames_do_not_raise_the_noise_floor():
+    sent = []
+    vad = gate(sent)
+    floor = vad.noise_floor
+    for _ in range(100):
+        vad.process(hiss())
+    assert vad.noise_floor <= floor
+    assert sent == []
+
+    vad.process(tone(5))
+    assert vad.active
+
+
+def test_flush_sends_a_held_tail():
+    sent = []
+    vad = gate(sent, preroll_ms=0, hangover_ms=1000)
+    vad.process(tone())
+    assert sent == []  # 20 ms is under the minimum, still held
+    vad.flush()
+    assert len(sent) == 1 and len(sent[0]) == MIN_SEND_BYTES